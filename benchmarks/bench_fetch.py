@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares how repositories are fetched for analysis: a full shallow clone,
+a blob-less sparse checkout, and a bare mirror.
+
+Usage: python -m benchmarks.bench_fetch [--asset-files N] [--asset-kib N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from bug_free_octo_guide.tools.context_analysis_tool import FILES_TO_SUMMARIZE
+from bug_free_octo_guide.tools.git_utils import run_git
+from bug_free_octo_guide.tools.mirror_pool import MirrorPool
+from bug_free_octo_guide.tools.sparse_fetch import sparse_checkout
+
+from .fixtures import directory_size, make_rails_repo
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--asset-files", type=int, default=200)
+    parser.add_argument("--asset-kib", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo_url = make_rails_repo(
+            os.path.join(workdir, "origin"),
+            asset_files=args.asset_files,
+            asset_bytes=args.asset_kib * 1024,
+        )
+        results = {}
+
+        dest = os.path.join(workdir, "shallow")
+        seconds = _timed(lambda: run_git(["clone", "--depth", "1", repo_url, dest]))
+        results["shallow"] = {
+            "seconds": seconds,
+            "bytes_transferred": directory_size(os.path.join(dest, ".git", "objects")),
+            "bytes_on_disk": directory_size(dest),
+        }
+
+        dest = os.path.join(workdir, "sparse")
+        seconds = _timed(
+            lambda: asyncio.run(sparse_checkout(repo_url, dest, FILES_TO_SUMMARIZE))
+        )
+        results["sparse"] = {
+            "seconds": seconds,
+            "bytes_transferred": directory_size(os.path.join(dest, ".git", "objects")),
+            "bytes_on_disk": directory_size(dest),
+        }
+
+        pool = MirrorPool(os.path.join(workdir, "mirrors"))
+        seconds = _timed(lambda: asyncio.run(pool.update(repo_url)))
+        mirror_size = directory_size(pool.mirror_path(repo_url))
+        commit = pool.resolve(repo_url)
+        results["mirror_initial"] = {
+            "seconds": seconds,
+            "bytes_transferred": mirror_size,
+            "bytes_on_disk": mirror_size,
+        }
+        seconds = _timed(lambda: pool.read_files(repo_url, commit, FILES_TO_SUMMARIZE))
+        seconds += _timed(lambda: asyncio.run(pool.update(repo_url, commit)))
+        results["mirror_repeat"] = {
+            "seconds": seconds,
+            "bytes_transferred": 0,
+            "bytes_on_disk": mirror_size,
+        }
+
+    print(json.dumps({"benchmark": "fetch", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures cold-start cost in fresh interpreters: importing the package,
+importing the agent, and building the sub-agents on the first request.
+Also reports how many model clients exist after each step.
+
+Usage: python -m benchmarks.bench_import [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import gc, json, time
+start = time.perf_counter()
+import bug_free_octo_guide
+package = time.perf_counter() - start
+
+def model_clients():
+    from google.adk.models import Gemini
+    return sum(isinstance(o, Gemini) for o in gc.get_objects())
+
+start = time.perf_counter()
+root_agent = bug_free_octo_guide.root_agent
+agent = time.perf_counter() - start
+clients_at_import = model_clients()
+
+start = time.perf_counter()
+for tool in root_agent.tools:
+    if hasattr(tool, "_get_declaration"):
+        tool._get_declaration()
+first_request = time.perf_counter() - start
+
+print(json.dumps({
+    "import_package_seconds": package,
+    "import_agent_seconds": agent,
+    "build_tools_seconds": first_request,
+    "model_clients_at_import": clients_at_import,
+    "model_clients_after_first_request": model_clients(),
+}))
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [
+        json.loads(subprocess.run([sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True).stdout)
+        for _ in range(args.runs)
+    ]
+    results = {
+        key: statistics.median(run[key] for run in runs)
+        for key in runs[0]
+    }
+    print(json.dumps({"benchmark": "import", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
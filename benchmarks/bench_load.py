@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Offers increasing load to the chat API, backed by a fake model with fixed
+latency, and reports the latency percentiles of admitted turns and how many
+turns were refused with a 429. With admission control the p99 of admitted
+turns should level off as load grows, with the excess refused instead.
+
+Usage: python -m benchmarks.bench_load [--users 4,16,64,256] [--latency S]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def offer_load(app, users: int, turns_per_user: int) -> dict:
+    import httpx
+
+    latencies, refused = [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def user(number: int) -> None:
+            nonlocal refused
+            for _ in range(turns_per_user):
+                started = time.perf_counter()
+                response = await client.post(
+                    "/chat", json={"text": "add comments", "user_id": f"user-{number}"}
+                )
+                if response.status_code == 429:
+                    refused += 1
+                    await asyncio.sleep(float(response.headers["Retry-After"]) / 10)
+                else:
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(number) for number in range(users)))
+        elapsed = time.perf_counter() - started
+    return {
+        "users": users,
+        "admitted": len(latencies),
+        "refused": refused,
+        "seconds": elapsed,
+        "p50": statistics.median(latencies) if latencies else None,
+        "p99": _percentile(latencies, 0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", default="4,16,64,256", help="Concurrent users per step.")
+    parser.add_argument("--turns", type=int, default=3, help="Turns each user sends.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per model call.")
+    parser.add_argument("--max-turns", type=int, default=8)
+    parser.add_argument("--max-queued-turns", type=int, default=16)
+    parser.add_argument("--max-model-calls", type=int, default=8)
+    args = parser.parse_args()
+
+    # The limits are read when the scheduler is first imported.
+    os.environ.update(
+        {
+            "OCTO_GUIDE_MAX_TURNS": str(args.max_turns),
+            "OCTO_GUIDE_MAX_QUEUED_TURNS": str(args.max_queued_turns),
+            "OCTO_GUIDE_MAX_MODEL_CALLS": str(args.max_model_calls),
+        }
+    )
+    from bug_free_octo_guide.models import FakeLlm, RoutedLlm
+    from bug_free_octo_guide.server import create_app
+    from google.adk.agents import LlmAgent
+    from google.adk.sessions import InMemorySessionService
+
+    llm = RoutedLlm("bench", [("standard", FakeLlm(latency=args.latency))])
+    app = create_app(LlmAgent(name="bench", model=llm), InMemorySessionService())
+    results = [
+        asyncio.run(offer_load(app, int(users), args.turns)) for users in args.users.split(",")
+    ]
+    print(json.dumps({"benchmark": "load", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
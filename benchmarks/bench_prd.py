@@ -0,0 +1,222 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs scripted PRD sessions end to end against `root_agent`, with a fake
+model of configurable latency and reply size and a local fixture
+repository, and reports wall time, time per stage (tool and model calls),
+tool-call counts and prompt/completion token totals.
+
+"sequential" mode walks through the section agents one by one, the way the
+orchestrator does interactively; "pipeline" mode uses `draft_prd`.
+
+Usage: python -m benchmarks.bench_prd [--latency S] [--section-tokens N] [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from .fixtures import make_rails_repo
+
+REPO_URL = "https://github.com/bench/rails-app"
+FEATURE = "Let users leave comments on posts"
+SECTION_AGENTS = [
+    "solution_proposal_agent",
+    "api_changes_agent",
+    "db_schema_agent",
+    "implementation_details_agent",
+    "testing_strategy_agent",
+]
+SUB_AGENT_TOOL_ARGS = {
+    "search_repo": {"query": FEATURE},
+    "find_tables": {"terms": ["post", "comment"]},
+    "find_routes": {"terms": ["posts"]},
+}
+
+
+def _scripted_llm_class():
+    # Imported late: the package reads its cache location on import.
+    from bug_free_octo_guide.models import FakeLlm
+
+    class ScriptedLlm(FakeLlm):
+        """
+        Plays the orchestrator through a fixed sequence of tool calls, and
+        has every section agent call its lookup tool once before answering
+        with `section_tokens` words.
+        """
+
+        mode: str = "pipeline"
+        section_tokens: int = 300
+
+        def _called(self, llm_request: LlmRequest) -> list:
+            return [
+                part.function_response.name
+                for content in llm_request.contents
+                for part in content.parts or []
+                if part.function_response
+            ]
+
+        def respond(self, llm_request: LlmRequest) -> types.Part:
+            instruction = str(llm_request.config.system_instruction or "")
+            called = self._called(llm_request)
+            if "orchestrating the creation of a PRD" in instruction:
+                plan = [
+                    ("analyze_repo", {"prompt": f"{FEATURE} in {REPO_URL}"}),
+                    ("search_repo", {"query": FEATURE}),
+                    (
+                        "define_goals",
+                        {
+                            "primary_objective": FEATURE,
+                            "success_metric": "10% of posts get a comment",
+                            "non_goals": ["Threaded replies"],
+                        },
+                    ),
+                ]
+                if self.mode == "pipeline":
+                    plan.append(("draft_prd", {"feature_description": FEATURE}))
+                else:
+                    plan.extend((name, {"request": FEATURE}) for name in SECTION_AGENTS)
+                    plan.append(("render_prd", {}))
+                for name, args in plan:
+                    if name not in called:
+                        return types.Part(function_call=types.FunctionCall(name=name, args=args))
+                return types.Part(text="The PRD is ready.")
+
+            declared = [
+                declaration.name
+                for tool in llm_request.config.tools or []
+                for declaration in tool.function_declarations or []
+            ]
+            for name in declared:
+                if name in SUB_AGENT_TOOL_ARGS and name not in called:
+                    return types.Part(
+                        function_call=types.FunctionCall(name=name, args=SUB_AGENT_TOOL_ARGS[name])
+                    )
+            words = (instruction.split() or ["section"]) * self.section_tokens
+            return types.Part(text=" ".join(words[: self.section_tokens]))
+
+    return ScriptedLlm
+
+
+def _by_label(registry, name: str, label: str) -> dict:
+    return {dict(key)[label]: value for key, value in registry.series(name).items()}
+
+
+def report(registry) -> dict:
+    """Summarizes a run's metrics: time and calls per tool and per agent, and tokens."""
+    tool_calls = _by_label(registry, "octo_guide_tool_calls_total", "tool")
+    tool_time = _by_label(registry, "octo_guide_tool_duration_seconds", "tool")
+    model_calls = _by_label(registry, "octo_guide_model_calls_total", "agent")
+    model_time = _by_label(registry, "octo_guide_model_duration_seconds", "agent")
+    tokens = {
+        (labels["agent"], labels["kind"]): value
+        for labels, value in (
+            (dict(key), value)
+            for key, value in registry.series("octo_guide_model_tokens_total").items()
+        )
+    }
+    models = {
+        agent: {
+            "count": count,
+            "seconds": model_time[agent]["sum"],
+            "prompt_tokens": tokens.get((agent, "prompt"), 0),
+            "completion_tokens": tokens.get((agent, "completion"), 0),
+        }
+        for agent, count in model_calls.items()
+    }
+    return {
+        "tools": {
+            tool: {"count": count, "seconds": tool_time[tool]["sum"]}
+            for tool, count in tool_calls.items()
+        },
+        "models": models,
+        "tool_calls": sum(tool_calls.values()),
+        "prompt_tokens": sum(stats["prompt_tokens"] for stats in models.values()),
+        "completion_tokens": sum(stats["completion_tokens"] for stats in models.values()),
+    }
+
+
+async def run_session(root_agent) -> dict:
+    from bug_free_octo_guide.telemetry import Metrics, TelemetryPlugin
+    from google.adk.runners import InMemoryRunner
+
+    registry = Metrics()
+    runner = InMemoryRunner(agent=root_agent, app_name="bench", plugins=[TelemetryPlugin(registry)])
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    started = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=f"{FEATURE} in {REPO_URL}")]),
+    ):
+        pass
+    return {"wall_seconds": time.perf_counter() - started, **report(registry)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per model call.")
+    parser.add_argument("--section-tokens", type=int, default=300)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="sequential,pipeline")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the model response cache on.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        origin = os.path.join(workdir, "origin")
+        repo = make_rails_repo(origin, tables=args.tables)
+        # Point the GitHub URL the orchestrator sees at the fixture.
+        os.environ.update(
+            {
+                "OCTO_GUIDE_CACHE_DIR": os.path.join(workdir, "cache"),
+                "OCTO_GUIDE_LLM_CACHE": "1" if args.llm_cache else "0",
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": f"url.{repo}.insteadOf",
+                "GIT_CONFIG_VALUE_0": REPO_URL,
+            }
+        )
+        from bug_free_octo_guide.models import register_model
+
+        llm = _scripted_llm_class()(latency=args.latency, section_tokens=args.section_tokens)
+        register_model(llm)
+        from bug_free_octo_guide.agent import root_agent
+
+        results = {}
+        for mode in args.modes.split(","):
+            llm.mode = mode
+            runs = [asyncio.run(run_session(root_agent)) for _ in range(args.runs)]
+            walls = [run["wall_seconds"] for run in runs]
+            results[mode] = {
+                "wall_seconds": {
+                    "median": statistics.median(walls),
+                    "min": min(walls),
+                    "max": max(walls),
+                },
+                "last_run": runs[-1],
+            }
+
+    print(json.dumps({"benchmark": "prd", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sends many model calls to a fake backend that injects failures and a slow
+tail, once directly and once through the resilience wrapper, and reports
+the success rate, latency percentiles and how many backend calls each made.
+Retries should turn most failures into successes, and hedging should pull
+the p99 down towards the typical latency, for a bounded number of extra
+calls.
+
+Usage: python -m benchmarks.bench_resilience [--calls N] [--failure-rate F]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from bug_free_octo_guide.models import FakeLlm, ResilientLlm, resilience
+from bug_free_octo_guide.models.resilience import RetryBudgets
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(llm, backend: FakeLlm, calls: int, concurrency: int) -> dict:
+    latencies, failures = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(number: int) -> None:
+        nonlocal failures
+        request = LlmRequest(
+            contents=[types.Content(role="user", parts=[types.Part(text=f"call {number}")])]
+        )
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async for _ in llm.generate_content_async(request):
+                    pass
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(call(number) for number in range(calls)))
+    return {
+        "succeeded": len(latencies),
+        "failed": failures,
+        "backend_calls": len(backend.requests),
+        "p50": statistics.median(latencies) if latencies else None,
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per typical call.")
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-latency", type=float, default=2.0)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--hedge-percentile", type=float, default=95)
+    args = parser.parse_args()
+    resilience.BACKOFF_BASE = args.latency
+
+    def backend() -> FakeLlm:
+        return FakeLlm(
+            latency=args.latency,
+            tail_rate=args.tail_rate,
+            tail_latency=args.tail_latency,
+            failure_rate=args.failure_rate,
+            seed=0,
+        )
+
+    direct = backend()
+    wrapped = backend()
+    # All calls run outside any session, so they share one retry budget.
+    resilient = ResilientLlm(
+        wrapped, hedge_percentile=args.hedge_percentile, hedge_min_delay=0, budgets=RetryBudgets()
+    )
+    results = {
+        "direct": asyncio.run(measure(direct, direct, args.calls, args.concurrency)),
+        "resilient": asyncio.run(measure(resilient, wrapped, args.calls, args.concurrency)),
+    }
+    print(json.dumps({"benchmark": "resilience", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
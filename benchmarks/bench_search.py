@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures repository search index build time (full and incremental), index
+load time and query latency on a synthetic repository.
+
+Usage: python -m benchmarks.bench_search [--files N] [--queries N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bug_free_octo_guide.tools.mirror_pool import MirrorPool
+from bug_free_octo_guide.tools.repo_search import SearchIndex, SearchIndexStore
+
+from .fixtures import _VOCABULARY, commit_changes, directory_size, make_source_repo
+
+
+def _build(pool, repo_url, commit, previous):
+    start = time.perf_counter()
+    index, stats = SearchIndex.build(
+        commit,
+        pool.list_tree(repo_url, commit),
+        lambda blobs, reader: pool.read_objects(repo_url, blobs, reader),
+        previous,
+    )
+    return index, dict(stats, seconds=time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--changed-files", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        origin = os.path.join(workdir, "origin")
+        start = time.perf_counter()
+        repo_url = make_source_repo(origin, args.files)
+        fixture_seconds = time.perf_counter() - start
+
+        pool = MirrorPool(os.path.join(workdir, "mirrors"))
+        store = SearchIndexStore(os.path.join(workdir, "search"))
+        asyncio.run(pool.update(repo_url))
+        commit = pool.resolve(repo_url)
+
+        index, full_build = _build(pool, repo_url, commit, None)
+        start = time.perf_counter()
+        store.save(repo_url, index)
+        save_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        previous = store.latest(repo_url)
+        load_seconds = time.perf_counter() - start
+
+        changes = {
+            f"app/changed/file_{i}.rb": f"class Changed{i}\n  def {rng.choice(_VOCABULARY)}\n  end\nend\n"
+            for i in range(args.changed_files)
+        }
+        new_commit = commit_changes(origin, changes)
+        asyncio.run(pool.update(repo_url, new_commit))
+        index, incremental_build = _build(pool, repo_url, new_commit, previous)
+
+        latencies = []
+        index.search("warm up")
+        for _ in range(args.queries):
+            query = " ".join(rng.sample(_VOCABULARY, 5))
+            start = time.perf_counter()
+            index.search(query, top_k=10)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        results = {
+            "fixture_seconds": fixture_seconds,
+            "full_build": full_build,
+            "incremental_build": incremental_build,
+            "save_seconds": save_seconds,
+            "load_seconds": load_seconds,
+            "index_bytes_on_disk": directory_size(store.root),
+            "query_seconds": {
+                "p50": statistics.median(latencies),
+                "p95": latencies[int(len(latencies) * 0.95) - 1],
+                "max": latencies[-1],
+            },
+        }
+
+    print(json.dumps({"benchmark": "search", "args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local git repositories used as benchmark fixtures."""
+
+import os
+import random
+import subprocess
+
+
+def git(cwd: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def make_rails_repo(
+    path: str,
+    tables: int = 50,
+    asset_files: int = 0,
+    asset_bytes: int = 0,
+    seed: int = 0,
+) -> str:
+    """
+    Creates a git repository at `path` laid out like a Rails application,
+    with `tables` tables in db/schema.rb and `asset_files` incompressible
+    files of `asset_bytes` each under vendor/assets. Returns a file:// URL
+    for the repository that supports partial clone.
+    """
+    rng = random.Random(seed)
+    os.makedirs(path)
+    git(path, "init", "-q", "-b", "main")
+    git(path, "config", "user.email", "bench@example.com")
+    git(path, "config", "user.name", "Bench")
+    git(path, "config", "uploadpack.allowFilter", "true")
+
+    schema = ["ActiveRecord::Schema[7.1].define(version: 2024_01_01_000000) do"]
+    routes = ["Rails.application.routes.draw do"]
+    for i in range(tables):
+        schema.append(f'  create_table "table_{i}", force: :cascade do |t|')
+        for j in range(8):
+            schema.append(f'    t.string "column_{j}"')
+        schema.append("    t.datetime \"created_at\", null: false")
+        schema.append("  end")
+        schema.append(f'  add_index "table_{i}", ["column_0"], name: "index_table_{i}_on_column_0"')
+        routes.append(f"  resources :table_{i}, only: [:index, :show, :create]")
+    schema.append("end")
+    routes.append("end")
+
+    files = {
+        "db/schema.rb": "\n".join(schema) + "\n",
+        "config/routes.rb": "\n".join(routes) + "\n",
+        "Gemfile": 'source "https://rubygems.org"\ngem "rails"\n',
+        "conventions.md": "# Conventions\n",
+    }
+    for path_in_repo, content in files.items():
+        full_path = os.path.join(path, path_in_repo)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    for i in range(asset_files):
+        full_path = os.path.join(path, "vendor", "assets", f"asset_{i}.bin")
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(rng.randbytes(asset_bytes))
+
+    git(path, "add", "-A")
+    git(path, "commit", "-q", "-m", "initial")
+    return f"file://{path}"
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            if not os.path.islink(full_path):
+                total += os.path.getsize(full_path)
+    return total
+
+
+_VOCABULARY = (
+    "user account comment post like invoice payment order cart product "
+    "profile picture avatar session token email notification report export "
+    "import search filter page admin role permission policy command service "
+    "worker job queue schedule event audit log donation campaign charity"
+).split()
+
+
+def _source_file(rng: random.Random, index: int) -> bytes:
+    words = [rng.choice(_VOCABULARY) for _ in range(6)]
+    class_name = "".join(word.capitalize() for word in words[:2]) + str(index)
+    body = [f"class {class_name} < ApplicationRecord"]
+    for word in words[2:]:
+        body.append(f"  def {word}_{rng.choice(_VOCABULARY)}")
+        body.append(f"    {rng.choice(_VOCABULARY)}.where({word}: params[:{word}]).first")
+        body.append("  end")
+    body.append("end")
+    return ("\n".join(body) + "\n").encode("utf-8")
+
+
+def make_source_repo(path: str, files: int, seed: int = 0) -> str:
+    """
+    Creates a repository with `files` synthetic Ruby source files spread
+    over nested directories, using `git fast-import` so that even 50k+ files
+    are created in seconds. Returns a file:// URL for it.
+    """
+    rng = random.Random(seed)
+    os.makedirs(path)
+    git(path, "init", "-q", "-b", "main")
+    stream = [b"commit refs/heads/main\n", b"committer Bench <bench@example.com> 0 +0000\n"]
+    message = b"initial"
+    stream.append(b"data %d\n%s\n" % (len(message), message))
+    for i in range(files):
+        content = _source_file(rng, i)
+        directory = f"app/{rng.choice(_VOCABULARY)}/{rng.choice(_VOCABULARY)}"
+        stream.append(f"M 100644 inline {directory}/file_{i}.rb\n".encode("utf-8"))
+        stream.append(b"data %d\n%s\n" % (len(content), content))
+    subprocess.run(
+        ["git", "fast-import", "--quiet"], cwd=path, input=b"".join(stream), check=True
+    )
+    return f"file://{path}"
+
+
+def commit_changes(path: str, files: dict) -> str:
+    """Commits {path in repo: content} on top of main and returns the commit."""
+    parent = git(path, "rev-parse", "main")
+    stream = [b"commit refs/heads/main\n", b"committer Bench <bench@example.com> 1 +0000\n"]
+    message = b"update"
+    stream.append(b"data %d\n%s\n" % (len(message), message))
+    stream.append(f"from {parent}\n".encode("utf-8"))
+    for path_in_repo, content in files.items():
+        content = content.encode("utf-8")
+        stream.append(f"M 100644 inline {path_in_repo}\n".encode("utf-8"))
+        stream.append(b"data %d\n%s\n" % (len(content), content))
+    subprocess.run(
+        ["git", "fast-import", "--quiet"], cwd=path, input=b"".join(stream), check=True
+    )
+    return git(path, "rev-parse", "main")
@@ -1 +1,10 @@
-from . import agent
+import importlib
+
+
+def __getattr__(name):
+    # The agent is imported on first access rather than with the package,
+    # so importing a submodule (tools, cache, ...) doesn't build any agents.
+    if name in ("agent", "root_agent"):
+        agent = importlib.import_module(".agent", __name__)
+        return agent if name == "agent" else agent.root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
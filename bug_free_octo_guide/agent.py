@@ -13,34 +13,58 @@
 # limitations under the License.
 
 from google.adk.agents import LlmAgent
-from google.adk.models import Gemini
-from google.adk.tools.agent_tool import AgentTool
 from .agents.api_changes_agent import ApiChangesAgent
 from .agents.db_schema_agent import DbSchemaAgent
 from .agents.implementation_details_agent import ImplementationDetailsAgent
 from .agents.solution_proposal_agent import SolutionProposalAgent
 from .agents.testing_strategy_agent import TestingStrategyAgent
+from .models import LazyAgentTool, routed_model, with_response_cache
+from .pipeline import draft_prd
+from .prd_library import search_prd_library, seed_prd_from_library
+from .tickets import draft_tickets
 from .tools.context_analysis_tool import analyze_repo
-from .tools.prd_assembler_tool import assemble_prd
+from .tools.prd_assembler_tool import assemble_prd, render_prd, update_prd_section
 from .tools.prd_form_tools import define_goals
+from .tools.repo_search_tool import search_repo
+
+
+
+def _sub_agent(name, agent_class):
+    """A tool for a sub-agent that is built, on its routed model, when first used."""
+    return LazyAgentTool(
+        name,
+        lambda: with_response_cache(agent_class(llm=routed_model(name))),
+    )
+
 
 root_agent = LlmAgent(
-    model=Gemini(),
+    model=routed_model("bug_free_octo_guide"),
     name="bug_free_octo_guide",
     instruction=(
         "You are a project manager orchestrating the creation of a PRD. "
         "Your process is as follows:\n"
-        "1. ALWAYS analyze the user's repository to gather context using the `analyze_repo` tool. If the analysis fails, report the error and STOP.\n"
-        "2. After successful analysis, your next step is to define the feature's goals. You must call the `define_goals` tool. To do this, you need to ask the user for the `primary_objective`, `success_metric`, and `non_goals`."
+        "1. ALWAYS analyze the user's repositories to gather context using the `analyze_repo` tool. Pass every repository URL the user mentioned in the prompt. If the analysis fails, report the errors and STOP. Then call the `search_repo` tool with the feature description to find the most relevant existing code.\n"
+        "2. After successful analysis, your next step is to define the feature's goals. You must call the `define_goals` tool. To do this, you need to ask the user for the `primary_objective`, `success_metric`, and `non_goals`.\n"
+        "3. Once the goals are defined, call `search_prd_library` with the feature description to find earlier PRDs for similar features. If a match is close (a score of about 0.5 or more, especially for the same repository), tell the user and call `seed_prd_from_library` with its id; its sections become drafts that the section agents revise instead of writing from scratch.\n"
+        "4. If the user wants a complete draft rather than working through the sections one by one, call the `draft_prd` tool with the feature description; it writes every section, drafting independent sections in parallel, and returns the assembled PRD.\n"
+        "5. The sections are kept in the session. To revise one section, call `update_prd_section` with only that section; to show the document, call `render_prd` (pass `changed_since` with the last version you showed to get only the sections that changed). Never resend sections that did not change.\n"
+        "6. Once the user approves the PRD, call the `draft_tickets` tool to break it down into engineering tickets and present them."
     ),
     tools=[
         analyze_repo,
+        search_repo,
         define_goals,
-        AgentTool(agent=SolutionProposalAgent(llm=Gemini())),
-        AgentTool(agent=ApiChangesAgent(llm=Gemini())),
-        AgentTool(agent=DbSchemaAgent(llm=Gemini())),
-        AgentTool(agent=ImplementationDetailsAgent(llm=Gemini())),
-        AgentTool(agent=TestingStrategyAgent(llm=Gemini())),
+        search_prd_library,
+        seed_prd_from_library,
+        _sub_agent("solution_proposal_agent", SolutionProposalAgent),
+        _sub_agent("api_changes_agent", ApiChangesAgent),
+        _sub_agent("db_schema_agent", DbSchemaAgent),
+        _sub_agent("implementation_details_agent", ImplementationDetailsAgent),
+        _sub_agent("testing_strategy_agent", TestingStrategyAgent),
         assemble_prd,
+        update_prd_section,
+        render_prd,
+        draft_prd,
+        draft_tickets,
     ],
 )
@@ -14,6 +14,8 @@
 
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
+from ..context_packer import make_context_packer
+from ..tools.rails_index_tool import find_routes
 
 
 class ApiChangesAgent(LlmAgent):
@@ -21,5 +23,8 @@ class ApiChangesAgent(LlmAgent):
         super().__init__(
             model=llm,
             name="api_changes_agent",
-            instruction="You are a senior software engineer. Your task is to help a user define the API changes for a new feature. Discuss new or modified endpoints, request/response schemas, versioning, and error handling, keeping the project's conventions in mind.",
+            instruction="You are a senior software engineer. Your task is to help a user define the API changes for a new feature. Discuss new or modified endpoints, request/response schemas, versioning, and error handling, keeping the project's conventions in mind. Use the `find_routes` tool to look up the existing routes that relate to the feature before proposing changes.",
+            tools=[find_routes],
+            output_key="api_changes",
+            before_model_callback=make_context_packer("api_changes", preferred_files=["config/routes.rb"]),
         )
\ No newline at end of file
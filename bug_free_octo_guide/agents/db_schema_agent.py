@@ -14,6 +14,8 @@
 
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
+from ..context_packer import make_context_packer
+from ..tools.rails_index_tool import find_tables
 
 
 class DbSchemaAgent(LlmAgent):
@@ -21,5 +23,8 @@ class DbSchemaAgent(LlmAgent):
         super().__init__(
             model=llm,
             name="db_schema_agent",
-            instruction="You are a senior database engineer. Your task is to help a user define the database schema changes for a new feature. Discuss new or modified tables, columns, indexes, and data types, paying close attention to the project's migration conventions.",
+            instruction="You are a senior database engineer. Your task is to help a user define the database schema changes for a new feature. Discuss new or modified tables, columns, indexes, and data types, paying close attention to the project's migration conventions. Use the `find_tables` tool to look up the existing tables, columns and indexes that relate to the feature before proposing changes.",
+            tools=[find_tables],
+            output_key="db_schema",
+            before_model_callback=make_context_packer("db_schema", preferred_files=["db/schema.rb"]),
         )
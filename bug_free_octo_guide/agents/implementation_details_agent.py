@@ -14,6 +14,8 @@
 
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
+from ..context_packer import make_context_packer
+from ..tools.repo_search_tool import search_repo
 
 
 class ImplementationDetailsAgent(LlmAgent):
@@ -21,5 +23,8 @@ class ImplementationDetailsAgent(LlmAgent):
         super().__init__(
             model=llm,
             name="implementation_details_agent",
-            instruction="You are a senior software engineer. Your task is to help a user define the code implementation details for a new feature. Discuss key classes, modules, algorithms, and patterns, paying close attention to the project's conventions.",
+            instruction="You are a senior software engineer. Your task is to help a user define the code implementation details for a new feature. Discuss key classes, modules, algorithms, and patterns, paying close attention to the project's conventions. Use the `search_repo` tool to find the existing code that relates to the feature before making suggestions.",
+            tools=[search_repo],
+            output_key="implementation",
+            before_model_callback=make_context_packer("implementation", preferred_files=["Gemfile", "conventions.md"]),
         )
@@ -14,6 +14,8 @@
 
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
+from ..context_packer import make_context_packer
+from ..tools.repo_search_tool import search_repo
 
 
 class SolutionProposalAgent(LlmAgent):
@@ -21,5 +23,8 @@ class SolutionProposalAgent(LlmAgent):
         super().__init__(
             model=llm,
             name="solution_proposal_agent",
-            instruction="You are a senior software engineer. Your task is to propose a technical solution for a new feature, based on the feature's goals. Propose a solution that includes the overall design, user flows, and system interactions, keeping the project's conventions in mind.",
+            instruction="You are a senior software engineer. Your task is to propose a technical solution for a new feature, based on the feature's goals. Propose a solution that includes the overall design, user flows, and system interactions, keeping the project's conventions in mind. Use the `search_repo` tool to find the existing code that relates to the feature before making suggestions.",
+            tools=[search_repo],
+            output_key="solution",
+            before_model_callback=make_context_packer("solution", preferred_files=["conventions.md"]),
         )
\ No newline at end of file
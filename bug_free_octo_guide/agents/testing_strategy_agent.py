@@ -14,6 +14,8 @@
 
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
+from ..context_packer import make_context_packer
+from ..tools.repo_search_tool import search_repo
 
 
 class TestingStrategyAgent(LlmAgent):
@@ -21,5 +23,8 @@ class TestingStrategyAgent(LlmAgent):
         super().__init__(
             model=llm,
             name="testing_strategy_agent",
-            instruction="You are a senior software engineer. Your task is to help a user define the testing strategy for a new feature. Discuss unit tests, request specs, and integration tests, paying close attention to the project's conventions.",
+            instruction="You are a senior software engineer. Your task is to help a user define the testing strategy for a new feature. Discuss unit tests, request specs, and integration tests, paying close attention to the project's conventions. Use the `search_repo` tool to find the existing code that relates to the feature before making suggestions.",
+            tools=[search_repo],
+            output_key="testing",
+            before_model_callback=make_context_packer("testing", preferred_files=["conventions.md"]),
         )
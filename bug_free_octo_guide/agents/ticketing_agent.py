@@ -1,6 +1,32 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import os
+
 from google.adk.agents import LlmAgent
 from google.adk.models.base_llm import BaseLlm
-import os
+
+TICKET_PROMPT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "ticketprompt.md")
+
+
+@functools.lru_cache(maxsize=None)
+def load_ticket_prompt(path: str = TICKET_PROMPT_PATH) -> str:
+    """Reads the ticket prompt template, once per process."""
+    with open(path, "r") as f:
+        return f.read()
+
 
 class TicketingAgent(LlmAgent):
     _prd: str
@@ -10,14 +36,11 @@ class TicketingAgent(LlmAgent):
             model=llm,
             name="ticketing_agent",
             instruction="You are a project manager. Your task is to break down the following Product Requirements Document (PRD) into a set of actionable tickets.",
-            _prd=prd
         )
+        self._prd = prd
 
     def load_prompt(self) -> str:
         """
-        Loads the prompt from the ticketprompt.md file.
+        Returns the ticket prompt template followed by the PRD.
         """
-        prompt_path = os.path.join(os.path.dirname(__file__), "..", "..", "ticketprompt.md")
-        with open(prompt_path, "r") as f:
-            prompt = f.read()
-        return prompt + "\n\n" + self._prd
+        return load_ticket_prompt() + "\n\n" + self._prd
@@ -0,0 +1,223 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Generates PRDs non-interactively for every feature request in a JSONL file,
+several at a time. Each input line is a JSON object:
+
+    {"id": "...", "repo": "https://github.com/org/app",
+     "description": "...", "goals": {"primary_objective": "...",
+     "success_metric": "...", "non_goals": ["..."]}}
+
+Each repository is analyzed once and the analysis is shared by all the
+requests that target it. Results are appended to the output JSONL as they
+finish, one line per request with the PRD (or the error) and its timings;
+requests already answered successfully in the output are skipped, so an
+interrupted run can simply be started again.
+
+Usage: python -m bug_free_octo_guide.batch INPUT OUTPUT [--concurrency N] [--rate CALLS_PER_SECOND]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions.state import State
+
+from .models import current_session
+from .pipeline import PrdPipeline, default_pipeline
+from .prd_library import default_library
+from .telemetry import TelemetryPlugin, metrics
+from .tools.context_analysis_tool import analyze_repo_url
+from .tools.prd_form_tools import define_goals
+
+# PRDs generated at the same time unless configured otherwise.
+BATCH_CONCURRENCY = int(os.environ.get("OCTO_GUIDE_BATCH_CONCURRENCY", 4))
+
+
+class RateLimiter:
+    """
+    A token bucket allowing `rate` acquisitions per second on average and
+    up to `burst` at once. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimitPlugin(BasePlugin):
+    """Holds every model call until `limiter` lets it through."""
+
+    def __init__(self, limiter: RateLimiter):
+        super().__init__(name="rate_limit")
+        self.limiter = limiter
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        await self.limiter.acquire()
+        return None
+
+
+def read_requests(path: str) -> List[dict]:
+    """Reads the feature requests in `path`, giving each one an `id`."""
+    requests = []
+    with open(path) as f:
+        for number, line in enumerate(f, start=1):
+            if line.strip():
+                request = json.loads(line)
+                request.setdefault("id", request.get("request_id") or f"line-{number}")
+                requests.append(request)
+    return requests
+
+
+def completed_ids(path: str) -> set:
+    """Returns the ids of the requests `path` already holds a PRD for."""
+    done = set()
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line cut short by an interrupted run.
+                if result.get("success"):
+                    done.add(result["id"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class BatchRunner:
+    """
+    Runs `pipeline` for many feature requests with at most `concurrency`
+    in flight, sharing one analysis per repository between them.
+    """
+
+    def __init__(
+        self,
+        pipeline: Optional[PrdPipeline] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+        rate: Optional[float] = None,
+    ):
+        self.pipeline = pipeline or default_pipeline()
+        self.concurrency = max(1, concurrency)
+        self.plugins: List[BasePlugin] = [TelemetryPlugin(metrics)]
+        if rate:
+            self.plugins.append(RateLimitPlugin(RateLimiter(rate)))
+        self._analyses: Dict[str, asyncio.Future] = {}
+
+    def _analysis(self, repo_url: str) -> asyncio.Future:
+        if repo_url not in self._analyses:
+            self._analyses[repo_url] = asyncio.ensure_future(analyze_repo_url(repo_url))
+        return self._analyses[repo_url]
+
+    async def generate(self, request: dict) -> dict:
+        """Generates the PRD for one request; failures are returned, not raised."""
+        current_session.set(f"batch:{request['id']}")
+        started = time.perf_counter()
+        timings: Dict[str, object] = {}
+        result = {"id": request["id"], "repo": request.get("repo")}
+        try:
+            state = State({}, {})
+            if request.get("repo"):
+                analysis = await asyncio.shield(self._analysis(request["repo"]))
+                timings["analysis"] = time.perf_counter() - started
+                if not analysis["success"]:
+                    raise ValueError(analysis["error"])
+                state["repositories"] = {request["repo"]: analysis["commit"]}
+                state["repository_summaries"] = {request["repo"]: analysis["summaries"]}
+            define_goals(**request.get("goals") or {}, tool_context=SimpleNamespace(state=state))
+            drafted = await self.pipeline.run(request["description"], state.to_dict(), self.plugins)
+            timings["sections"] = drafted["timings"]
+            library_id = await asyncio.to_thread(
+                default_library().add,
+                drafted["sections"],
+                request["description"],
+                state.get("repositories") or {},
+            )
+            result.update(success=True, prd=drafted["prd"], library_id=library_id)
+        except Exception as e:
+            logging.exception(f"Failed to generate the PRD for {request['id']}")
+            result.update(success=False, error=f"{type(e).__name__}: {e}")
+        timings["total"] = time.perf_counter() - started
+        result["timings"] = timings
+        return result
+
+    async def run(self, requests: Iterable[dict], output_path: str) -> dict:
+        """
+        Generates a PRD for each request not yet answered in `output_path`
+        and appends the results there. Returns counts of what happened.
+        """
+        done = completed_ids(output_path)
+        pending = [request for request in requests if request["id"] not in done]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        summary = {"skipped": len(done), "succeeded": 0, "failed": 0}
+        started = time.perf_counter()
+
+        with open(output_path, "a") as output:
+
+            async def run_one(request: dict) -> None:
+                async with semaphore:
+                    result = await self.generate(request)
+                summary["succeeded" if result["success"] else "failed"] += 1
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                logging.info(
+                    f"{request['id']}: {'done' if result['success'] else 'failed'} "
+                    f"in {result['timings']['total']:.1f}s"
+                )
+
+            await asyncio.gather(*(run_one(request) for request in pending))
+        summary["seconds"] = time.perf_counter() - started
+        return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of feature requests.")
+    parser.add_argument("output", help="JSONL file the PRDs are appended to.")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=None, help="Maximum model calls per second.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    runner = BatchRunner(concurrency=args.concurrency, rate=args.rate)
+    summary = asyncio.run(runner.run(read_requests(args.input), args.output))
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_ROOT = os.path.join(
+    os.path.expanduser("~"), ".cache", "bug_free_octo_guide"
+)
+
+
+def cache_root() -> str:
+    """Returns the root directory for on-disk caches."""
+    return os.environ.get("OCTO_GUIDE_CACHE_DIR", DEFAULT_CACHE_ROOT)
+
+
+# Every DiskCache created in this process, by namespace, for metrics.
+_open_caches: "weakref.WeakValueDictionary[str, DiskCache]" = weakref.WeakValueDictionary()
+
+
+def open_caches() -> Dict[str, "DiskCache"]:
+    """Returns the disk caches created in this process, by namespace."""
+    return dict(_open_caches)
+
+
+def cache_key(*parts: str) -> str:
+    """Builds a stable key from the given parts."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    A size-bounded, on-disk JSON cache with least-recently-used eviction.
+
+    Each entry is stored in its own file. Reads refresh the file's mtime,
+    which is what eviction orders by, so the cache can be shared between
+    processes without a separate index.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        root: Optional[str] = None,
+    ):
+        self.directory = os.path.join(root or cache_root(), namespace)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        _open_caches[namespace] = self
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            if (
+                self.ttl_seconds is not None
+                and time.time() - entry["created"] > self.ttl_seconds
+            ):
+                os.remove(path)
+                raise FileNotFoundError(path)
+            os.utime(path)
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry["value"]
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores `value` under `key` and evicts old entries if needed."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"created": time.time(), "value": value}, f)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def _entries(self) -> list:
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self) -> None:
+        """Removes least-recently-used entries until under `max_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                logging.info(f"Evicted cache entry: {name}")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> dict:
+        """Returns hit/miss counts and the current size of the cache."""
+        entries = self._entries()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(entries),
+                "bytes_on_disk": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
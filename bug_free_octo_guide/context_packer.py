@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Packs the session context a sub-agent needs (goals, earlier PRD sections,
+repository summaries) into its system instruction, within a token budget.
+Material the agent was already given is not repeated, and the lowest
+priority items are dropped first when the budget runs out.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+
+# Tokens of packed context each sub-agent gets unless configured otherwise.
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("OCTO_GUIDE_CONTEXT_TOKEN_BUDGET", 4000))
+# Items that would be cut below this many tokens are dropped instead.
+MIN_ITEM_TOKENS = 32
+
+# PRD sections in the order they are written; each sub-agent stores its
+# output in the session state under one of these keys.
+SECTIONS = ["goals", "solution", "api_changes", "db_schema", "implementation", "testing"]
+
+# Word pieces of up to four characters, and each punctuation character,
+# approximate the sub-word tokens that models bill for.
+_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates how many model tokens `text` is, without a tokenizer."""
+    return len(_TOKEN.findall(text))
+
+
+class ContextItem(NamedTuple):
+    """A piece of context; lower `priority` values are kept first."""
+
+    title: str
+    text: str
+    priority: int
+
+
+def _fingerprint(paragraph: str) -> str:
+    normalized = " ".join(paragraph.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+
+_ELLIPSIS = "\n[...]"
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cuts `text` to at most `max_tokens`, preferring a line boundary."""
+    pieces = list(_TOKEN.finditer(text))
+    if len(pieces) <= max_tokens:
+        return text
+    cut = pieces[max(0, max_tokens - estimate_tokens(_ELLIPSIS))].start()
+    newline = text.rfind("\n", 0, cut)
+    if newline > cut // 2:
+        cut = newline
+    return text[:cut].rstrip() + _ELLIPSIS
+
+
+def pack_context(
+    items: Iterable[ContextItem],
+    budget: int,
+    seen: Iterable[str] = (),
+) -> dict:
+    """
+    Packs `items` into at most about `budget` tokens.
+
+    Paragraphs that already appear in `seen` or in a higher priority item are
+    removed. Items are then taken in priority order; the first one that no
+    longer fits is truncated, and everything after it is dropped.
+    Returns {"text", "tokens", "included", "dropped"}.
+    """
+    fingerprints = {_fingerprint(p) for text in seen for p in _paragraphs(text)}
+    parts = []
+    included, dropped = [], []
+    remaining = budget
+    for item in sorted(items, key=lambda item: item.priority):
+        paragraphs = []
+        for paragraph in _paragraphs(item.text):
+            fingerprint = _fingerprint(paragraph)
+            if fingerprint not in fingerprints:
+                fingerprints.add(fingerprint)
+                paragraphs.append(paragraph)
+        if not paragraphs:
+            continue
+        text = f"### {item.title}\n" + "\n\n".join(paragraphs)
+        cost = estimate_tokens(text)
+        if cost > remaining:
+            if remaining < MIN_ITEM_TOKENS:
+                dropped.append(item.title)
+                continue
+            text = _truncate(text, remaining)
+            cost = estimate_tokens(text)
+        parts.append(text)
+        included.append(item.title)
+        remaining -= cost
+    return {
+        "text": "\n\n".join(parts),
+        "tokens": budget - remaining,
+        "included": included,
+        "dropped": dropped,
+    }
+
+
+def _section_title(section: str) -> str:
+    return section.replace("_", " ").title()
+
+
+def _request_text(llm_request: LlmRequest) -> List[str]:
+    texts = []
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.text:
+                texts.append(part.text)
+    return texts
+
+
+def collect_context(
+    state, section: str, preferred_files: Sequence[str] = ()
+) -> List[ContextItem]:
+    """
+    Gathers the context for the agent that writes `section`: the goals come
+    first, then the sections it builds on, the repository files it cares
+    most about, its own earlier draft, the remaining summaries and finally
+    the sections written after it.
+    """
+    items = []
+    position = SECTIONS.index(section)
+    for index, other in enumerate(SECTIONS):
+        text = state.get(other)
+        if not text:
+            continue
+        if other == "goals":
+            priority = 0
+        elif other == "solution" and section != "solution":
+            priority = 1
+        elif other == section:
+            priority = 3
+        elif index < position:
+            priority = 4
+        else:
+            priority = 6
+        title = "Current draft of this section" if other == section else _section_title(other)
+        items.append(ContextItem(title, str(text), priority))
+
+    for repo_url, summaries in (state.get("repository_summaries") or {}).items():
+        for file_path, text in summaries.items():
+            if text in ("File not found.", "Binary file."):
+                continue
+            priority = 2 if file_path in preferred_files else 5
+            items.append(ContextItem(f"{file_path} ({repo_url})", text, priority))
+    return items
+
+
+def make_context_packer(
+    section: str,
+    preferred_files: Sequence[str] = (),
+    budget: Optional[int] = None,
+):
+    """
+    Returns a `before_model_callback` that adds the packed context for the
+    agent writing `section` to each of its model requests.
+    """
+
+    def pack(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        items = collect_context(callback_context.state, section, preferred_files)
+        if not items:
+            return None
+        packed = pack_context(
+            items,
+            CONTEXT_TOKEN_BUDGET if budget is None else budget,
+            seen=_request_text(llm_request),
+        )
+        if packed["dropped"]:
+            logging.info(f"Context for {section} dropped: {packed['dropped']}")
+        if packed["text"]:
+            llm_request.append_instructions(
+                ["Context gathered so far in this session:\n\n" + packed["text"]]
+            )
+        return None
+
+    return pack
@@ -0,0 +1,47 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers shared by the SQLite stores (sessions, the PRD library): WAL-mode
+connections in autocommit mode, with transactions taken explicitly.
+"""
+
+import sqlite3
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens `path` in WAL mode; use one connection per thread."""
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class Transaction:
+    """
+    Runs a block as one transaction on a shared connection. Writers take the
+    write lock up front ("IMMEDIATE"); readers use "DEFERRED", which in WAL
+    mode reads a consistent snapshot without waiting for writers.
+    """
+
+    def __init__(self, db: sqlite3.Connection, mode: str = "IMMEDIATE"):
+        self.db = db
+        self.mode = mode
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute(f"BEGIN {self.mode}")
+        return self.db
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,39 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .cache import CachingLlm, with_response_cache
+from .fake import FakeLlm
+from .registry import LazyAgentTool, register_model, shared_model
+from .replay import Recorder, ReplayLlm, UnrecordedRequestError
+from .resilience import CircuitOpenError, ResilientLlm, current_session, resilient_model
+from .routing import RoutedLlm, routed_model, with_model_routing
+
+__all__ = [
+    "CachingLlm",
+    "CircuitOpenError",
+    "FakeLlm",
+    "LazyAgentTool",
+    "Recorder",
+    "ReplayLlm",
+    "ResilientLlm",
+    "RoutedLlm",
+    "UnrecordedRequestError",
+    "current_session",
+    "register_model",
+    "resilient_model",
+    "routed_model",
+    "shared_model",
+    "with_model_routing",
+    "with_response_cache",
+]
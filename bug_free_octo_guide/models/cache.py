@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from typing import Any, AsyncGenerator
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import ConfigDict
+
+from ..cache import DiskCache, cache_key
+
+# Whether sub-agent model responses are cached at all, and which agents
+# (by name, comma separated) always go to the model.
+LLM_CACHE_ENABLED = os.environ.get("OCTO_GUIDE_LLM_CACHE", "1") != "0"
+LLM_CACHE_OPT_OUT = {
+    name.strip()
+    for name in os.environ.get("OCTO_GUIDE_LLM_CACHE_OPT_OUT", "").split(",")
+    if name.strip()
+}
+
+# Model responses keyed by the fingerprint of the request that produced them.
+response_cache = DiskCache(
+    "llm_responses",
+    max_bytes=int(os.environ.get("OCTO_GUIDE_LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    ttl_seconds=float(os.environ.get("OCTO_GUIDE_LLM_CACHE_TTL", 7 * 24 * 3600)),
+)
+
+
+def _without_call_ids(value: Any) -> Any:
+    """
+    Drops the ids of function calls and responses, which are generated per
+    session and would otherwise make identical requests look different.
+    """
+    if isinstance(value, dict):
+        return {
+            key: _without_call_ids(item)
+            for key, item in value.items()
+            if not (key == "id" and ("name" in value and ("args" in value or "response" in value)))
+        }
+    if isinstance(value, list):
+        return [_without_call_ids(item) for item in value]
+    return value
+
+
+def request_fingerprint(model: str, llm_request: LlmRequest, stream: bool = False) -> str:
+    """
+    Hashes everything about `llm_request` that affects the response: the
+    model, the system instruction, the contents, the tools and the
+    generation settings.
+    """
+    config = llm_request.config.model_dump(mode="json", exclude_none=True)
+    config.pop("http_options", None)
+    normalized = {
+        "model": llm_request.model or model,
+        "stream": stream,
+        "contents": [
+            content.model_dump(mode="json", exclude_none=True)
+            for content in llm_request.contents
+        ],
+        "config": config,
+    }
+    return cache_key(json.dumps(_without_call_ids(normalized), sort_keys=True, default=str))
+
+
+class CachingLlm(BaseLlm):
+    """
+    Wraps a model and serves repeated requests from `cache`. Responses are
+    stored only when the whole turn completed without an error, and are
+    replayed in the order the wrapped model produced them, marked with
+    `custom_metadata["cache_hit"]`.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseLlm
+    cache: Any = None
+
+    def __init__(self, inner: BaseLlm, cache: DiskCache = None, **kwargs):
+        super().__init__(model=inner.model, inner=inner, cache=cache or response_cache, **kwargs)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_fingerprint(self.inner.model, llm_request, stream)
+        cached = self.cache.get(key)
+        if cached is not None:
+            for response in cached:
+                response = LlmResponse.model_validate(response)
+                response.custom_metadata = {**(response.custom_metadata or {}), "cache_hit": True}
+                yield response
+            return
+
+        responses = []
+        failed = False
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            failed = failed or bool(response.error_code)
+            responses.append(_without_call_ids(response.model_dump(mode="json", exclude_none=True)))
+            yield response
+        if responses and not failed:
+            self.cache.put(key, responses)
+
+
+def with_response_cache(agent: LlmAgent) -> LlmAgent:
+    """
+    Puts a response cache in front of `agent`'s model, unless caching is
+    disabled or the agent opted out of it. Returns the agent.
+    """
+    if (
+        LLM_CACHE_ENABLED
+        and agent.name not in LLM_CACHE_OPT_OUT
+        and isinstance(agent.model, BaseLlm)
+        and not isinstance(agent.model, CachingLlm)
+    ):
+        agent.model = CachingLlm(agent.model)
+    return agent
@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import random
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+from pydantic import Field, PrivateAttr
+
+from ..context_packer import estimate_tokens
+
+
+class FakeLlm(BaseLlm):
+    """
+    A deterministic stand-in for a real model, for tests and benchmarks.
+
+    The reply to a request is the value of the first key of `responses` that
+    occurs in its system instruction, or else an echo of the last user
+    message. Every call sleeps for `latency` seconds first, so concurrency
+    can be measured without a network. When streaming, the reply arrives as
+    one partial response per word, followed by the complete reply. Token
+    usage is reported with the local estimate. Subclasses can answer with
+    function calls by overriding `respond`.
+
+    Faults can be injected: a `failure_rate` fraction of calls fail with a
+    503 after the usual latency, and a `tail_rate` fraction take
+    `tail_latency` seconds instead, drawn from a generator seeded by `seed`.
+    """
+
+    model: str = "fake"
+    responses: Dict[str, str] = Field(default_factory=dict)
+    latency: float = 0.0
+    requests: List[LlmRequest] = Field(default_factory=list)
+    failure_rate: float = 0.0
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+    seed: Optional[int] = None
+    _random: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, context) -> None:
+        self._random = random.Random(self.seed)
+
+    def reply(self, llm_request: LlmRequest) -> str:
+        instruction = str(llm_request.config.system_instruction or "")
+        for key, response in self.responses.items():
+            if key in instruction:
+                return response
+        for content in reversed(llm_request.contents or []):
+            texts = [part.text for part in content.parts or [] if part.text]
+            if content.role == "user" and texts:
+                return f"Fake response to: {' '.join(texts)}"
+        return "Fake response."
+
+    def respond(self, llm_request: LlmRequest) -> types.Part:
+        return types.Part(text=self.reply(llm_request))
+
+    def _usage(self, llm_request: LlmRequest, part: types.Part) -> types.GenerateContentResponseUsageMetadata:
+        prompt = [str(llm_request.config.system_instruction or "")]
+        for content in llm_request.contents or []:
+            prompt.extend(str(p.model_dump(exclude_none=True)) for p in content.parts or [])
+        prompt_tokens = estimate_tokens("\n".join(prompt))
+        completion_tokens = estimate_tokens(part.text or str(part.model_dump(exclude_none=True)))
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=completion_tokens,
+            total_token_count=prompt_tokens + completion_tokens,
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(llm_request)
+        fails = self._random.random() < self.failure_rate
+        slow = self._random.random() < self.tail_rate
+        latency = self.tail_latency if slow else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+        if fails:
+            raise errors.ServerError(
+                503, {"error": {"code": 503, "message": "Injected failure.", "status": "UNAVAILABLE"}}
+            )
+        part = self.respond(llm_request)
+        if stream and part.text:
+            for word in part.text.split(" "):
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=f"{word} ")]),
+                    partial=True,
+                )
+                await asyncio.sleep(0)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=self._usage(llm_request, part),
+        )
@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+One shared model client per model name, and agent tools whose agents are
+only built when first used. Sharing the client means one auth setup and one
+connection pool for every agent in the process.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools.agent_tool import AgentTool
+
+# The model used by every agent unless one is asked for by name.
+DEFAULT_MODEL = os.environ.get("OCTO_GUIDE_MODEL")
+
+_models: Dict[Optional[str], BaseLlm] = {}
+_models_lock = threading.Lock()
+
+
+def shared_model(model: Optional[str] = None) -> BaseLlm:
+    """Returns the process-wide client for `model` (default: DEFAULT_MODEL)."""
+    model = model or DEFAULT_MODEL
+    with _models_lock:
+        if model not in _models:
+            from google.adk.models import Gemini
+
+            _models[model] = Gemini(model=model) if model else Gemini()
+        return _models[model]
+
+
+def register_model(llm: BaseLlm, model: Optional[str] = None) -> None:
+    """Makes `shared_model(model)` return `llm`, e.g. a fake in tests."""
+    with _models_lock:
+        _models[model or DEFAULT_MODEL] = llm
+
+
+class LazyAgentTool(AgentTool):
+    """
+    An AgentTool whose agent is built by `factory` the first time the tool
+    is declared to the model or run, instead of when the tool is created.
+    Until then only the name is set; reading any other attribute builds the
+    agent and runs `AgentTool.__init__` with it and `options`.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], BaseAgent], **options: Any):
+        self.name = name
+        self._factory = factory
+        self._options = options
+        self._build_lock = threading.Lock()
+        self._built = False
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        self._build()
+        return object.__getattribute__(self, attribute)
+
+    def _build(self) -> None:
+        with self._build_lock:
+            if not self._built:
+                agent = self._factory()
+                if agent.name != self.name:
+                    raise ValueError(f"Tool {self.name} built agent {agent.name}")
+                super().__init__(agent, **self._options)
+                self._built = True
+
+    @property
+    def built(self) -> bool:
+        return self._built
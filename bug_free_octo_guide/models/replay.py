@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Record/replay for model calls. Responses are recorded to fixture files keyed
+by the request fingerprint, so tests can replay them without a network.
+"""
+
+import json
+import os
+import tempfile
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import ConfigDict
+
+from .cache import _without_call_ids, request_fingerprint
+
+# "live" calls the model, "record" calls it and (re)writes every recording,
+# "replay" only serves recordings and fails on anything unrecorded, and
+# "auto" replays what is recorded and records the rest.
+LLM_MODES = ("live", "record", "replay", "auto")
+
+
+def llm_mode(default: str = "live") -> str:
+    """Returns the mode set by OCTO_GUIDE_LLM_MODE."""
+    mode = os.environ.get("OCTO_GUIDE_LLM_MODE", default)
+    if mode not in LLM_MODES:
+        raise ValueError(f"OCTO_GUIDE_LLM_MODE must be one of {LLM_MODES}, not {mode!r}")
+    return mode
+
+
+class UnrecordedRequestError(LookupError):
+    """Raised in replay mode for a request that has no recording."""
+
+
+def _describe(llm_request: LlmRequest) -> dict:
+    """A human readable outline of a request, stored next to its responses."""
+    last_text = ""
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                last_text = part.text
+    return {
+        "system_instruction": str(llm_request.config.system_instruction or "")[:200],
+        "contents": len(llm_request.contents),
+        "last_text": last_text[:500],
+    }
+
+
+class Recorder:
+    """Reads and writes the recordings of one directory."""
+
+    def __init__(self, directory: str, mode: str):
+        if mode not in LLM_MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint[:24]}.json")
+
+    def load(self, fingerprint: str) -> Optional[list]:
+        try:
+            with open(self._path(fingerprint)) as f:
+                return json.load(f)["responses"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, fingerprint: str, llm_request: LlmRequest, responses: list) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(
+                {"request": _describe(llm_request), "responses": responses},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        os.replace(tmp_path, self._path(fingerprint))
+
+    async def generate(
+        self,
+        model: str,
+        llm_request: LlmRequest,
+        stream: bool,
+        live: Callable[[], AsyncGenerator[LlmResponse, None]],
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Serves `llm_request` according to the mode, calling `live()` for
+        the real responses when they are needed.
+        """
+        if self.mode == "live":
+            async for response in live():
+                yield response
+            return
+
+        fingerprint = request_fingerprint(model, llm_request, stream)
+        recorded = None if self.mode == "record" else self.load(fingerprint)
+        if recorded is not None:
+            for response in recorded:
+                yield LlmResponse.model_validate(response)
+            return
+        if self.mode == "replay":
+            raise UnrecordedRequestError(
+                f"No recording for request {fingerprint[:24]} in {self.directory} "
+                f"({_describe(llm_request)['last_text'][:80]!r}). "
+                "Run with OCTO_GUIDE_LLM_MODE=record to record it."
+            )
+
+        responses = []
+        async for response in live():
+            responses.append(_without_call_ids(response.model_dump(mode="json", exclude_none=True)))
+            yield response
+        if not any(response.get("error_code") for response in responses):
+            self.save(fingerprint, llm_request, responses)
+
+
+class ReplayLlm(BaseLlm):
+    """Wraps a model so its calls are recorded to, or replayed from, `recorder`."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseLlm
+    recorder: Recorder
+
+    def __init__(self, inner: BaseLlm, recorder: Recorder, **kwargs):
+        super().__init__(model=inner.model, inner=inner, recorder=recorder, **kwargs)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.recorder.generate(
+            self.inner.model,
+            llm_request,
+            stream,
+            lambda: self.inner.generate_content_async(llm_request, stream),
+        ):
+            yield response
@@ -0,0 +1,368 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Keeps one slow or failing model call from stalling a session. Each call to
+the backend is retried on transient errors after a jittered backoff, and
+when it has not answered by a high percentile of recent latencies a
+duplicate is sent and whichever answers first is used. Retries and hedges
+are extra load, so each session may only make a bounded fraction of extra
+calls. A circuit breaker stops calling a backend that keeps failing, so
+callers fail fast (and the router can move to the next tier) until it
+recovers.
+
+Configuration:
+    OCTO_GUIDE_MODEL_RETRIES  retries after the first attempt (default 3)
+    OCTO_GUIDE_RETRY_BUDGET  extra calls earned per call, e.g. "0.2", and
+        the most a session can save up, e.g. "0.2,5"
+    OCTO_GUIDE_HEDGE_PERCENTILE  latency percentile after which a duplicate
+        request is sent (default 95; "0" disables hedging)
+    OCTO_GUIDE_HEDGE_MIN_DELAY  never hedge sooner than this many seconds
+    OCTO_GUIDE_BREAKER_FAILURES  consecutive failures that open the circuit
+    OCTO_GUIDE_BREAKER_COOLDOWN  seconds before an open circuit is probed
+"""
+
+import asyncio
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import AsyncGenerator, Deque, Dict, Optional, Tuple
+
+import httpx
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors
+from pydantic import ConfigDict
+
+from ..telemetry import metrics
+from .registry import shared_model
+
+MODEL_RETRIES = int(os.environ.get("OCTO_GUIDE_MODEL_RETRIES", 3))
+_budget = [float(value) for value in os.environ.get("OCTO_GUIDE_RETRY_BUDGET", "0.2,5").split(",")]
+RETRY_RATIO = _budget[0]
+RETRY_BURST = _budget[1] if len(_budget) > 1 else 5.0
+HEDGE_PERCENTILE = float(os.environ.get("OCTO_GUIDE_HEDGE_PERCENTILE", 95))
+HEDGE_MIN_DELAY = float(os.environ.get("OCTO_GUIDE_HEDGE_MIN_DELAY", 1.0))
+BREAKER_FAILURES = int(os.environ.get("OCTO_GUIDE_BREAKER_FAILURES", 5))
+BREAKER_COOLDOWN = float(os.environ.get("OCTO_GUIDE_BREAKER_COOLDOWN", 30))
+# Backoff before retry n is drawn uniformly from [0, min(cap, base * 2**n)].
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# Hedging waits until this many latencies of a backend have been seen.
+MIN_LATENCY_SAMPLES = 20
+
+# HTTP statuses worth retrying: timeouts, rate limits and server errors.
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# The session on whose behalf the current task runs, for its retry budget.
+current_session: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "octo_guide_session", default=""
+)
+
+metrics.describe("octo_guide_model_retries_total", "Model calls retried after a transient error, by model.")
+metrics.describe("octo_guide_model_hedges_total", "Duplicate model calls sent for slow calls, by model and which answered first.")
+metrics.describe("octo_guide_model_retry_budget_exhausted_total", "Retries or hedges skipped because the session's budget was spent, by model.")
+metrics.describe("octo_guide_model_circuit_open", "1 while the circuit of a model backend is open, by model.")
+metrics.describe("octo_guide_model_circuit_rejections_total", "Model calls refused because the circuit was open, by model.")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(f"Model {model} is failing; not calling it for {retry_after:.0f}s.")
+        self.model = model
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether `error` is transient: a timeout, a dropped connection, a 429 or a 5xx."""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class RetryBudget:
+    """
+    A token bucket of extra attempts: every call earns `ratio` of one, up to
+    `burst`, and every retry or hedge spends one.
+    """
+
+    def __init__(self, ratio: float = RETRY_RATIO, burst: float = RETRY_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.balance = burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.balance = min(self.burst, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spends one extra attempt; returns False if none is left."""
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class RetryBudgets:
+    """The retry budget of each session, keeping the `size` most recently used."""
+
+    def __init__(self, size: int = 4096):
+        self.size = size
+        self._budgets: "OrderedDict[str, RetryBudget]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session: str) -> RetryBudget:
+        with self._lock:
+            budget = self._budgets.pop(session, None) or RetryBudget()
+            self._budgets[session] = budget
+            while len(self._budgets) > self.size:
+                self._budgets.popitem(last=False)
+            return budget
+
+
+retry_budgets = RetryBudgets()
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures. Once `cooldown` seconds
+    have passed a single probe call is let through: its success closes the
+    circuit, its failure opens it again.
+    """
+
+    def __init__(self, model: str, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.model = model
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def check(self) -> None:
+        """Raises CircuitOpenError unless a call may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited >= self.cooldown and not self._probing:
+                self._probing = True
+                return
+            metrics.inc("octo_guide_model_circuit_rejections_total", model=self.model)
+            raise CircuitOpenError(self.model, max(0.0, self.cooldown - waited))
+
+    def success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+            metrics.set("octo_guide_model_circuit_open", 0, model=self.model)
+
+    def abandon(self) -> None:
+        """Lets another probe through when a probe was cancelled."""
+        with self._lock:
+            self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._probing = False
+                metrics.set("octo_guide_model_circuit_open", 1, model=self.model)
+
+
+class LatencyWindow:
+    """The latencies of the last `size` calls, for percentiles."""
+
+    def __init__(self, size: int = 200):
+        self._values: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._values.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the `percent`th percentile, or None until enough calls were seen."""
+        with self._lock:
+            if len(self._values) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _copy_request(llm_request: LlmRequest) -> LlmRequest:
+    """Copies what a backend may modify while sending a request."""
+    return llm_request.model_copy(
+        update={
+            "contents": [content.model_copy(deep=True) for content in llm_request.contents],
+            "config": llm_request.config.model_copy(deep=True) if llm_request.config else None,
+        }
+    )
+
+
+def _discard(attempt: "asyncio.Future") -> None:
+    """Cancels an attempt that lost the race, closing its stream if it had one."""
+    if not attempt.done():
+        attempt.cancel()
+        attempt.add_done_callback(lambda f: f.cancelled() or f.exception())
+    elif not attempt.cancelled() and attempt.exception() is None:
+        asyncio.ensure_future(attempt.result()[0].aclose())
+
+
+class ResilientLlm(BaseLlm):
+    """
+    Calls `llm` with retries, hedging and a circuit breaker. An attempt
+    counts as answered once its first response arrives (the whole response
+    when not streaming); after that the stream is passed through as is.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    llm: BaseLlm
+    retries: int = MODEL_RETRIES
+    hedge_percentile: float = HEDGE_PERCENTILE
+    hedge_min_delay: float = HEDGE_MIN_DELAY
+    breaker: CircuitBreaker
+    latencies: LatencyWindow
+    budgets: RetryBudgets = retry_budgets
+
+    def __init__(self, llm: BaseLlm, **kwargs):
+        kwargs.setdefault("breaker", CircuitBreaker(llm.model))
+        kwargs.setdefault("latencies", LatencyWindow())
+        super().__init__(model=llm.model, llm=llm, **kwargs)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a duplicate is sent, or None to not hedge."""
+        if not self.hedge_percentile:
+            return None
+        percentile = self.latencies.percentile(self.hedge_percentile)
+        return None if percentile is None else max(percentile, self.hedge_min_delay)
+
+    async def _first(
+        self, llm_request: LlmRequest, stream: bool
+    ) -> Tuple[AsyncGenerator[LlmResponse, None], Optional[LlmResponse]]:
+        started = time.perf_counter()
+        responses = self.llm.generate_content_async(llm_request, stream)
+        try:
+            first = await responses.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except BaseException:
+            await responses.aclose()
+            raise
+        self.latencies.record(time.perf_counter() - started)
+        return responses, first
+
+    async def _attempt(
+        self, llm_request: LlmRequest, stream: bool, budget: RetryBudget
+    ) -> Tuple[AsyncGenerator[LlmResponse, None], Optional[LlmResponse]]:
+        """Makes one attempt, hedged if it is slow; returns the first to answer."""
+        attempts = [asyncio.ensure_future(self._first(llm_request, stream))]
+        winner = None
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    if budget.withdraw():
+                        hedge = self._first(_copy_request(llm_request), stream)
+                        attempts.append(asyncio.ensure_future(hedge))
+                    else:
+                        metrics.inc("octo_guide_model_retry_budget_exhausted_total", model=self.model)
+            pending = set(attempts)
+            while winner is None and pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((a for a in attempts if a in done and a.exception() is None), None)
+            if len(attempts) > 1:
+                metrics.inc(
+                    "octo_guide_model_hedges_total",
+                    model=self.model,
+                    winner="hedge" if winner is attempts[1] else "primary",
+                )
+            if winner is None:
+                raise attempts[-1].exception()
+            return winner.result()
+        finally:
+            for attempt in attempts:
+                if attempt is not winner:
+                    _discard(attempt)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        budget = self.budgets.get(current_session.get())
+        budget.deposit()
+        for retry in range(self.retries + 1):
+            self.breaker.check()
+            try:
+                responses, first = await self._attempt(llm_request, stream, budget)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The backend answered, if only to refuse the request.
+                    self.breaker.success()
+                    raise
+                self.breaker.failure()
+                if retry == self.retries:
+                    raise
+                if not budget.withdraw():
+                    metrics.inc("octo_guide_model_retry_budget_exhausted_total", model=self.model)
+                    raise
+                metrics.inc("octo_guide_model_retries_total", model=self.model)
+                await asyncio.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**retry)))
+                continue
+            self.breaker.success()
+            break
+
+        try:
+            if first is not None:
+                yield first
+            async for response in responses:
+                yield response
+        finally:
+            await responses.aclose()
+
+
+_resilient: Dict[Optional[str], ResilientLlm] = {}
+_resilient_lock = threading.Lock()
+
+
+def resilient_model(model: Optional[str] = None) -> ResilientLlm:
+    """
+    Returns the process-wide resilient client for `model`, wrapping
+    `shared_model(model)`, so every agent on a backend shares its circuit
+    breaker and latency history.
+    """
+    llm = shared_model(model)
+    with _resilient_lock:
+        if model not in _resilient or _resilient[model].llm is not llm:
+            _resilient[model] = ResilientLlm(llm)
+        return _resilient[model]
@@ -0,0 +1,192 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Routes each agent to a model tier. Agents whose turns are simple (the
+orchestrator mostly gathers tool arguments, the ticketing agent mostly
+formats) use a fast model, the solution design uses the strongest one.
+When a cheaper tier's response fails validation the request is retried on
+the next tier up. Routing decisions, escalations and per-tier latency are
+recorded in the process metrics.
+
+Configuration (comma separated `key=value` pairs):
+    OCTO_GUIDE_MODEL_TIERS  tier to model name, e.g. "fast=gemini-2.5-flash-lite"
+    OCTO_GUIDE_AGENT_TIERS  agent name to tier, e.g. "db_schema_agent=strong"
+    OCTO_GUIDE_MODEL_ESCALATION  "0" disables retrying on a larger model
+"""
+
+import json
+import os
+import time
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import ConfigDict
+
+from ..scheduler import model_calls
+from ..telemetry import metrics
+from .registry import DEFAULT_MODEL
+from .resilience import CircuitOpenError, resilient_model
+
+# Tiers from cheapest to largest.
+TIERS = ("fast", "standard", "strong")
+DEFAULT_AGENT_TIERS = {
+    "bug_free_octo_guide": "fast",
+    "ticketing_agent": "fast",
+    "solution_proposal_agent": "strong",
+}
+ESCALATION_ENABLED = os.environ.get("OCTO_GUIDE_MODEL_ESCALATION", "1") != "0"
+
+metrics.describe("octo_guide_model_routed_total", "Model calls answered, by agent and tier.")
+metrics.describe("octo_guide_model_escalations_total", "Responses that failed validation and were retried on a larger tier.")
+metrics.describe("octo_guide_model_tier_duration_seconds", "Model call latency, by tier.")
+
+
+def _pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        key, _, setting = item.partition("=")
+        if key.strip() and setting.strip():
+            pairs[key.strip()] = setting.strip()
+    return pairs
+
+
+def tier_models() -> Dict[str, Optional[str]]:
+    """Returns the model name of each tier; unconfigured tiers use DEFAULT_MODEL."""
+    configured = _pairs(os.environ.get("OCTO_GUIDE_MODEL_TIERS", ""))
+    return {tier: configured.get(tier, DEFAULT_MODEL) for tier in TIERS}
+
+
+def agent_tier(agent_name: str) -> str:
+    """Returns the tier configured for `agent_name` (default "standard")."""
+    tiers = {**DEFAULT_AGENT_TIERS, **_pairs(os.environ.get("OCTO_GUIDE_AGENT_TIERS", ""))}
+    tier = tiers.get(agent_name, "standard")
+    if tier not in TIERS:
+        raise ValueError(f"Unknown model tier {tier!r} for {agent_name}; expected one of {TIERS}.")
+    return tier
+
+
+def validation_error(llm_request: LlmRequest, responses: List[LlmResponse]) -> Optional[str]:
+    """
+    Returns why `responses` are not a usable answer to `llm_request`: an
+    error, no content, a call to a tool the agent does not have, or text
+    that is not JSON when JSON was asked for. Returns None if they are.
+    """
+    final = [response for response in responses if not response.partial]
+    if not final:
+        return "no response"
+    parts = []
+    for response in final:
+        if response.error_code:
+            return f"error {response.error_code}"
+        parts.extend((response.content.parts if response.content else None) or [])
+    calls = [part.function_call for part in parts if part.function_call]
+    text = "".join(part.text or "" for part in parts if not part.thought)
+    if not calls and not text.strip():
+        return "empty response"
+    for call in calls:
+        if llm_request.tools_dict and call.name not in llm_request.tools_dict:
+            return f"unknown tool {call.name}"
+    if not calls and llm_request.config.response_mime_type == "application/json":
+        try:
+            json.loads(text)
+        except json.JSONDecodeError:
+            return "invalid JSON"
+    return None
+
+
+class RoutedLlm(BaseLlm):
+    """
+    Sends `agent`'s requests to the first of `tiers` ([(tier, model)],
+    cheapest first). While a larger tier remains, the final response is held
+    back until `validate` accepts it, and retried on the next tier otherwise;
+    partial chunks of a streamed response are passed on as they arrive, and
+    the final response of whichever tier answers replaces them. The last
+    tier's response is passed on as it arrives. A tier whose circuit is
+    open is skipped. Every call waits for a slot of the process-wide model
+    call limit.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    agent: str
+    tiers: List[Tuple[str, BaseLlm]]
+    validate_response: Callable[[LlmRequest, List[LlmResponse]], Optional[str]] = validation_error
+
+    def __init__(self, agent: str, tiers: List[Tuple[str, BaseLlm]], **kwargs):
+        super().__init__(model=tiers[0][1].model, agent=agent, tiers=tiers, **kwargs)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        for i, (tier, llm) in enumerate(self.tiers):
+            request = llm_request.model_copy(update={"model": llm.model})
+            if i == len(self.tiers) - 1:
+                async with model_calls.slot():
+                    started = time.perf_counter()
+                    async for response in llm.generate_content_async(request, stream):
+                        yield response
+                    self._record(tier, started)
+                return
+
+            responses = []
+            try:
+                async with model_calls.slot():
+                    started = time.perf_counter()
+                    async for response in llm.generate_content_async(request, stream):
+                        if stream and response.partial:
+                            yield response
+                        else:
+                            responses.append(response)
+                    self._record(tier, started)
+            except CircuitOpenError:
+                # The tier's backend is down; go straight to the next one.
+                pass
+            error = self.validate_response(llm_request, responses)
+            if error is None:
+                for response in responses:
+                    yield response
+                return
+            next_tier = self.tiers[i + 1][0]
+            metrics.inc(
+                "octo_guide_model_escalations_total", agent=self.agent, tier=tier, to_tier=next_tier
+            )
+
+    def _record(self, tier: str, started: float) -> None:
+        metrics.inc("octo_guide_model_routed_total", agent=self.agent, tier=tier)
+        metrics.observe("octo_guide_model_tier_duration_seconds", time.perf_counter() - started, tier=tier)
+
+
+def routed_model(agent_name: str) -> RoutedLlm:
+    """
+    Returns the model for `agent_name`: its configured tier, followed by the
+    larger tiers (with a different model) it escalates to.
+    """
+    models = tier_models()
+    start = TIERS.index(agent_tier(agent_name))
+    tiers, seen = [], set()
+    for tier in TIERS[start:] if ESCALATION_ENABLED else TIERS[start:start + 1]:
+        if models[tier] not in seen:
+            seen.add(models[tier])
+            tiers.append((tier, resilient_model(models[tier])))
+    return RoutedLlm(agent_name, tiers)
+
+
+def with_model_routing(agent: LlmAgent) -> LlmAgent:
+    """Replaces `agent`'s model with the routed model for its name. Returns the agent."""
+    agent.model = routed_model(agent.name)
+    return agent
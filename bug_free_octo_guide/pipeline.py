@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pipeline mode: drafts every PRD section without waiting on the orchestrator,
+running each section agent as soon as the sections it depends on exist, so
+that independent sections are written concurrently.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .agents.api_changes_agent import ApiChangesAgent
+from .agents.db_schema_agent import DbSchemaAgent
+from .agents.implementation_details_agent import ImplementationDetailsAgent
+from .agents.solution_proposal_agent import SolutionProposalAgent
+from .agents.testing_strategy_agent import TestingStrategyAgent
+from .models import shared_model, with_model_routing, with_response_cache
+from .prd import PrdState
+from .prd_library import remember_prd
+from .tools.prd_assembler_tool import assemble_prd
+
+# The sections each section is written from. Goals come from the user.
+SECTION_DEPENDENCIES: Dict[str, List[str]] = {
+    "solution": ["goals"],
+    "api_changes": ["solution"],
+    "db_schema": ["solution"],
+    "implementation": ["solution"],
+    "testing": ["solution"],
+}
+
+SECTION_AGENTS = {
+    "solution": SolutionProposalAgent,
+    "api_changes": ApiChangesAgent,
+    "db_schema": DbSchemaAgent,
+    "implementation": ImplementationDetailsAgent,
+    "testing": TestingStrategyAgent,
+}
+
+SECTION_REQUESTS = {
+    "solution": "Propose a technical solution for this feature.",
+    "api_changes": "Write the API changes section of the PRD for this feature.",
+    "db_schema": "Write the database schema changes section of the PRD for this feature.",
+    "implementation": "Write the implementation details section of the PRD for this feature.",
+    "testing": "Write the testing strategy section of the PRD for this feature.",
+}
+# Added to the request when the section already has a draft, such as one
+# seeded from a similar PRD in the library.
+REVISION_REQUEST = (
+    "A draft of this section is in your context. Revise it for this feature, "
+    "keeping what still applies, rather than starting over."
+)
+
+
+async def run_graph(
+    dependencies: Dict[str, List[str]],
+    run_node: Callable[[str, Dict[str, str]], Awaitable[str]],
+    done: Dict[str, str],
+) -> Dict[str, str]:
+    """
+    Runs every node of `dependencies` ({node: [nodes it needs]}) with
+    `run_node(node, results so far)`, starting each node as soon as all of
+    its dependencies are in the results. `done` seeds the results.
+    If a node fails, the others are cancelled and the error is raised.
+    """
+    results = dict(done)
+    pending = {node: set(deps) for node, deps in dependencies.items() if node not in results}
+    missing = {dep for deps in pending.values() for dep in deps} - set(results) - set(pending)
+    if missing:
+        raise ValueError(f"Unknown dependencies: {sorted(missing)}")
+
+    running: Dict[asyncio.Task, str] = {}
+    try:
+        while pending or running:
+            for node in [node for node, deps in pending.items() if deps <= set(results)]:
+                del pending[node]
+                running[asyncio.create_task(run_node(node, dict(results)))] = node
+            if not running:
+                raise ValueError(f"Dependency cycle between {sorted(pending)}")
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                results[running.pop(task)] = task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return results
+
+
+async def run_agent(agent: LlmAgent, message: str, state: dict, plugins: Optional[list] = None) -> tuple:
+    """
+    Runs `agent` on `message` in a fresh session seeded with a copy of
+    `state`, like `AgentTool` does, and returns (final text, state delta).
+    `plugins` are usually those of the calling runner.
+    """
+    runner = InMemoryRunner(agent=agent, app_name=agent.name, plugins=plugins)
+    session = await runner.session_service.create_session(
+        app_name=agent.name, user_id="pipeline", state=dict(state)
+    )
+    text, state_delta = "", {}
+    async for event in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+    ):
+        state_delta.update(event.actions.state_delta)
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+    return text, state_delta
+
+
+class PrdPipeline:
+    """Drafts all PRD sections with one agent per section, concurrently where possible."""
+
+    def __init__(self, llm: BaseLlm):
+        self.agents = {section: agent_class(llm=llm) for section, agent_class in SECTION_AGENTS.items()}
+
+    async def run(self, feature_description: str, state: dict, plugins: Optional[list] = None) -> dict:
+        """
+        Writes every section for `feature_description` from the session
+        `state`, which must hold the goals. Returns the assembled PRD, the
+        sections and how many seconds each section took.
+        """
+        if not state.get("goals"):
+            raise ValueError("The goals must be defined before drafting the PRD.")
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        async def write_section(section: str, sections: Dict[str, str]) -> str:
+            section_started = time.perf_counter()
+            agent = self.agents[section]
+            request = SECTION_REQUESTS[section]
+            if state.get(section):
+                request = f"{request} {REVISION_REQUEST}"
+            text, state_delta = await run_agent(
+                agent,
+                f"{request}\n\nFeature: {feature_description}",
+                {**state, **sections},
+                plugins,
+            )
+            timings[section] = time.perf_counter() - section_started
+            return state_delta.get(agent.output_key) or text
+
+        sections = await run_graph(SECTION_DEPENDENCIES, write_section, {"goals": state["goals"]})
+        logging.info(f"Drafted PRD sections in {time.perf_counter() - started:.1f}s: {timings}")
+        return {
+            "prd": assemble_prd(**sections),
+            "sections": sections,
+            "timings": timings,
+        }
+
+
+_pipeline: Optional[PrdPipeline] = None
+
+
+def default_pipeline() -> PrdPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = PrdPipeline(shared_model())
+        for agent in _pipeline.agents.values():
+            with_response_cache(with_model_routing(agent))
+    return _pipeline
+
+
+def _parent_plugins(tool_context: ToolContext) -> Optional[list]:
+    invocation_context = getattr(tool_context, "_invocation_context", None)
+    return invocation_context.plugin_manager.plugins if invocation_context else None
+
+
+async def draft_prd(feature_description: str, tool_context: ToolContext) -> dict:
+    """
+    Drafts every PRD section at once from the goals defined so far, writing
+    independent sections concurrently, and assembles the PRD.
+
+    Args:
+        feature_description: A description of the feature the PRD is for.
+    """
+    state = tool_context.state.to_dict()
+    try:
+        result = await default_pipeline().run(
+            feature_description, state, _parent_plugins(tool_context)
+        )
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    prd = PrdState(tool_context.state)
+    for section, text in result["sections"].items():
+        version = prd.update(section, text)["document_version"]
+    await remember_prd(tool_context.state, feature_description)
+    return {"success": True, "prd": result["prd"], "version": version}
@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The PRD as structured session state. Each section's content lives under its
+own state key (where the section agents write it); the "prd" key records a
+version and content hash per section, so changes are detected, only changed
+sections need re-rendering, and callers can ask for what changed since a
+version instead of the whole document.
+"""
+
+import difflib
+import functools
+import hashlib
+from typing import Dict, List, Optional
+
+from .context_packer import SECTIONS
+
+PRD_STATE_KEY = "prd"
+
+SECTION_TITLES = {
+    "goals": "Goals",
+    "solution": "Solution",
+    "api_changes": "API Changes",
+    "db_schema": "DB Schema",
+    "implementation": "Implementation",
+    "testing": "Testing",
+}
+
+_HEADER = "\n# Product Requirements Document\n"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=512)
+def render_section(section: str, content: str) -> str:
+    return f"\n## {SECTION_TITLES[section]}\n{content}\n"
+
+
+def render_document(sections: Dict[str, str]) -> str:
+    """Renders every section, in order, as one markdown document."""
+    return _HEADER + "".join(
+        render_section(section, sections.get(section) or "") for section in SECTIONS
+    )
+
+
+def section_diff(old: str, new: str, section: str) -> str:
+    """A unified diff of one section's content."""
+    return "\n".join(
+        difflib.unified_diff(
+            old.splitlines(), new.splitlines(), f"{section}@old", f"{section}@new", lineterm="", n=1
+        )
+    )
+
+
+class PrdState:
+    """Reads and updates the structured PRD kept in a session's state."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def _meta(self) -> dict:
+        meta = self.state.get(PRD_STATE_KEY) or {}
+        return {"version": meta.get("version", 0), "sections": dict(meta.get("sections", {}))}
+
+    def content(self, section: str) -> str:
+        return str(self.state.get(section) or "")
+
+    def sync(self) -> List[str]:
+        """
+        Bumps the version of every section whose content changed since it
+        was last recorded, including sections written straight to the state
+        by the section agents. Returns the changed sections.
+        """
+        meta = self._meta()
+        changed = []
+        for section in SECTIONS:
+            digest = content_hash(self.content(section))
+            recorded = meta["sections"].get(section)
+            if recorded is not None and recorded["hash"] == digest:
+                continue
+            if recorded is None and not self.content(section):
+                continue
+            meta["version"] += 1
+            meta["sections"][section] = {
+                "hash": digest,
+                "version": (recorded or {}).get("version", 0) + 1,
+                "changed_at": meta["version"],
+            }
+            changed.append(section)
+        if changed:
+            self.state[PRD_STATE_KEY] = meta
+        return changed
+
+    def update(self, section: str, content: str) -> dict:
+        """Replaces one section, returning its new version and a diff."""
+        if section not in SECTION_TITLES:
+            raise ValueError(f"Unknown section {section!r}; expected one of {SECTIONS}.")
+        self.sync()
+        old = self.content(section)
+        self.state[section] = content
+        changed = section in self.sync()
+        meta = self._meta()
+        return {
+            "section": section,
+            "version": meta["sections"].get(section, {}).get("version", 0),
+            "document_version": meta["version"],
+            "changed": changed,
+            "diff": section_diff(old, content, section) if changed else "",
+        }
+
+    def render(self, changed_since: Optional[int] = None) -> dict:
+        """
+        Renders the document, or with `changed_since` only the sections
+        changed after that document version.
+        """
+        self.sync()
+        meta = self._meta()
+        if changed_since is None:
+            sections = {section: self.content(section) for section in SECTIONS}
+            return {"version": meta["version"], "prd": render_document(sections)}
+        return {
+            "version": meta["version"],
+            "changed_sections": {
+                section: render_section(section, self.content(section))
+                for section, info in meta["sections"].items()
+                if info["changed_at"] > changed_since
+            },
+        }
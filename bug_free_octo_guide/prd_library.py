@@ -0,0 +1,366 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local library of every assembled PRD, with the repositories (and commits)
+and goals it was written for, and a near-duplicate index over its sections.
+
+Each section is reduced to a MinHash signature of its word 3-grams, and the
+signatures are split into bands for locality-sensitive hashing: PRDs that
+share a band with the query in some section are the only candidates that
+get scored, so a search reads a handful of rows however large the library
+grows. The orchestrator seeds a new PRD with the sections of the closest
+match, and the section agents revise those drafts instead of starting over.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from .cache import cache_root
+from .context_packer import SECTIONS
+from .db import Transaction, connect
+from .prd import PrdState
+
+NUM_PERMUTATIONS = 64
+# 16 bands of 4 rows: sections about 70% alike almost always share a band,
+# sections under 30% alike rarely do.
+BANDS = 16
+SHINGLE_WORDS = 3
+# Added to the ranking (not the reported score) of PRDs for the same repository.
+SAME_REPOSITORY_BOOST = 0.05
+# The feature description is indexed alongside the sections.
+INDEXED_FIELDS = ["feature", *SECTIONS]
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(20250101)
+_PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+_WORD = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prds (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    feature TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prd_repositories (
+    prd_id INTEGER NOT NULL,
+    repo_url TEXT NOT NULL,
+    commit_id TEXT,
+    PRIMARY KEY (prd_id, repo_url)
+);
+CREATE TABLE IF NOT EXISTS prd_signatures (
+    prd_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    PRIMARY KEY (prd_id, field)
+);
+CREATE TABLE IF NOT EXISTS prd_bands (
+    band TEXT NOT NULL,
+    field TEXT NOT NULL,
+    prd_id INTEGER NOT NULL,
+    PRIMARY KEY (band, field, prd_id)
+);
+"""
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    grams = [
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    ] if words else []
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+def minhash(text: str) -> List[int]:
+    """The MinHash signature of `text`'s word 3-grams; empty for empty text."""
+    hashes = _shingles(text)
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimates the Jaccard similarity of the texts behind two signatures."""
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def band_keys(signature: List[int]) -> List[str]:
+    rows = len(signature) // BANDS
+    return [
+        f"{band}:" + hashlib.blake2b(
+            json.dumps(signature[band * rows:(band + 1) * rows]).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        for band in range(BANDS)
+    ] if signature else []
+
+
+class PrdLibrary:
+    """
+    Stores PRDs in a SQLite database and finds the ones most like a query.
+    Each thread uses its own connection.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_root(), "prd_library.sqlite3")
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = connect(self.path)
+            self._local.db = db
+        return db
+
+    def add(
+        self,
+        sections: Dict[str, str],
+        feature: str = "",
+        repositories: Optional[Dict[str, str]] = None,
+    ) -> int:
+        """
+        Stores a PRD ({section: content}) written for `feature` against
+        `repositories` ({url: commit}), and returns its id. Storing the same
+        content again returns the existing id.
+        """
+        sections = {section: sections.get(section) or "" for section in SECTIONS}
+        digest = hashlib.sha256(json.dumps(sections, sort_keys=True).encode("utf-8")).hexdigest()
+        fields = {"feature": feature, **sections}
+        signatures = {field: minhash(text) for field, text in fields.items()}
+        with Transaction(self._db()) as db:
+            row = db.execute("SELECT id FROM prds WHERE content_hash = ?", (digest,)).fetchone()
+            if row:
+                return row[0]
+            data = zlib.compress(json.dumps(sections).encode("utf-8"))
+            prd_id = db.execute(
+                "INSERT INTO prds (created, feature, content_hash, data) VALUES (?, ?, ?, ?)",
+                (time.time(), feature, digest, data),
+            ).lastrowid
+            db.executemany(
+                "INSERT INTO prd_repositories (prd_id, repo_url, commit_id) VALUES (?, ?, ?)",
+                [(prd_id, url, commit) for url, commit in (repositories or {}).items()],
+            )
+            for field, signature in signatures.items():
+                if not signature:
+                    continue
+                db.execute(
+                    "INSERT INTO prd_signatures (prd_id, field, signature) VALUES (?, ?, ?)",
+                    (prd_id, field, json.dumps(signature)),
+                )
+                db.executemany(
+                    "INSERT OR IGNORE INTO prd_bands (band, field, prd_id) VALUES (?, ?, ?)",
+                    [(band, field, prd_id) for band in band_keys(signature)],
+                )
+            return prd_id
+
+    def _repositories(self, db, prd_id: int) -> Dict[str, str]:
+        return dict(
+            db.execute(
+                "SELECT repo_url, commit_id FROM prd_repositories WHERE prd_id = ?", (prd_id,)
+            ).fetchall()
+        )
+
+    def get(self, prd_id: int) -> Optional[dict]:
+        """Returns {"id", "feature", "created", "repositories", "sections"}, or None."""
+        db = self._db()
+        row = db.execute(
+            "SELECT feature, created, data FROM prds WHERE id = ?", (prd_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": prd_id,
+            "feature": row[0],
+            "created": row[1],
+            "repositories": self._repositories(db, prd_id),
+            "sections": json.loads(zlib.decompress(row[2])),
+        }
+
+    def search(
+        self,
+        query: Dict[str, str],
+        repo_url: Optional[str] = None,
+        limit: int = 3,
+        min_score: float = 0.1,
+    ) -> List[dict]:
+        """
+        Returns up to `limit` stored PRDs most like `query` ({field: text},
+        fields being "feature" or section names), best first. The score is
+        the estimated similarity averaged over the query's fields; PRDs for
+        `repo_url` get a small boost in the ranking, enough to break near
+        ties but not to outrank a clearly closer match.
+        """
+        signatures = {
+            field: minhash(text) for field, text in query.items() if field in INDEXED_FIELDS and text
+        }
+        signatures = {field: signature for field, signature in signatures.items() if signature}
+        if not signatures:
+            return []
+        db = self._db()
+        candidates = set()
+        for field, signature in signatures.items():
+            bands = band_keys(signature)
+            candidates.update(
+                prd_id
+                for (prd_id,) in db.execute(
+                    f"SELECT DISTINCT prd_id FROM prd_bands WHERE field = ? AND band IN ({','.join('?' * len(bands))})",
+                    [field, *bands],
+                )
+            )
+
+        matches = []
+        for prd_id in candidates:
+            stored = dict(
+                db.execute(
+                    "SELECT field, signature FROM prd_signatures WHERE prd_id = ?", (prd_id,)
+                ).fetchall()
+            )
+            score = sum(
+                similarity(signature, json.loads(stored[field])) if field in stored else 0.0
+                for field, signature in signatures.items()
+            ) / len(signatures)
+            if score < min_score:
+                continue
+            feature, created = db.execute(
+                "SELECT feature, created FROM prds WHERE id = ?", (prd_id,)
+            ).fetchone()
+            repositories = self._repositories(db, prd_id)
+            matches.append(
+                {
+                    "id": prd_id,
+                    "score": round(score, 3),
+                    "feature": feature,
+                    "created": created,
+                    "repositories": repositories,
+                    "same_repository": repo_url in repositories,
+                }
+            )
+        matches.sort(
+            key=lambda match: match["score"] + SAME_REPOSITORY_BOOST * match["same_repository"],
+            reverse=True,
+        )
+        return matches[:limit]
+
+
+_library: Optional[PrdLibrary] = None
+_library_lock = threading.Lock()
+
+
+def default_library() -> PrdLibrary:
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = PrdLibrary()
+        return _library
+
+
+# Session state key of the feature description, for PRDs assembled later.
+FEATURE_KEY = "feature_description"
+
+
+def _entry(state, feature: str) -> tuple:
+    """Snapshots what `PrdLibrary.add` needs from a session's `state`."""
+    prd = PrdState(state)
+    return (
+        {section: prd.content(section) for section in SECTIONS},
+        feature or str(state.get(FEATURE_KEY) or ""),
+        dict(state.get("repositories") or {}),
+    )
+
+
+async def remember_prd(state, feature: str = "") -> int:
+    """Adds the PRD held in a session's `state` to the library, off the event loop."""
+    entry = _entry(state, feature)
+    return await asyncio.to_thread(lambda: default_library().add(*entry))
+
+
+def remember_prd_soon(state, feature: str = "") -> None:
+    """
+    Like `remember_prd`, for synchronous tools: from inside the event loop
+    the write is handed to a worker thread, otherwise it is done at once.
+    """
+    entry = _entry(state, feature)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        default_library().add(*entry)
+        return
+    write = loop.run_in_executor(None, lambda: default_library().add(*entry))
+    write.add_done_callback(_log_failure)
+
+
+def _log_failure(write: "asyncio.Future") -> None:
+    if not write.cancelled() and write.exception() is not None:
+        logging.error("Failed to add the PRD to the library", exc_info=write.exception())
+
+
+async def search_prd_library(feature_description: str, tool_context: ToolContext) -> dict:
+    """
+    Finds earlier PRDs similar to this feature, preferring ones written for
+    the repository being analyzed, using the goals defined so far.
+
+    Args:
+        feature_description: A description of the feature the PRD is for.
+    """
+    state = tool_context.state
+    state[FEATURE_KEY] = feature_description
+    repo_url = next(iter(state.get("repositories") or {}), None)
+    query = {"feature": feature_description, "goals": str(state.get("goals") or "")}
+    matches = await asyncio.to_thread(lambda: default_library().search(query, repo_url=repo_url))
+    return {"success": True, "matches": matches}
+
+
+async def seed_prd_from_library(prd_id: int, tool_context: ToolContext) -> dict:
+    """
+    Starts the PRD from an earlier one: its sections, except the goals,
+    become the drafts that the section agents then revise for this feature.
+
+    Args:
+        prd_id: The id of a match returned by `search_prd_library`.
+    """
+    stored = await asyncio.to_thread(lambda: default_library().get(prd_id))
+    if stored is None:
+        return {"success": False, "error": f"No PRD with id {prd_id} in the library."}
+    prd = PrdState(tool_context.state)
+    seeded = []
+    for section, content in stored["sections"].items():
+        if section != "goals" and content:
+            version = prd.update(section, content)["document_version"]
+            seeded.append(section)
+    if not seeded:
+        return {"success": False, "error": f"PRD {prd_id} has no sections to reuse."}
+    return {"success": True, "seeded_sections": seeded, "version": version}
@@ -0,0 +1,193 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Admission control and fair scheduling. Chat turns, model calls and
+repository fetches each have their own concurrency limit; whoever is over
+it waits in a queue that is served round-robin across users, so one user
+with many sessions cannot starve the others. When the turn queue is full,
+new turns are refused with an estimate of when to retry, instead of
+waiting until they time out. Queue depth, waiting time and refusals are
+recorded in the process metrics.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from .telemetry import metrics
+
+# The user on whose behalf the current task runs; tasks started from it
+# (sub-agents, tools, background analyses) inherit it.
+current_user: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "octo_guide_user", default="anonymous"
+)
+
+metrics.describe("octo_guide_queue_depth", "Requests waiting for a slot, by resource.")
+metrics.describe("octo_guide_queue_wait_seconds", "Time spent waiting for a slot, by resource.")
+metrics.describe("octo_guide_active_slots", "Slots in use, by resource.")
+metrics.describe("octo_guide_rejected_total", "Requests refused because the queue was full, by resource.")
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when a limiter's queue is full."""
+
+    def __init__(self, resource: str, retry_after: int):
+        super().__init__(f"Too many requests waiting for {resource}; retry in {retry_after}s.")
+        self.resource = resource
+        self.retry_after = retry_after
+
+
+class FairLimiter:
+    """
+    Lets at most `limit` holders use `resource` at once. Waiters are queued
+    per user and served one user at a time in turn. With `max_queue`, a
+    request that finds that many already waiting raises `Overloaded`.
+    Waiters may be on different event loops.
+    """
+
+    def __init__(self, resource: str, limit: int, max_queue: Optional[int] = None):
+        self.resource = resource
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiting = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # Running average of how long a slot is held, for retry estimates.
+        self._average_hold = 1.0
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def _record(self) -> None:
+        metrics.set("octo_guide_queue_depth", self._waiting, resource=self.resource)
+        metrics.set("octo_guide_active_slots", self._active, resource=self.resource)
+
+    def retry_after(self) -> int:
+        """Seconds until a new request would likely get a slot."""
+        return max(1, math.ceil(self._average_hold * (self._waiting + 1) / self.limit))
+
+    def check(self) -> None:
+        """Raises `Overloaded` if a request arriving now would be refused."""
+        with self._lock:
+            if (
+                self.max_queue is not None
+                and self._active >= self.limit
+                and self._waiting >= self.max_queue
+            ):
+                metrics.inc("octo_guide_rejected_total", resource=self.resource)
+                raise Overloaded(self.resource, self.retry_after())
+
+    async def acquire(self, user: Optional[str] = None) -> None:
+        """Waits for a slot; pair every successful call with `release`."""
+        user = user or current_user.get()
+        with self._lock:
+            if self._active < self.limit and not self._waiting:
+                self._active += 1
+                self._record()
+                return
+            if self.max_queue is not None and self._waiting >= self.max_queue:
+                metrics.inc("octo_guide_rejected_total", resource=self.resource)
+                raise Overloaded(self.resource, self.retry_after())
+            future = asyncio.get_running_loop().create_future()
+            self._queues.setdefault(user, deque()).append(future)
+            self._waiting += 1
+            self._record()
+
+        started = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queue = self._queues.get(user)
+                if queue is not None and future in queue:
+                    queue.remove(future)
+                    if not queue:
+                        del self._queues[user]
+                    self._waiting -= 1
+                    self._record()
+                elif not future.cancelled():
+                    # The slot was handed over just before the cancellation.
+                    self._release()
+            raise
+        finally:
+            metrics.observe(
+                "octo_guide_queue_wait_seconds", time.perf_counter() - started, resource=self.resource
+            )
+
+    def release(self, held_for: Optional[float] = None) -> None:
+        """Frees a slot; `held_for` seconds updates the retry estimate."""
+        with self._lock:
+            if held_for is not None:
+                self._average_hold = 0.8 * self._average_hold + 0.2 * held_for
+            self._release()
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._active < self.limit and self._queues:
+            user, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            self._waiting -= 1
+            self._active += 1
+            future.get_loop().call_soon_threadsafe(self._grant, future)
+        self._record()
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._release()
+        else:
+            future.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, user: Optional[str] = None):
+        """Holds a slot for the duration of the block."""
+        await self.acquire(user)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+
+def _limit(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+# Chat turns run at once, and turns allowed to wait before new ones are refused.
+turns = FairLimiter(
+    "turn",
+    _limit("OCTO_GUIDE_MAX_TURNS", 16),
+    max_queue=_limit("OCTO_GUIDE_MAX_QUEUED_TURNS", 64),
+)
+# Model calls in flight across all sessions.
+model_calls = FairLimiter("model", _limit("OCTO_GUIDE_MAX_MODEL_CALLS", 8))
+# Repository clones and fetches in flight; they compete for disk and network.
+repo_fetches = FairLimiter("repo_fetch", _limit("OCTO_GUIDE_MAX_REPO_FETCHES", 2))
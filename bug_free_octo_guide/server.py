@@ -0,0 +1,241 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The HTTP API used by the UI. `/chat` answers with the agent's final reply;
+`/chat/stream` sends server-sent events as the reply is generated, so the
+first tokens show up while the rest of the turn is still running.
+`/prewarm` starts analyzing a repository once the user has entered it (if
+the remote has it, and within a small cap on concurrent prewarms), so the
+orchestrator's `analyze_repo` call finds it done or under way.
+`/metrics` serves per-agent and per-tool latency, token and cache metrics
+in the Prometheus text format. Turns are admitted through the scheduler:
+past its queue limit, chat requests get a 429 with a Retry-After header.
+
+Run with: python -m bug_free_octo_guide.server
+(or: uvicorn --factory bug_free_octo_guide.server:create_app)
+"""
+
+import json
+import logging
+import os
+from typing import AsyncGenerator, Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+
+from .models import current_session
+from .scheduler import Overloaded, current_user, turns
+from .sessions import SqliteSessionService
+from .telemetry import TelemetryPlugin, metrics
+from .tools.context_analysis_tool import find_repo_urls, prewarm_repo
+
+APP_NAME = "bug_free_octo_guide"
+USER_ID = "ui_user"
+# Tool results are echoed to the UI only up to this many characters.
+MAX_EVENT_RESULT_CHARS = 2000
+
+
+class ChatRequest(BaseModel):
+    text: str
+    session_id: Optional[str] = None
+    # Turns are queued fairly per user; without one, per session.
+    user_id: Optional[str] = None
+
+
+class ChatResponse(BaseModel):
+    response: str
+    session_id: str
+
+
+class PrewarmRequest(BaseModel):
+    repo_url: str
+
+
+class PrewarmResponse(BaseModel):
+    repositories: Dict[str, str]
+
+
+def _event(kind: str, **data) -> dict:
+    return {"event": kind, "data": json.dumps(data)}
+
+
+def _truncate(value) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    if len(text) > MAX_EVENT_RESULT_CHARS:
+        return text[:MAX_EVENT_RESULT_CHARS] + "..."
+    return text
+
+
+def _overloaded(error: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(error), "retry_after": error.retry_after},
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def create_app(
+    agent: Optional[BaseAgent] = None,
+    session_service: Optional[BaseSessionService] = None,
+) -> FastAPI:
+    """
+    Builds the API around `agent`, by default the orchestrator, which is
+    only imported when the first request arrives. Sessions are kept in
+    `session_service`, by default the shared SQLite session store.
+    """
+    app = FastAPI(title="PRD Generator")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=os.environ.get("OCTO_GUIDE_CORS_ORIGINS", "*").split(","),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    session_service = session_service or SqliteSessionService()
+    runners = {}
+
+    def get_runner() -> Runner:
+        if "runner" not in runners:
+            root = agent
+            if root is None:
+                from .agent import root_agent as root
+            runners["runner"] = Runner(
+                app_name=APP_NAME,
+                agent=root,
+                session_service=session_service,
+                plugins=[TelemetryPlugin(metrics)],
+            )
+        return runners["runner"]
+
+    async def get_session_id(session_id: Optional[str]) -> str:
+        if session_id:
+            session = await session_service.get_session(
+                app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+            )
+            if session is not None:
+                return session.id
+        session = await session_service.create_session(app_name=APP_NAME, user_id=USER_ID)
+        return session.id
+
+    def run(request: ChatRequest, session_id: str, streaming: bool):
+        return get_runner().run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=types.Content(role="user", parts=[types.Part(text=request.text)]),
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE),
+        )
+
+    @app.post("/chat", response_model=ChatResponse)
+    async def chat(request: ChatRequest) -> ChatResponse:
+        session_id = await get_session_id(request.session_id)
+        user = request.user_id or session_id
+        current_user.set(user)
+        current_session.set(session_id)
+        response = ""
+        try:
+            async with turns.slot(user):
+                async for event in run(request, session_id, streaming=False):
+                    if event.content and event.content.parts and event.content.parts[0].text:
+                        response = event.content.parts[0].text
+        except Overloaded as e:
+            return _overloaded(e)
+        return ChatResponse(response=response, session_id=session_id)
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest) -> EventSourceResponse:
+        session_id = await get_session_id(request.session_id)
+        user = request.user_id or session_id
+        try:
+            turns.check()
+        except Overloaded as e:
+            return _overloaded(e)
+
+        async def events() -> AsyncGenerator[dict, None]:
+            """
+            Sends `session`, then `token` for each partial chunk of text,
+            `message` when a reply is complete, `tool_call`/`tool_result`
+            around tool and sub-agent calls, and finally `done` (or `error`, or
+            `overloaded` with `retry_after` if the turn was refused after all).
+            """
+            yield _event("session", session_id=session_id)
+            current_user.set(user)
+            current_session.set(session_id)
+            response = ""
+            try:
+                async with turns.slot(user):
+                    async for event in run(request, session_id, streaming=True):
+                        for part in (event.content.parts if event.content else None) or []:
+                            if part.text and event.partial:
+                                yield _event("token", author=event.author, text=part.text)
+                            elif part.text:
+                                response = part.text
+                                yield _event("message", author=event.author, text=part.text)
+                            elif part.function_call and not event.partial:
+                                yield _event(
+                                    "tool_call",
+                                    author=event.author,
+                                    name=part.function_call.name,
+                                    args=part.function_call.args,
+                                )
+                            elif part.function_response:
+                                yield _event(
+                                    "tool_result",
+                                    author=event.author,
+                                    name=part.function_response.name,
+                                    result=_truncate(part.function_response.response),
+                                )
+            except Overloaded as e:
+                yield _event("overloaded", message=str(e), retry_after=e.retry_after)
+                return
+            except Exception as e:
+                logging.exception("Streaming chat failed")
+                yield _event("error", message=str(e))
+                return
+            yield _event("done", session_id=session_id, response=response)
+
+        return EventSourceResponse(events())
+
+    @app.post("/prewarm", response_model=PrewarmResponse, status_code=202)
+    async def prewarm(request: PrewarmRequest) -> PrewarmResponse:
+        repo_urls = find_repo_urls(request.repo_url)
+        if not repo_urls:
+            raise HTTPException(status_code=400, detail="Not a GitHub repository URL.")
+        return PrewarmResponse(repositories={url: await prewarm_repo(url) for url in repo_urls})
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def get_metrics() -> str:
+        return metrics.render()
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Built by uvicorn rather than at import, so importing this module (as
+    # the tests do) never opens the session store in the real cache.
+    uvicorn.run(
+        "bug_free_octo_guide.server:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8000)),
+    )
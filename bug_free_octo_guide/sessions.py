@@ -0,0 +1,380 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A persistent session store on SQLite in WAL mode, so sessions survive
+restarts and several worker processes can share one database file.
+
+Events are stored as compressed JSON. Once PRD sections have been captured
+in the session state, turns older than the most recent few are compacted
+into a single summary event: the sections themselves live in the state and
+reach the sub-agents through the context packer, so replaying the whole
+conversation to the orchestrator on every turn is no longer needed.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional
+
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+from google.genai import types
+
+from .cache import cache_root
+from .context_packer import SECTIONS
+from .db import Transaction, connect
+
+# Completed turns kept verbatim after compaction.
+KEEP_RECENT_TURNS = int(os.environ.get("OCTO_GUIDE_SESSION_KEEP_TURNS", 4))
+# Characters of each compacted message kept in the summary, and how many of
+# the most recent compacted messages the summary lists.
+SUMMARY_MESSAGE_CHARS = 300
+SUMMARY_MAX_MESSAGES = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    invocation_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+def _encode(event: Event) -> bytes:
+    return zlib.compress(event.model_dump_json(exclude_none=True).encode("utf-8"))
+
+
+def _decode(data: bytes) -> Event:
+    return Event.model_validate_json(zlib.decompress(data))
+
+
+def _split_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Splits state into its app:, user: and session scopes, dropping temp:."""
+    scopes = {"app": {}, "user": {}, "session": {}}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            scopes["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            scopes["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            scopes["session"][key] = value
+    return scopes
+
+
+def _text_of(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts).strip()
+
+
+def summarize_turns(events: List[Event], state: Dict[str, Any]) -> str:
+    """
+    Condenses compacted turns to their messages, cut to a few lines each.
+    The messages listed by an earlier summary are carried over.
+    """
+    messages = []
+    for event in events:
+        text = _text_of(event)
+        if (event.custom_metadata or {}).get("summary"):
+            messages.extend(line for line in text.splitlines() if line.startswith("- "))
+        elif text:
+            if len(text) > SUMMARY_MESSAGE_CHARS:
+                text = text[:SUMMARY_MESSAGE_CHARS] + "..."
+            messages.append(f"- {event.author}: {' '.join(text.split())}")
+
+    lines = ["Summary of the earlier conversation, which has been compacted."]
+    captured = [section for section in SECTIONS if state.get(section)]
+    if captured:
+        lines.append(f"PRD sections already captured in the session: {', '.join(captured)}.")
+    return "\n".join(lines + messages[-SUMMARY_MAX_MESSAGES:])
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Stores sessions and their events in one SQLite database. Each thread
+    uses its own connection; database work runs off the event loop.
+    """
+
+    def __init__(self, path: Optional[str] = None, keep_recent_turns: int = KEEP_RECENT_TURNS):
+        self.path = path or os.path.join(cache_root(), "sessions.sqlite3")
+        self.keep_recent_turns = keep_recent_turns
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = connect(self.path)
+            self._local.db = db
+        return db
+
+    def _read(self) -> Transaction:
+        return Transaction(self._db(), "DEFERRED")
+
+    def _write(self) -> Transaction:
+        return Transaction(self._db())
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    # Reading
+
+    def _scoped_state(self, db, app_name: str, user_id: str, session_state: dict) -> dict:
+        state = dict(session_state)
+        row = db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        for key, value in json.loads(row[0]).items() if row else ():
+            state[State.APP_PREFIX + key] = value
+        row = db.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        for key, value in json.loads(row[0]).items() if row else ():
+            state[State.USER_PREFIX + key] = value
+        return state
+
+    def _get(self, app_name, user_id, session_id, config: Optional[GetSessionConfig]):
+        with self._read() as db:
+            row = db.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            query = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: list = [app_name, user_id, session_id]
+            if config and config.after_timestamp is not None:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY seq DESC"
+            if config and config.num_recent_events is not None:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            events = [_decode(data) for (data,) in db.execute(query, params)]
+            events.reverse()
+            return Session(
+                id=session_id,
+                app_name=app_name,
+                user_id=user_id,
+                state=self._scoped_state(db, app_name, user_id, json.loads(row[0])),
+                events=events,
+                last_update_time=row[1],
+            )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await self._run(self._get, app_name, user_id, session_id, config)
+
+    def _list(self, app_name, user_id):
+        with self._read() as db:
+            query = "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ?"
+            params = [app_name]
+            if user_id is not None:
+                query += " AND user_id = ?"
+                params.append(user_id)
+            return ListSessionsResponse(
+                sessions=[
+                    Session(
+                        id=session_id,
+                        app_name=app_name,
+                        user_id=uid,
+                        state=self._scoped_state(db, app_name, uid, json.loads(state)),
+                        last_update_time=update_time,
+                    )
+                    for uid, session_id, state, update_time in db.execute(query, params).fetchall()
+                ]
+            )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await self._run(self._list, app_name, user_id)
+
+    # Writing
+
+    def _merge_scoped(self, db, app_name: str, user_id: str, scopes: dict) -> None:
+        if scopes["app"]:
+            row = db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **scopes["app"]}
+            db.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state)),
+            )
+        if scopes["user"]:
+            row = db.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **scopes["user"]}
+            db.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+
+    def _create(self, app_name, user_id, state, session_id):
+        session_id = session_id or str(uuid.uuid4())
+        scopes = _split_state(state or {})
+        now = time.time()
+        with self._write() as db:
+            db.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, update_time) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(scopes["session"]), now),
+            )
+            self._merge_scoped(db, app_name, user_id, scopes)
+            merged = self._scoped_state(db, app_name, user_id, scopes["session"])
+        return Session(
+            id=session_id, app_name=app_name, user_id=user_id, state=merged, last_update_time=now
+        )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return await self._run(self._create, app_name, user_id, state, session_id)
+
+    def _delete(self, app_name, user_id, session_id):
+        with self._write() as db:
+            key = (app_name, user_id, session_id)
+            db.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+            db.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete, app_name, user_id, session_id)
+
+    def _append(self, session: Session, event: Event) -> Optional[List[Event]]:
+        key = (session.app_name, session.user_id, session.id)
+        with self._write() as db:
+            row = db.execute(
+                "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Session {session.id} not found.")
+            state = json.loads(row[0])
+            scopes = _split_state(event.actions.state_delta if event.actions else {})
+            state.update(scopes["session"])
+            self._merge_scoped(db, session.app_name, session.user_id, scopes)
+            (seq,) = db.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            ).fetchone()
+            db.execute(
+                "INSERT INTO events (app_name, user_id, session_id, seq, invocation_id, timestamp, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, seq, event.invocation_id, event.timestamp, _encode(event)),
+            )
+            db.execute(
+                "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps(state), event.timestamp, *key),
+            )
+            if event.author != "user" and event.is_final_response():
+                return self._compact(db, key, state)
+        return None
+
+    def _compact(self, db, key: tuple, state: dict) -> Optional[List[Event]]:
+        """
+        Replaces every turn but the last `keep_recent_turns` with a summary
+        event, once PRD sections are in the state. Returns the remaining
+        events if anything was compacted.
+        """
+        if not any(state.get(section) for section in SECTIONS):
+            return None
+        rows = db.execute(
+            "SELECT seq, invocation_id, data FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+            key,
+        ).fetchall()
+        turns: List[str] = []
+        for _, invocation_id, _ in rows:
+            if not turns or turns[-1] != invocation_id:
+                turns.append(invocation_id)
+        old_turns = set(turns[: max(0, len(turns) - self.keep_recent_turns)])
+        old = [(seq, _decode(data)) for seq, invocation_id, data in rows if invocation_id in old_turns]
+        # Nothing to do when all that is old is an earlier summary.
+        if len(old) <= 1:
+            return None
+
+        summary_seq, first = old[0]
+        summary = Event(
+            invocation_id=first.invocation_id,
+            author="user",
+            timestamp=first.timestamp,
+            custom_metadata={"summary": True},
+            content=types.Content(
+                role="user",
+                parts=[types.Part(text=summarize_turns([event for _, event in old], state))],
+            ),
+        )
+        db.executemany(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq = ?",
+            [(*key, seq) for seq, _ in old],
+        )
+        db.execute(
+            "INSERT INTO events (app_name, user_id, session_id, seq, invocation_id, timestamp, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, summary_seq, summary.invocation_id, summary.timestamp, _encode(summary)),
+        )
+        return [
+            _decode(data)
+            for (data,) in db.execute(
+                "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+                key,
+            )
+        ]
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        compacted = await self._run(self._append, session, event)
+        if compacted is not None:
+            session.events[:] = compacted
+        session.last_update_time = event.timestamp
+        return event
@@ -0,0 +1,250 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-process metrics for agents, model calls, tools and caches, exported in
+the Prometheus text format (the server serves them on `/metrics`).
+`TelemetryPlugin` records them through the runner's plugin hooks, so every
+agent and tool in a run is covered, including sub-agents called as tools
+and the section agents run by the drafting pipeline.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from .cache import open_caches
+
+# Upper bounds, in seconds, of the duration histogram buckets.
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> _Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metrics:
+    """
+    A registry of counters, gauges and duration histograms, each keyed by
+    metric name and labels. Safe to update from several threads.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        self._gauges: Dict[str, Dict[_Labels, float]] = {}
+        self._histograms: Dict[str, Dict[_Labels, dict]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.setdefault(
+                _labels(labels), {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets)}
+            )
+            histogram["count"] += 1
+            histogram["sum"] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Returns the counter or gauge `name` with exactly `labels`, or 0."""
+        with self._lock:
+            series = self._gauges.get(name) or self._counters.get(name, {})
+            return series.get(_labels(labels), 0)
+
+    def histogram(self, name: str, **labels) -> dict:
+        """Returns {"count", "sum", "buckets"} of the histogram `name`."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_labels(labels))
+            if histogram is None:
+                return {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets)}
+            return {**histogram, "buckets": list(histogram["buckets"])}
+
+    def series(self, name: str) -> Dict[_Labels, object]:
+        """Returns every labelled value of the counter, gauge or histogram `name`."""
+        with self._lock:
+            if name in self._histograms:
+                return {key: dict(value) for key, value in self._histograms[name].items()}
+            return dict(self._gauges.get(name) or self._counters.get(name, {}))
+
+    def render(self) -> str:
+        """Returns all metrics, and the disk cache counters, as Prometheus text."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.extend(self._header(name, "counter"))
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._gauges):
+                lines.extend(self._header(name, "gauge"))
+                for key, value in sorted(self._gauges[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.extend(self._header(name, "histogram"))
+                for key, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(self.buckets, histogram["buckets"]):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {histogram['count']}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram['sum']:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram['count']}")
+
+        caches = {namespace: cache.stats() for namespace, cache in sorted(open_caches().items())}
+        for stat, kind in (("hits", "counter"), ("misses", "counter"), ("bytes_on_disk", "gauge")):
+            name = f"octo_guide_disk_cache_{stat}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {name} {kind}")
+            for namespace, stats in caches.items():
+                lines.append(f"{name}{_format_labels([('cache', namespace)])} {stats[stat]}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str) -> list:
+        lines = [f"# HELP {name} {self._help[name]}"] if name in self._help else []
+        return lines + [f"# TYPE {name} {kind}"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# The process-wide registry served by the API.
+metrics = Metrics()
+
+_DESCRIPTIONS = {
+    "octo_guide_agent_runs_total": "Agent runs, by agent.",
+    "octo_guide_agent_duration_seconds": "Wall time of agent runs, by agent.",
+    "octo_guide_model_calls_total": "Completed model calls, by agent.",
+    "octo_guide_model_duration_seconds": "Model call latency, by agent.",
+    "octo_guide_model_tokens_total": "Model tokens, by agent and kind (prompt or completion).",
+    "octo_guide_model_cache_hits_total": "Model calls served from the response cache, by agent.",
+    "octo_guide_model_errors_total": "Failed model calls, by agent.",
+    "octo_guide_tool_calls_total": "Tool calls, by tool.",
+    "octo_guide_tool_duration_seconds": "Tool call latency, by tool.",
+    "octo_guide_tool_errors_total": "Tool calls that raised or returned success=False, by tool.",
+}
+
+
+class TelemetryPlugin(BasePlugin):
+    """
+    Records agent, model and tool durations, token usage, response cache
+    hits and errors into `registry`. Returns None from every hook, so it
+    never changes what the agents do.
+    """
+
+    def __init__(self, registry: Optional[Metrics] = None, name: str = "telemetry"):
+        super().__init__(name=name)
+        self.registry = registry or metrics
+        for metric, help_text in _DESCRIPTIONS.items():
+            self.registry.describe(metric, help_text)
+        self._started: Dict[tuple, float] = {}
+
+    def _start(self, key: tuple) -> None:
+        self._started[key] = time.perf_counter()
+
+    def _stop(self, key: tuple) -> Optional[float]:
+        started = self._started.pop(key, None)
+        return None if started is None else time.perf_counter() - started
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._start(("agent", callback_context.invocation_id, agent.name))
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        duration = self._stop(("agent", callback_context.invocation_id, agent.name))
+        if duration is not None:
+            self.registry.inc("octo_guide_agent_runs_total", agent=agent.name)
+            self.registry.observe("octo_guide_agent_duration_seconds", duration, agent=agent.name)
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name))
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        agent = callback_context.agent_name
+        duration = self._stop(("model", callback_context.invocation_id, agent))
+        if duration is None:
+            return None
+        self.registry.inc("octo_guide_model_calls_total", agent=agent)
+        self.registry.observe("octo_guide_model_duration_seconds", duration, agent=agent)
+        if (llm_response.custom_metadata or {}).get("cache_hit"):
+            self.registry.inc("octo_guide_model_cache_hits_total", agent=agent)
+        if llm_response.error_code:
+            self.registry.inc("octo_guide_model_errors_total", agent=agent)
+        usage = llm_response.usage_metadata
+        if usage:
+            self.registry.inc(
+                "octo_guide_model_tokens_total", usage.prompt_token_count or 0, agent=agent, kind="prompt"
+            )
+            self.registry.inc(
+                "octo_guide_model_tokens_total",
+                usage.candidates_token_count or 0,
+                agent=agent,
+                kind="completion",
+            )
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        agent = callback_context.agent_name
+        self._stop(("model", callback_context.invocation_id, agent))
+        self.registry.inc("octo_guide_model_errors_total", agent=agent)
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._start(("tool", tool_context.function_call_id))
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        duration = self._stop(("tool", tool_context.function_call_id))
+        if duration is not None:
+            self.registry.inc("octo_guide_tool_calls_total", tool=tool.name)
+            self.registry.observe("octo_guide_tool_duration_seconds", duration, tool=tool.name)
+        if isinstance(result, dict) and result.get("success") is False:
+            self.registry.inc("octo_guide_tool_errors_total", tool=tool.name)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        duration = self._stop(("tool", tool_context.function_call_id))
+        if duration is not None:
+            self.registry.inc("octo_guide_tool_calls_total", tool=tool.name)
+            self.registry.observe("octo_guide_tool_duration_seconds", duration, tool=tool.name)
+        self.registry.inc("octo_guide_tool_errors_total", tool=tool.name)
+        return None
@@ -0,0 +1,248 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Breaks a PRD down into tickets one section at a time. Every section is
+handed to its own `TicketingAgent`, all at once, together with the goals;
+the per-section tickets are then merged, duplicates are folded together,
+dependencies that name a ticket from another section are resolved to that
+ticket's title, and the tickets are ordered so dependencies come first.
+Breaking down a long PRD takes about as long as its largest section.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools.tool_context import ToolContext
+
+from .agents.ticketing_agent import TicketingAgent
+from .models import routed_model
+from .pipeline import _parent_plugins, run_agent
+from .prd import PrdState
+
+# Sections that are given to every section's agent as context instead of
+# being broken down themselves.
+CONTEXT_SECTIONS = ("goals", "non-goals")
+# Ticket titles sharing at least this fraction of their words are duplicates.
+DUPLICATE_TITLE_SIMILARITY = 0.8
+# A dependency naming at least this fraction of a ticket title's words refers to it.
+DEPENDENCY_TITLE_SIMILARITY = 0.5
+
+_HEADING = re.compile(r"^##\s+(.+?)\s*$", re.MULTILINE)
+_SEPARATOR = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+_TITLE = re.compile(r"\*\*Ticket Title:\*\*\s*(.+)")
+_DEPENDENCIES = re.compile(r"^\s*[*-]?\s*\*\*Dependencies:\*\*\s*(.*)$")
+_FIELD = re.compile(r"^\s*[*-]?\s*\*\*[^*]+:\*\*")
+_BULLET = re.compile(r"^\s*[*-]\s+(.+)$")
+_LABEL = re.compile(r"^\s*\[[^\]]*\]\s*")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class Ticket(NamedTuple):
+    title: str
+    body: str
+    dependencies: Tuple[str, ...]
+    section: str
+
+
+def split_prd(prd: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Splits a markdown PRD on its `##` headings. Returns the context shared
+    by every section (the goals) and the (title, text) of the sections to
+    break down; empty sections are left out.
+    """
+    headings = list(_HEADING.finditer(prd))
+    if not headings:
+        return "", [("PRD", prd.strip())] if prd.strip() else []
+    context, sections = [], []
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(prd)
+        text = prd[heading.end():end].strip()
+        if not text:
+            continue
+        title = heading.group(1)
+        if title.lower() in CONTEXT_SECTIONS:
+            context.append(f"## {title}\n{text}")
+        else:
+            sections.append((title, text))
+    return "\n\n".join(context), sections
+
+
+def _dependency_list(text: str) -> List[str]:
+    text = text.strip().strip("`")
+    if not text or text.rstrip(".").lower() == "none":
+        return []
+    # Titles start with a label, so a comma before one separates two titles.
+    return [part.strip() for part in re.split(r",\s*(?=\[)", text) if part.strip()]
+
+
+def parse_tickets(text: str, section: str) -> List[Ticket]:
+    """Parses the tickets, separated by `---`, in a TicketingAgent reply."""
+    tickets = []
+    for block in _SEPARATOR.split(text):
+        title = _TITLE.search(block)
+        if not title:
+            continue
+        body, dependencies = [], []
+        in_dependencies = False
+        for line in block.strip().splitlines():
+            match = _DEPENDENCIES.match(line)
+            if match:
+                in_dependencies = True
+                dependencies.extend(_dependency_list(match.group(1)))
+                continue
+            if in_dependencies and not _FIELD.match(line):
+                bullet = _BULLET.match(line)
+                if bullet:
+                    dependencies.extend(_dependency_list(bullet.group(1)))
+                    continue
+            in_dependencies = False
+            body.append(line)
+        tickets.append(
+            Ticket(title.group(1).strip(), "\n".join(body), tuple(dependencies), section)
+        )
+    return tickets
+
+
+def _title_words(title: str) -> frozenset:
+    return frozenset(_WORD.findall(_LABEL.sub("", title.strip("`* ")).lower()))
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def merge_tickets(groups: Iterable[List[Ticket]]) -> List[Ticket]:
+    """
+    Merges per-section ticket lists: tickets with (nearly) the same title
+    are kept once, with the union of their dependencies; dependencies are
+    resolved to the title of the ticket they name; and tickets are put in
+    dependency order, otherwise keeping the order of the sections.
+    """
+    merged: List[Ticket] = []
+    words: List[frozenset] = []
+    for ticket in (ticket for group in groups for ticket in group):
+        ticket_words = _title_words(ticket.title)
+        for i, existing in enumerate(words):
+            if _similarity(ticket_words, existing) >= DUPLICATE_TITLE_SIMILARITY:
+                merged[i] = merged[i]._replace(
+                    dependencies=merged[i].dependencies + ticket.dependencies
+                )
+                break
+        else:
+            merged.append(ticket)
+            words.append(ticket_words)
+
+    def resolve(dependency: str) -> str:
+        scores = [_similarity(_title_words(dependency), candidate) for candidate in words]
+        best = max(range(len(scores)), key=scores.__getitem__, default=None)
+        if best is not None and scores[best] >= DEPENDENCY_TITLE_SIMILARITY:
+            return merged[best].title
+        return dependency
+
+    resolved = []
+    for ticket in merged:
+        dependencies = []
+        for dependency in map(resolve, ticket.dependencies):
+            if dependency != ticket.title and dependency not in dependencies:
+                dependencies.append(dependency)
+        resolved.append(ticket._replace(dependencies=tuple(dependencies)))
+    return _dependency_order(resolved)
+
+
+def _dependency_order(tickets: List[Ticket]) -> List[Ticket]:
+    titles = {ticket.title for ticket in tickets}
+    placed, ordered = set(), []
+    remaining = list(tickets)
+    while remaining:
+        ready = [
+            ticket
+            for ticket in remaining
+            if all(dep in placed or dep not in titles for dep in ticket.dependencies)
+        ]
+        # A dependency cycle: keep the rest in their original order.
+        for ticket in ready or remaining:
+            placed.add(ticket.title)
+            ordered.append(ticket)
+        remaining = [ticket for ticket in remaining if ticket.title not in placed]
+    return ordered
+
+
+def render_tickets(tickets: List[Ticket]) -> str:
+    """Renders tickets in the ticket prompt's markdown format."""
+    blocks = []
+    for ticket in tickets:
+        dependencies = ", ".join(ticket.dependencies) or "None"
+        lines = ticket.body.splitlines()
+        line = f"* **Dependencies:** {dependencies}"
+        position = next(
+            (i for i, text in enumerate(lines) if "**Relevant Tech Spec Sections:**" in text),
+            len(lines),
+        )
+        blocks.append("\n".join(lines[:position] + [line] + lines[position:]))
+    return "\n\n---\n\n".join(blocks)
+
+
+def _section_request(context: str, title: str, text: str, titles: List[str]) -> str:
+    others = ", ".join(f'"{other}"' for other in titles if other != title) or "none"
+    return (
+        f"{context}\n\n## {title}\n{text}\n\n"
+        f'Only create tickets for the work in the "{title}" section. The other sections '
+        f"({others}) are broken down separately; when a ticket depends on their work, "
+        "list it under Dependencies with a title prefixed by its label, as it would be "
+        "written in that section's tickets."
+    ).strip()
+
+
+async def generate_tickets(
+    prd: str, llm: Optional[BaseLlm] = None, plugins: Optional[list] = None
+) -> dict:
+    """
+    Breaks `prd` down into tickets, generating each section's tickets
+    concurrently. Returns the merged tickets as markdown, how many there
+    are and how many seconds each section took.
+    """
+    llm = llm or routed_model("ticketing_agent")
+    context, sections = split_prd(prd)
+    titles = [title for title, _ in sections]
+    timings: Dict[str, float] = {}
+
+    async def section_tickets(title: str, text: str) -> List[Ticket]:
+        started = time.perf_counter()
+        agent = TicketingAgent(llm, _section_request(context, title, text, titles))
+        reply, _ = await run_agent(agent, agent.load_prompt(), {}, plugins)
+        timings[title] = time.perf_counter() - started
+        return parse_tickets(reply, title)
+
+    groups = await asyncio.gather(*(section_tickets(title, text) for title, text in sections))
+    tickets = merge_tickets(groups)
+    logging.info(f"Generated {len(tickets)} tickets from {len(sections)} sections: {timings}")
+    return {"tickets": render_tickets(tickets), "count": len(tickets), "timings": timings}
+
+
+async def draft_tickets(tool_context: ToolContext) -> dict:
+    """
+    Breaks the current PRD down into engineering tickets, one section at a
+    time and all sections in parallel, and returns them as markdown.
+    """
+    prd = PrdState(tool_context.state).render()["prd"]
+    if not split_prd(prd)[1]:
+        return {"success": False, "error": "The PRD has no sections to break down yet."}
+    result = await generate_tickets(prd, plugins=_parent_plugins(tool_context))
+    tool_context.state["tickets"] = result["tickets"]
+    return {"success": True, "tickets": result["tickets"], "count": result["count"]}
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import codecs
+from typing import BinaryIO, Iterator, NamedTuple
+
+CHUNK_SIZE = 4096
+
+
+class FileBudget(NamedTuple):
+    """How much of a file may be kept: whichever limit is hit first wins."""
+
+    max_lines: int = 20
+    max_bytes: int = 8 * 1024
+
+
+class BoundedText(NamedTuple):
+    text: str
+    truncated: bool
+    binary: bool = False
+
+
+class BoundedReader:
+    """
+    Incrementally decodes the head of a file, keeping at most
+    `budget.max_lines` lines and `budget.max_bytes` bytes. Chunks are fed
+    as they arrive, so memory use is bounded by the budget rather than by
+    the size of the file.
+    """
+
+    def __init__(self, budget: FileBudget):
+        self.budget = budget
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parts = []
+        self._bytes = 0
+        self._lines = 0
+        self._truncated = False
+        self._binary = False
+        self._done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consumes `chunk`; returns False once no more input is wanted."""
+        if self._done or not chunk:
+            return not self._done
+        if self._bytes == 0 and b"\0" in chunk[:CHUNK_SIZE]:
+            self._binary = True
+            self._truncated = True
+            self._done = True
+            return False
+
+        remaining = self.budget.max_bytes - self._bytes
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self._truncated = True
+            self._done = True
+
+        lines_left = self.budget.max_lines - self._lines
+        end = 0
+        while lines_left > 0:
+            newline = chunk.find(b"\n", end)
+            if newline == -1:
+                break
+            end = newline + 1
+            lines_left -= 1
+        if lines_left == 0:
+            if end < len(chunk):
+                self._truncated = True
+            chunk = chunk[:end]
+            self._done = True
+        self._lines = self.budget.max_lines - lines_left
+
+        self._bytes += len(chunk)
+        self._parts.append(self._decoder.decode(chunk))
+        return not self._done
+
+    def finish(self, exhausted: bool = True) -> BoundedText:
+        """
+        Returns what was kept. `exhausted` says whether the input ended;
+        if it didn't, the result is marked truncated even when the budget
+        happened to end exactly on the last byte that was fed.
+        """
+        if self._binary:
+            return BoundedText("", truncated=True, binary=True)
+        self._parts.append(self._decoder.decode(b"", final=True))
+        truncated = self._truncated or not exhausted
+        return BoundedText("".join(self._parts), truncated=truncated)
+
+
+def read_bounded(stream: BinaryIO, budget: FileBudget) -> BoundedText:
+    """Reads the head of a binary stream within `budget`."""
+    reader = BoundedReader(budget)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return reader.finish()
+        if not reader.feed(chunk):
+            # Any byte left in the stream means the file was cut short.
+            return reader.finish(exhausted=not stream.read(1))
+
+
+def iter_lines(stream: BinaryIO) -> Iterator[bytes]:
+    """Yields the lines of a binary stream, reading it in fixed-size chunks."""
+    pending = b""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if pending:
+        yield pending
@@ -12,64 +12,346 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
 import re
 import subprocess
 import tempfile
 import logging
+from typing import Dict, List, Optional
 
-def analyze_repo(prompt: str) -> dict:
+from google.adk.tools.tool_context import ToolContext
+
+from ..cache import DiskCache, cache_key
+from ..scheduler import current_user, repo_fetches
+from .bounded_reader import BoundedReader, FileBudget, iter_lines, read_bounded
+from .git_utils import run_git_async
+from .mirror_pool import MirrorPool
+from .rails_parser import PARSERS
+from .sparse_fetch import read_checked_out_files, sparse_checkout
+
+# Repository analyses keyed by repo URL and HEAD commit. Entries are small
+# JSON summaries, so the default bound holds thousands of analyses.
+analysis_cache = DiskCache(
+    "analysis",
+    max_bytes=int(os.environ.get("OCTO_GUIDE_ANALYSIS_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+)
+
+# Structured schema and routes indexes, keyed by repo URL and commit. These
+# are served to agents piecemeal through the rails_index_tool lookups.
+index_cache = DiskCache("rails_index", max_bytes=256 * 1024 * 1024)
+
+mirror_pool = MirrorPool()
+
+# Prewarms (analyses nobody has asked for yet) running at the same time.
+# Each holds a repository fetch slot, so they are kept below that limit.
+MAX_PREWARMS = int(os.environ.get("OCTO_GUIDE_MAX_PREWARMS", 1))
+# Prewarm fetches queue for a slot as this user, so the fair scheduler
+# serves them no more often than any one real user.
+PREWARM_USER = "prewarm"
+
+
+class _SharedAnalysis:
+    """A running analysis with the callers waiting for it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.prewarmed = False
+
+
+# Analyses currently running, by repository URL and file budgets.
+_in_flight: Dict[tuple, _SharedAnalysis] = {}
+
+# How repositories are fetched for analysis: "mirror" keeps a bare mirror per
+# repository (best for repositories analyzed repeatedly), "sparse" does a
+# throwaway blob-less clone that downloads only the summarized files.
+FETCH_MODE = os.environ.get("OCTO_GUIDE_FETCH_MODE", "mirror")
+
+# Files summarized for the agents, with how much of each one is kept.
+FILE_BUDGETS: Dict[str, FileBudget] = {
+    "db/schema.rb": FileBudget(max_lines=20, max_bytes=8 * 1024),
+    "config/routes.rb": FileBudget(max_lines=20, max_bytes=8 * 1024),
+    "Gemfile": FileBudget(max_lines=20, max_bytes=4 * 1024),
+    "conventions.md": FileBudget(max_lines=20, max_bytes=8 * 1024),
+}
+FILES_TO_SUMMARIZE = list(FILE_BUDGETS)
+
+# Upper bound on repositories analyzed at the same time by one call.
+MAX_ANALYSIS_WORKERS = int(os.environ.get("OCTO_GUIDE_ANALYSIS_WORKERS", 4))
+
+GITHUB_URL_PATTERN = re.compile(r"https://github\.com/[\w.-]+/[\w.-]+")
+
+
+async def resolve_head_commit(repo_url: str) -> Optional[str]:
     """
-    Analyzes a GitHub repository by cloning it and summarizing key files.
-    The analysis is considered successful even if no specific files are found,
-    as long as the repository is successfully cloned.
+    Resolves the commit the remote's HEAD points to without cloning.
+    Returns None if the remote cannot be queried.
     """
-    match = re.search(r"https://github.com/[\w-]+/[\w-]+", prompt)
-    if not match:
+    try:
+        result = await run_git_async(["ls-remote", repo_url, "HEAD"], timeout=60)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"Failed to resolve HEAD of {repo_url}: {e.stderr}")
+        return None
+    line = result.stdout.strip()
+    return line.split()[0] if line else None
+
+
+def find_repo_urls(prompt: str) -> List[str]:
+    """Returns the distinct GitHub repository URLs in `prompt`, in order."""
+    urls = []
+    for match in GITHUB_URL_PATTERN.finditer(prompt):
+        url = match.group(0).rstrip(".")
+        if url.endswith(".git"):
+            url = url[: -len(".git")]
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+async def analyze_repo(prompt: str, tool_context: Optional[ToolContext] = None) -> dict:
+    """
+    Analyzes every GitHub repository mentioned in the prompt by mirroring it
+    and summarizing key files. Repositories are analyzed concurrently.
+    The analysis of a repository is considered successful even if no
+    specific files are found, as long as it is successfully cloned.
+    """
+    repo_urls = find_repo_urls(prompt)
+    if not repo_urls:
         return {
             "success": False,
             "error": "Could not find a GitHub repository URL in the prompt."
         }
-    repo_url = match.group(0)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        try:
-            logging.info(f"Cloning repository: {repo_url}")
-            env = os.environ.copy()
-            env["GIT_TERMINAL_PROMPT"] = "0"
-            subprocess.run(
-                ["git", "clone", "--depth", "1", repo_url, tmpdir],
-                check=True,
-                capture_output=True,
-                text=True,
-                env=env,
-            )
-            logging.info("Repository cloned successfully.")
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to clone repository: {e.stderr}")
-            return {
-                "success": False,
-                "error": f"Failed to clone repository: {e.stderr}"
-            }
-
-        summaries = {}
-        files_to_summarize = [
-            "db/schema.rb",
-            "config/routes.rb",
-            "Gemfile",
-            "conventions.md",
-        ]
-
-        for file_path in files_to_summarize:
-            full_path = os.path.join(tmpdir, file_path)
-            if os.path.exists(full_path):
-                with open(full_path, "r") as f:
-                    summaries[file_path] = "".join(f.readlines()[:20])
-            else:
-                summaries[file_path] = "File not found."
+    semaphore = asyncio.Semaphore(max(1, MAX_ANALYSIS_WORKERS))
+
+    async def analyze(repo_url):
+        async with semaphore:
+            return await analyze_repo_url(repo_url)
+
+    analyses = await asyncio.gather(*(analyze(url) for url in repo_urls))
+    results = dict(zip(repo_urls, analyses))
+
+    errors = {
+        url: result["error"] for url, result in results.items() if not result["success"]
+    }
+    analyzed = len(results) - len(errors)
+    if tool_context is not None:
+        tool_context.state["repositories"] = {
+            url: result["commit"] for url, result in results.items() if result["success"]
+        }
+        tool_context.state["repository_summaries"] = {
+            url: result["summaries"] for url, result in results.items() if result["success"]
+        }
+    return {
+        "success": not errors,
+        "message": f"Analyzed {analyzed} of {len(results)} repositories.",
+        "repositories": results,
+        "errors": errors,
+    }
+
+
+def _in_flight_analysis(repo_url: str, budgets: Dict[str, FileBudget]) -> _SharedAnalysis:
+    """
+    Returns the analysis of `repo_url` already running on this event loop,
+    or starts one. The entry is dropped once the analysis finishes; from then
+    on the analysis cache serves the result.
+    """
+    key = (repo_url, repr(sorted(budgets.items())))
+    loop = asyncio.get_running_loop()
+    shared = _in_flight.get(key)
+    if shared is None or shared.task.get_loop() is not loop or shared.task.cancelling():
+        task = loop.create_task(_analyze_repo_url(repo_url, budgets))
+        shared = _SharedAnalysis(task)
+        _in_flight[key] = shared
+        task.add_done_callback(
+            lambda done: _in_flight.pop(key) if _in_flight.get(key) is shared else None
+        )
+    return shared
 
+
+async def prewarm_repo(repo_url: str) -> str:
+    """
+    Starts analyzing `repo_url` in the background, ahead of the `analyze_repo`
+    call that will need it. Returns "running" if an analysis was already in
+    flight, "started", "not_found" if the remote has no such repository (it
+    is checked with `ls-remote` first, so nothing is cloned), or "busy" if
+    MAX_PREWARMS prewarms are already running.
+    """
+    key = (repo_url, repr(sorted(FILE_BUDGETS.items())))
+    if key in _in_flight:
+        return "running"
+    if sum(shared.prewarmed for shared in _in_flight.values()) >= MAX_PREWARMS:
+        return "busy"
+    if await resolve_head_commit(repo_url) is None:
+        return "not_found"
+    if key in _in_flight:
+        return "running"
+    token = current_user.set(PREWARM_USER)
+    try:
+        shared = _in_flight_analysis(repo_url, FILE_BUDGETS)
+    finally:
+        current_user.reset(token)
+    shared.prewarmed = True
+    return "started"
+
+
+async def analyze_repo_url(
+    repo_url: str, budgets: Optional[Dict[str, FileBudget]] = None
+) -> dict:
+    """
+    Analyzes the repository at `repo_url`. Results are cached per HEAD commit,
+    so the repository's mirror is only fetched again once its default branch
+    moves, and files are read from the mirror without a checkout. Concurrent
+    calls for the same repository, including a prewarm, share one analysis.
+
+    `budgets` maps each file to summarize to how many lines and bytes of it
+    to keep, defaulting to FILE_BUDGETS. Files are streamed, so large files
+    cost no more memory than their budget.
+    """
+    budgets = budgets or FILE_BUDGETS
+    shared = _in_flight_analysis(repo_url, budgets)
+    shared.waiters += 1
+    try:
+        # Shielded, so a caller that gives up doesn't cancel it for the others.
+        return await asyncio.shield(shared.task)
+    finally:
+        shared.waiters -= 1
+        # Once nobody wants the result (and no prewarm will), stop the fetch.
+        if not shared.waiters and not shared.prewarmed:
+            shared.task.cancel()
+
+
+async def _analyze_repo_url(repo_url: str, budgets: Dict[str, FileBudget]) -> dict:
+    budgets_key = repr(sorted(budgets.items()))
+    commit = await resolve_head_commit(repo_url)
+    if commit:
+        cached = analysis_cache.get(cache_key(repo_url, commit, budgets_key))
+        if cached is not None:
+            logging.info(f"Using cached analysis of {repo_url} at {commit}.")
+            return cached
+
+    try:
+        async with repo_fetches.slot():
+            if FETCH_MODE == "sparse":
+                commit, contents = await _fetch_sparse(repo_url, budgets)
+            else:
+                commit, contents = await _fetch_from_mirror(repo_url, commit, budgets)
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to clone repository: {e.stderr}")
+        return {
+            "success": False,
+            "error": f"Failed to clone repository: {e.stderr}"
+        }
+    except subprocess.TimeoutExpired as e:
+        logging.error(f"Timed out cloning repository: {repo_url}")
         return {
-            "success": True,
-            "message": "Repository analysis complete.",
-            "summaries": summaries
+            "success": False,
+            "error": f"Timed out cloning repository after {e.timeout:.0f} seconds."
         }
+
+    summaries = {}
+    truncated = []
+    rails_index = {}
+    for file_path in budgets:
+        content, index = contents[file_path] or (None, None)
+        rails_index.update(index or {})
+        if content is None:
+            summaries[file_path] = "File not found."
+        elif content.binary:
+            summaries[file_path] = "Binary file."
+        else:
+            summaries[file_path] = content.text
+        if content is not None and content.truncated:
+            truncated.append(file_path)
+
+    result = {
+        "success": True,
+        "message": "Repository analysis complete.",
+        "commit": commit,
+        "summaries": summaries,
+        "truncated": truncated,
+        "indexed": {
+            "tables": len(rails_index.get("tables", {})),
+            "routes": len(rails_index.get("routes", [])),
+        },
+    }
+    index_cache.put(cache_key(repo_url, commit), rails_index)
+    analysis_cache.put(cache_key(repo_url, commit, budgets_key), result)
+    return result
+
+
+def _index_stream(file_path: str, stream, budget: Optional[FileBudget] = None) -> tuple:
+    """
+    Reads a whole file line by line, feeding its parser if it has one, while
+    keeping the head of it within `budget`. Returns (BoundedText, index).
+    """
+    parser_class = PARSERS.get(file_path)
+    if parser_class is None:
+        return read_bounded(stream, budget), None
+    reader = BoundedReader(budget or FileBudget(0, 0))
+    parser = parser_class()
+    wants_more = True
+    cut_short = False
+    for line in iter_lines(stream):
+        if wants_more:
+            wants_more = reader.feed(line)
+        else:
+            cut_short = True
+        parser.feed(line.decode("utf-8", errors="replace"))
+    text = reader.finish(exhausted=not cut_short)
+    return text, None if text.binary else parser.result()
+
+
+def _read_within_budget(budgets: Dict[str, FileBudget]):
+    """Returns a per-path reader that summarizes and indexes each file."""
+    def read(file_path, stream):
+        return _index_stream(file_path, stream, budgets[file_path])
+    return read
+
+
+async def load_rails_index(repo_url: str, commit: str) -> dict:
+    """
+    Returns the schema and routes index of `repo_url` at `commit`, rebuilding
+    it from the repository's mirror if it is no longer cached.
+    """
+    key = cache_key(repo_url, commit)
+    rails_index = index_cache.get(key)
+    if rails_index is not None:
+        return rails_index
+    await mirror_pool.update(repo_url, commit)
+    contents = await asyncio.to_thread(
+        mirror_pool.read_files, repo_url, commit, PARSERS, _index_stream
+    )
+    rails_index = {}
+    for content in contents.values():
+        if content is not None:
+            rails_index.update(content[1] or {})
+    index_cache.put(key, rails_index)
+    return rails_index
+
+
+async def _fetch_from_mirror(
+    repo_url: str, commit: Optional[str], budgets: Dict[str, FileBudget]
+) -> tuple:
+    logging.info(f"Updating mirror of repository: {repo_url}")
+    await mirror_pool.update(repo_url, commit)
+    if not commit:
+        commit = await asyncio.to_thread(mirror_pool.resolve, repo_url)
+    logging.info("Repository mirror is up to date.")
+    contents = await asyncio.to_thread(
+        mirror_pool.read_files, repo_url, commit, budgets, _read_within_budget(budgets)
+    )
+    return commit, contents
+
+
+async def _fetch_sparse(repo_url: str, budgets: Dict[str, FileBudget]) -> tuple:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logging.info(f"Cloning repository: {repo_url}")
+        mode = await sparse_checkout(repo_url, tmpdir, budgets)
+        logging.info(f"Repository cloned successfully ({mode}).")
+        commit = (await run_git_async(["rev-parse", "HEAD"], cwd=tmpdir)).stdout.strip()
+        contents = await asyncio.to_thread(
+            read_checked_out_files, tmpdir, budgets, _read_within_budget(budgets)
+        )
+        return commit, contents
@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+from typing import Optional
+
+# Seconds a network git command (clone, fetch, ls-remote) may run.
+GIT_TIMEOUT = float(os.environ.get("OCTO_GUIDE_GIT_TIMEOUT", 300))
+
+
+def git_env() -> dict:
+    env = os.environ.copy()
+    env["GIT_TERMINAL_PROMPT"] = "0"
+    return env
+
+
+def run_git(args: list, cwd: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """Runs git non-interactively, raising CalledProcessError on failure."""
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+        env=git_env(),
+        **kwargs,
+    )
+
+
+async def run_git_async(
+    args: list, cwd: Optional[str] = None, timeout: Optional[float] = GIT_TIMEOUT
+) -> subprocess.CompletedProcess:
+    """
+    Runs git without blocking the event loop. Raises CalledProcessError on
+    failure and TimeoutExpired after `timeout` seconds. Git and any helper
+    processes it started (remote helpers, index-pack) are killed if the
+    command times out or the calling task is cancelled.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=git_env(),
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        if process.returncode is None:
+            logging.warning(f"Killing git {args[0]} (pid {process.pid})")
+            os.killpg(process.pid, signal.SIGKILL)
+            await asyncio.shield(process.wait())
+        if isinstance(e, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(["git", *args], timeout) from e
+        raise
+    stdout, stderr = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    if process.returncode:
+        raise subprocess.CalledProcessError(
+            process.returncode, ["git", *args], stdout, stderr
+        )
+    return subprocess.CompletedProcess(["git", *args], process.returncode, stdout, stderr)
@@ -0,0 +1,218 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional
+
+from ..cache import cache_key, cache_root
+from .git_utils import git_env, run_git, run_git_async
+
+
+def read_all(file_path: str, stream: BinaryIO) -> bytes:
+    return stream.read()
+
+
+class _BlobStream:
+    """A read-only view of the next `size` bytes of a `cat-file` stream."""
+
+    def __init__(self, raw: BinaryIO, size: int):
+        self._raw = raw
+        self._remaining = size
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0 or n > self._remaining:
+            n = self._remaining
+        data = self._raw.read(n)
+        self._remaining -= len(data)
+        return data
+
+    def drain(self) -> None:
+        while self._remaining and self.read(64 * 1024):
+            pass
+
+
+class MirrorPool:
+    """
+    Keeps one bare `git clone --mirror` per repository and reads files
+    straight out of the object database, so no working tree is ever
+    checked out. Access to each mirror is serialized with a lock that
+    holds across threads and processes.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(cache_root(), "mirrors")
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def mirror_path(self, repo_url: str) -> str:
+        return os.path.join(self.root, f"{cache_key(repo_url)[:24]}.git")
+
+    def _acquire(self, path: str) -> tuple:
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(path, threading.Lock())
+        os.makedirs(self.root, exist_ok=True)
+        thread_lock.acquire()
+        lock_file = open(f"{path}.lock", "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return thread_lock, lock_file
+
+    def _release(self, handle: tuple) -> None:
+        thread_lock, lock_file = handle
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+        thread_lock.release()
+
+    @contextlib.asynccontextmanager
+    async def lock(self, repo_url: str):
+        """
+        Holds the per-repository lock for the duration of the block. The lock
+        is taken on a worker thread so waiting for it never blocks the loop.
+        """
+        path = self.mirror_path(repo_url)
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire, path))
+        try:
+            handle = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The thread may still get the lock; hand it straight back.
+            acquiring.add_done_callback(
+                lambda f: f.exception() is None and self._release(f.result())
+            )
+            raise
+        try:
+            yield path
+        finally:
+            self._release(handle)
+
+    async def _has_commit(self, path: str, commit: str) -> bool:
+        try:
+            await run_git_async(["cat-file", "-e", f"{commit}^{{commit}}"], cwd=path)
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    async def update(self, repo_url: str, commit: Optional[str] = None) -> str:
+        """
+        Makes sure the mirror of `repo_url` exists and is current, and
+        returns its path. When `commit` is given and already present in the
+        mirror, the fetch is skipped entirely.
+        """
+        async with self.lock(repo_url) as path:
+            if not os.path.isdir(path):
+                tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                logging.info(f"Creating mirror of {repo_url}")
+                try:
+                    await run_git_async(
+                        ["clone", "--mirror", "--quiet", repo_url, tmp_path]
+                    )
+                except BaseException:
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                    raise
+                os.rename(tmp_path, path)
+            elif commit and await self._has_commit(path, commit):
+                logging.info(f"Mirror of {repo_url} already has {commit}")
+            else:
+                logging.info(f"Fetching updates for mirror of {repo_url}")
+                await run_git_async(["fetch", "--prune", "--quiet", "origin"], cwd=path)
+            return path
+
+    def resolve(self, repo_url: str, rev: str = "HEAD") -> str:
+        """
+        Resolves `rev` to a commit id in the mirror of `repo_url`. This
+        blocks; from a coroutine, run it with `asyncio.to_thread`.
+        """
+        path = self.mirror_path(repo_url)
+        return run_git(["rev-parse", f"{rev}^{{commit}}"], cwd=path).stdout.strip()
+
+    def list_tree(self, repo_url: str, commit: str) -> Dict[str, tuple]:
+        """
+        Lists the regular files at `commit` as {path: (blob id, size)},
+        without reading any file contents.
+        """
+        output = run_git(
+            ["ls-tree", "-r", "-z", "--long", commit], cwd=self.mirror_path(repo_url)
+        ).stdout
+        tree = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            mode, object_type, object_id, size = meta.split()
+            if object_type == "blob" and mode in ("100644", "100755"):
+                tree[path] = (object_id, int(size))
+        return tree
+
+    def read_files(
+        self,
+        repo_url: str,
+        commit: str,
+        file_paths: Iterable[str],
+        reader: Callable[[str, BinaryIO], Any] = read_all,
+    ) -> Dict[str, Any]:
+        """
+        Reads `file_paths` at `commit` with a single `git cat-file --batch`
+        process. Each blob is handed to `reader` along with its path as a
+        stream, so callers that only need the head of a file never hold the
+        rest of it in memory.
+        Files that don't exist at that commit map to None.
+        """
+        return self.read_objects(
+            repo_url,
+            {file_path: f"{commit}:{file_path}" for file_path in file_paths},
+            reader,
+        )
+
+    def read_objects(
+        self,
+        repo_url: str,
+        objects: Dict[str, str],
+        reader: Callable[[str, BinaryIO], Any] = read_all,
+    ) -> Dict[str, Any]:
+        """
+        Like `read_files`, but for any {key: object name} mapping, such as
+        paths to the blob ids returned by `list_tree`.
+        """
+        process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.mirror_path(repo_url),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=git_env(),
+        )
+        contents: Dict[str, Any] = {}
+        try:
+            for key, object_name in objects.items():
+                process.stdin.write(f"{object_name}\n".encode("utf-8"))
+                process.stdin.flush()
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    contents[key] = None
+                    continue
+                blob = _BlobStream(process.stdout, int(header[2]))
+                contents[key] = reader(key, blob) if header[1] == b"blob" else None
+                blob.drain()
+                process.stdout.read(1)  # Trailing newline.
+        finally:
+            process.stdin.close()
+            process.stdout.close()
+            process.wait()
+        return contents
@@ -1,23 +1,78 @@
-def assemble_prd(goals: str, solution: str, api_changes: str, db_schema: str, implementation: str, testing: str) -> str:
-    """Assembles a PRD from the provided sections."""
-    return f"""
-# Product Requirements Document
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
 
-## Goals
-{goals}
+from typing import Optional
 
-## Solution
-{solution}
+from google.adk.tools.tool_context import ToolContext
 
-## API Changes
-{api_changes}
+from ..prd import PrdState, render_document
+from ..prd_library import remember_prd_soon
 
-## DB Schema
-{db_schema}
 
-## Implementation
-{implementation}
+def assemble_prd(
+    goals: str,
+    solution: str,
+    api_changes: str,
+    db_schema: str,
+    implementation: str,
+    testing: str,
+    tool_context: Optional[ToolContext] = None,
+    feature_description: str = "",
+) -> str:
+    """
+    Assembles a PRD from the provided sections.
 
-## Testing
-{testing}
-"""
+    Args:
+        feature_description: A description of the feature the PRD is for.
+    """
+    sections = {
+        "goals": goals,
+        "solution": solution,
+        "api_changes": api_changes,
+        "db_schema": db_schema,
+        "implementation": implementation,
+        "testing": testing,
+    }
+    if tool_context is not None:
+        prd = PrdState(tool_context.state)
+        for section, content in sections.items():
+            prd.update(section, content)
+        remember_prd_soon(tool_context.state, feature_description)
+    return render_document(sections)
+
+
+def update_prd_section(section: str, content: str, tool_context: ToolContext) -> dict:
+    """
+    Replaces one section of the PRD, leaving the others as they are.
+    Returns the section's new version and a diff of what changed.
+
+    Args:
+        section: One of "goals", "solution", "api_changes", "db_schema", "implementation" or "testing".
+        content: The complete new content of the section.
+    """
+    try:
+        return {"success": True, **PrdState(tool_context.state).update(section, content)}
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+
+def render_prd(tool_context: ToolContext, changed_since: Optional[int] = None) -> dict:
+    """
+    Renders the PRD from the sections written so far. With `changed_since`,
+    returns only the sections changed after that document version.
+
+    Args:
+        changed_since: A document version returned by an earlier call.
+    """
+    return {"success": True, **PrdState(tool_context.state).render(changed_since)}
@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..prd import PrdState
 
 def define_goals(
     primary_objective: str,
     success_metric: str,
-    non_goals: List[str]
+    non_goals: List[str],
+    tool_context: Optional[ToolContext] = None,
 ) -> str:
     """
     Defines the Goals and Non-Goals section of the PRD.
@@ -28,11 +33,15 @@ def define_goals(
         non_goals: A list of things that are explicitly out of scope for this iteration.
     """
     non_goals_formatted = "\n- ".join(non_goals)
-    return f"""
+    goals = f"""
 ## Goals
 - **Objective:** {primary_objective}
 - **Success Metric:** {success_metric}
 
 ## Non-Goals
 - {non_goals_formatted}
-"""
\ No newline at end of file
+"""
+    if tool_context is not None:
+        # Sub-agents receive the goals through the context packer.
+        PrdState(tool_context.state).update("goals", goals)
+    return goals
\ No newline at end of file
@@ -0,0 +1,60 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+from google.adk.tools.tool_context import ToolContext
+
+from . import context_analysis_tool
+from .rails_parser import query_routes, query_tables
+
+
+def _analyzed_repositories(tool_context: ToolContext) -> dict:
+    return tool_context.state.get("repositories") or {}
+
+
+async def find_tables(terms: List[str], tool_context: ToolContext) -> dict:
+    """
+    Looks up tables in the analyzed repositories' db/schema.rb.
+
+    Args:
+        terms: Entity or column names to look for (e.g. ["user", "comment"]).
+            Tables that reference a matching table are included as well.
+    """
+    repositories = _analyzed_repositories(tool_context)
+    if not repositories:
+        return {"success": False, "error": "No repository has been analyzed yet."}
+    tables = {}
+    for repo_url, commit in repositories.items():
+        rails_index = await context_analysis_tool.load_rails_index(repo_url, commit)
+        tables[repo_url] = query_tables(rails_index, terms)
+    return {"success": True, "tables": tables}
+
+
+async def find_routes(terms: List[str], tool_context: ToolContext) -> dict:
+    """
+    Looks up routes in the analyzed repositories' config/routes.rb.
+
+    Args:
+        terms: Resource, path or controller names to look for
+            (e.g. ["comments", "users"]).
+    """
+    repositories = _analyzed_repositories(tool_context)
+    if not repositories:
+        return {"success": False, "error": "No repository has been analyzed yet."}
+    routes = {}
+    for repo_url, commit in repositories.items():
+        rails_index = await context_analysis_tool.load_rails_index(repo_url, commit)
+        routes[repo_url] = query_routes(rails_index, terms)
+    return {"success": True, "routes": routes}
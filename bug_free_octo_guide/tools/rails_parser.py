@@ -0,0 +1,284 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Line-oriented parsers that turn `db/schema.rb` and `config/routes.rb` into
+compact, queryable indexes. Both consume one line at a time, so arbitrarily
+large files are indexed without loading them whole.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+_CREATE_TABLE = re.compile(r'^\s*create_table\s+"([^"]+)"')
+_COLUMN = re.compile(r'^\s*t\.(\w+)\s+"([^"]+)"(.*)$')
+_TIMESTAMPS = re.compile(r"^\s*t\.timestamps\b")
+_TABLE_INDEX = re.compile(r'^\s*t\.index\s+\[([^\]]*)\](.*)$')
+_ADD_INDEX = re.compile(r'^\s*add_index\s+"([^"]+)",\s*\[([^\]]*)\](.*)$')
+_FOREIGN_KEY = re.compile(r'^\s*add_foreign_key\s+"([^"]+)",\s*"([^"]+)"')
+_INDEX_NAME = re.compile(r'name:\s*"([^"]+)"')
+_UNIQUE = re.compile(r"unique:\s*true")
+_END = re.compile(r"^\s*end\b")
+
+
+def _quoted_list(text: str) -> List[str]:
+    return re.findall(r'"([^"]+)"', text)
+
+
+def _index_entry(columns: str, options: str) -> dict:
+    name = _INDEX_NAME.search(options)
+    return {
+        "columns": _quoted_list(columns),
+        "name": name.group(1) if name else None,
+        "unique": bool(_UNIQUE.search(options)),
+    }
+
+
+class SchemaParser:
+    """Builds {"tables": {name: {"columns", "indexes", "foreign_keys"}}}."""
+
+    def __init__(self):
+        self.tables: Dict[str, dict] = {}
+        self._table: Optional[dict] = None
+
+    def _add_table(self, name: str) -> dict:
+        return self.tables.setdefault(
+            name, {"columns": {}, "indexes": [], "foreign_keys": []}
+        )
+
+    def feed(self, line: str) -> None:
+        match = _CREATE_TABLE.match(line)
+        if match:
+            self._table = self._add_table(match.group(1))
+            return
+        if self._table is not None:
+            if _END.match(line):
+                self._table = None
+                return
+            match = _TABLE_INDEX.match(line)
+            if match:
+                self._table["indexes"].append(_index_entry(*match.groups()))
+                return
+            if _TIMESTAMPS.match(line):
+                self._table["columns"]["created_at"] = "datetime"
+                self._table["columns"]["updated_at"] = "datetime"
+                return
+            match = _COLUMN.match(line)
+            if match:
+                column_type, name, _ = match.groups()
+                if column_type in ("references", "belongs_to"):
+                    name = f"{name}_id"
+                    column_type = "bigint"
+                self._table["columns"][name] = column_type
+            return
+        match = _ADD_INDEX.match(line)
+        if match:
+            table, columns, options = match.groups()
+            self._add_table(table)["indexes"].append(_index_entry(columns, options))
+            return
+        match = _FOREIGN_KEY.match(line)
+        if match:
+            self._add_table(match.group(1))["foreign_keys"].append(match.group(2))
+
+    def result(self) -> dict:
+        return {"tables": self.tables}
+
+
+_RESOURCE_ACTIONS = {
+    "index": ("GET", ""),
+    "create": ("POST", ""),
+    "new": ("GET", "/new"),
+    "show": ("GET", "/:id"),
+    "edit": ("GET", "/:id/edit"),
+    "update": ("PATCH", "/:id"),
+    "destroy": ("DELETE", "/:id"),
+}
+_SINGULAR_RESOURCE_ACTIONS = {
+    "create": ("POST", ""),
+    "new": ("GET", "/new"),
+    "show": ("GET", ""),
+    "edit": ("GET", "/edit"),
+    "update": ("PATCH", ""),
+    "destroy": ("DELETE", ""),
+}
+_RESOURCES = re.compile(r"^\s*(resources|resource)\s+:(\w+)(.*?)(\bdo\b)?\s*$")
+_NAMESPACE = re.compile(r"^\s*namespace\s+:(\w+).*\bdo\b")
+_SCOPE = re.compile(r'^\s*scope\s+(?:path:\s*)?["\']?/?([\w/]*)["\']?.*\bdo\b')
+_MEMBER = re.compile(r"^\s*(member|collection)\s+do\b")
+_VERB = re.compile(
+    r'^\s*(get|post|put|patch|delete)\s+(?::(\w+)|["\']([^"\']+)["\'])(.*)$'
+)
+_ROOT = re.compile(r'^\s*root\s+(?:to:\s*)?["\']([^"\']+)["\']')
+_BLOCK_OPENER = re.compile(r"\bdo\b(\s*\|[^|]*\|)?\s*$")
+_TO = re.compile(r'(?:to:|=>)\s*["\']([^"\']+)["\']')
+_ONLY = re.compile(r"only:\s*(?:%i)?\[([^\]]*)\]|only:\s*:(\w+)")
+_EXCEPT = re.compile(r"except:\s*(?:%i)?\[([^\]]*)\]|except:\s*:(\w+)")
+# Comments either fill the line or follow whitespace; "users#index" is not one.
+_COMMENT = re.compile(r"(^|\s)#.*$")
+
+
+def _singular(name: str) -> str:
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("sses") or name.endswith("xes"):
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def _symbols(match: Optional[re.Match]) -> Optional[List[str]]:
+    if not match:
+        return None
+    if match.group(2):
+        return [match.group(2)]
+    return re.findall(r":?(\w+)", match.group(1))
+
+
+class RoutesParser:
+    """
+    Builds {"routes": [{"verb", "path", "action"}]} from routes.rb, expanding
+    `resources`/`resource` and following `namespace`, `scope`, nesting and
+    `member`/`collection` blocks.
+    """
+
+    def __init__(self):
+        self.routes: List[dict] = []
+        # Each frame is (kind, path prefix, controller namespace, resource).
+        self._stack: List[tuple] = [("root", "", "", None)]
+
+    def _add(self, verb: str, path: str, action: str) -> None:
+        self.routes.append({"verb": verb, "path": path or "/", "action": action})
+
+    def feed(self, line: str) -> None:
+        line = _COMMENT.sub("", line)
+        if not line.strip():
+            return
+        _, prefix, controller_ns, resource = self._stack[-1]
+
+        match = _RESOURCES.match(line)
+        if match:
+            kind, name, options, opens_block = match.groups()
+            singular = kind == "resource"
+            actions = _SINGULAR_RESOURCE_ACTIONS if singular else _RESOURCE_ACTIONS
+            only = _symbols(_ONLY.search(options))
+            excluded = _symbols(_EXCEPT.search(options)) or []
+            base = f"{prefix}/{name}"
+            controller = f"{controller_ns}{name + 's' if singular else name}"
+            for action, (verb, suffix) in actions.items():
+                if (only is None or action in only) and action not in excluded:
+                    self._add(verb, base + suffix, f"{controller}#{action}")
+            if opens_block:
+                member_prefix = base if singular else f"{base}/:{_singular(name)}_id"
+                self._stack.append(
+                    ("resource", member_prefix, controller_ns, (base, controller, singular))
+                )
+            return
+
+        match = _NAMESPACE.match(line)
+        if match:
+            name = match.group(1)
+            self._stack.append(("namespace", f"{prefix}/{name}", f"{controller_ns}{name}/", None))
+            return
+
+        match = _SCOPE.match(line)
+        if match:
+            path = match.group(1).strip("/")
+            self._stack.append(("scope", f"{prefix}/{path}" if path else prefix, controller_ns, None))
+            return
+
+        match = _MEMBER.match(line)
+        if match and resource:
+            base, controller, singular = resource
+            block_prefix = base if singular or match.group(1) == "collection" else f"{base}/:id"
+            self._stack.append((match.group(1), block_prefix, controller_ns, (base, controller, singular)))
+            return
+
+        match = _VERB.match(line)
+        if match:
+            verb, symbol, path, options = match.groups()
+            target = _TO.search(options)
+            segment = symbol or path.strip("/")
+            if self._stack[-1][0] in ("member", "collection") and resource:
+                action = f"{resource[1]}#{symbol or segment}"
+            elif target:
+                action = f"{controller_ns}{target.group(1)}"
+            elif "#" in (path or ""):
+                action = f"{controller_ns}{path}"
+                segment = path.split("#")[0]
+            else:
+                action = f"{controller_ns}{segment.replace('/', '#', 1)}"
+            self._add(verb.upper(), f"{prefix}/{segment}", action)
+            if _BLOCK_OPENER.search(options):
+                self._stack.append(("block", prefix, controller_ns, resource))
+            return
+
+        match = _ROOT.match(line)
+        if match:
+            self._add("GET", prefix or "/", f"{controller_ns}{match.group(1)}")
+            return
+
+        if _END.match(line):
+            if len(self._stack) > 1:
+                self._stack.pop()
+            return
+        if _BLOCK_OPENER.search(line):
+            # Any other block (constraints, concerns, ...) keeps the context.
+            self._stack.append(("block", prefix, controller_ns, resource))
+
+    def result(self) -> dict:
+        return {"routes": self.routes}
+
+
+PARSERS = {
+    "db/schema.rb": SchemaParser,
+    "config/routes.rb": RoutesParser,
+}
+
+
+def _terms(terms: List[str]) -> List[str]:
+    normalized = []
+    for term in terms:
+        term = _singular(term.lower().strip())
+        if term:
+            normalized.append(term)
+    return normalized
+
+
+def query_tables(index: dict, terms: List[str]) -> Dict[str, dict]:
+    """
+    Returns the tables whose name, or one of whose columns, matches any of
+    `terms`, along with tables that reference them through foreign keys.
+    """
+    tables = index.get("tables", {})
+    terms = _terms(terms)
+    matches = {}
+    for name, table in tables.items():
+        haystack = [name.lower(), *(column.lower() for column in table["columns"])]
+        if any(term in item for term in terms for item in haystack):
+            matches[name] = table
+    for name, table in tables.items():
+        if name not in matches and any(fk in matches for fk in table["foreign_keys"]):
+            matches[name] = table
+    return matches
+
+
+def query_routes(index: dict, terms: List[str]) -> List[dict]:
+    """Returns the routes whose path or controller action matches any term."""
+    terms = _terms(terms)
+    return [
+        route
+        for route in index.get("routes", [])
+        if any(term in route["path"].lower() or term in route["action"].lower() for term in terms)
+    ]
@@ -0,0 +1,224 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A BM25 index over every file of a repository, built once per commit and
+persisted. Indexes are built incrementally: files whose blob id is unchanged
+since the previous commit's index are carried over instead of re-read.
+"""
+
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from ..cache import cache_key, cache_root
+
+# Only the head of each file is indexed, and files larger than
+# MAX_FILE_BYTES (generated code, vendored bundles) are indexed by path only.
+MAX_INDEXED_BYTES = 32 * 1024
+MAX_FILE_BYTES = 1024 * 1024
+# Path components are a strong relevance signal, so they count extra.
+PATH_TERM_WEIGHT = 3
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9_]+")
+_SUBWORD = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits `text` into lowercase terms. Identifiers are also split into their
+    snake_case and camelCase parts, so "UserComment" matches "comment".
+    """
+    terms = []
+    for word in _WORD.findall(text):
+        lowered = word.lower()
+        terms.append(lowered)
+        parts = [part.lower() for part in _SUBWORD.findall(word)]
+        if len(parts) > 1:
+            terms.extend(part for part in parts if len(part) > 1)
+    return terms
+
+
+def index_blob(stream: BinaryIO, size: int) -> Dict[str, int]:
+    """Returns the term frequencies of the indexable head of a blob."""
+    if size > MAX_FILE_BYTES:
+        return {}
+    head = stream.read(MAX_INDEXED_BYTES)
+    if b"\0" in head[:8192]:
+        return {}
+    return dict(Counter(tokenize(head.decode("utf-8", errors="replace"))))
+
+
+class SearchIndex:
+    """
+    Per-document term frequencies plus document frequencies. Each document is
+    stored as [blob id, length, {term: tf}].
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, commit: str, docs: Optional[Dict[str, list]] = None):
+        self.commit = commit
+        self.docs: Dict[str, list] = docs or {}
+        self._postings: Optional[Dict[str, List[Tuple[str, int]]]] = None
+
+    @classmethod
+    def build(
+        cls,
+        commit: str,
+        tree: Dict[str, tuple],
+        read_blobs: Callable[[Dict[str, str], Callable], Dict[str, Dict[str, int]]],
+        previous: Optional["SearchIndex"] = None,
+    ) -> Tuple["SearchIndex", dict]:
+        """
+        Builds the index of `tree` ({path: (blob id, size)}) at `commit`.
+        `read_blobs` reads {path: blob id} with a (path, stream) reader.
+        Documents whose blob is unchanged in `previous` are reused.
+        """
+        previous_docs = previous.docs if previous else {}
+        docs = {}
+        to_read = {}
+        for path, (blob_id, size) in tree.items():
+            old = previous_docs.get(path)
+            if old is not None and old[0] == blob_id:
+                docs[path] = old
+            else:
+                to_read[path] = blob_id
+
+        sizes = {path: tree[path][1] for path in to_read}
+        contents = read_blobs(to_read, lambda path, stream: index_blob(stream, sizes[path]))
+        for path, blob_id in to_read.items():
+            terms = Counter(contents.get(path) or {})
+            for term in tokenize(path):
+                terms[term] += PATH_TERM_WEIGHT
+            docs[path] = [blob_id, sum(terms.values()), dict(terms)]
+
+        stats = {
+            "files": len(docs),
+            "indexed": len(to_read),
+            "reused": len(docs) - len(to_read),
+            "removed": len(set(previous_docs) - set(docs)),
+        }
+        return cls(commit, docs), stats
+
+    def _build_postings(self) -> Dict[str, List[Tuple[str, int]]]:
+        postings: Dict[str, List[Tuple[str, int]]] = {}
+        for path, (_, _, terms) in self.docs.items():
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((path, tf))
+        return postings
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Returns up to `top_k` (path, score) pairs ranked by BM25."""
+        if self._postings is None:
+            self._postings = self._build_postings()
+        if not self.docs:
+            return []
+        total_docs = len(self.docs)
+        average_length = sum(doc[1] for doc in self.docs.values()) / total_docs or 1
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for path, tf in postings:
+                length = self.docs[path][1]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[path] = scores.get(path, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def to_json(self) -> dict:
+        return {"commit": self.commit, "docs": self.docs}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "SearchIndex":
+        return cls(data["commit"], data["docs"])
+
+
+class SearchIndexStore:
+    """
+    Persists search indexes as gzipped JSON, one file per repository and
+    commit, keeping the `keep` most recently written per repository.
+    """
+
+    def __init__(self, root: Optional[str] = None, keep: int = 3):
+        self.root = root or os.path.join(cache_root(), "search")
+        self.keep = keep
+
+    def _directory(self, repo_url: str) -> str:
+        return os.path.join(self.root, cache_key(repo_url)[:24])
+
+    def _read(self, path: str) -> Optional[SearchIndex]:
+        try:
+            with gzip.open(path, "rt") as f:
+                return SearchIndex.from_json(json.load(f))
+        except (FileNotFoundError, EOFError, OSError, json.JSONDecodeError):
+            return None
+
+    def load(self, repo_url: str, commit: str) -> Optional[SearchIndex]:
+        return self._read(os.path.join(self._directory(repo_url), f"{commit}.json.gz"))
+
+    def latest(self, repo_url: str) -> Optional[SearchIndex]:
+        """Returns the most recently written index of `repo_url`, if any."""
+        directory = self._directory(repo_url)
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith(".json.gz")]
+        except FileNotFoundError:
+            return None
+        paths = sorted(
+            (os.path.join(directory, name) for name in names),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        return self._read(paths[0]) if paths else None
+
+    def save(self, repo_url: str, index: SearchIndex) -> None:
+        directory = self._directory(repo_url)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", compresslevel=1) as f:
+            json.dump(index.to_json(), f, separators=(",", ":"))
+        os.replace(tmp_path, os.path.join(directory, f"{index.commit}.json.gz"))
+
+        paths = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json.gz")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in paths[self.keep:]:
+            os.remove(path)
+
+
+def best_snippet(text: str, query: str, window: int = 20) -> str:
+    """Returns the `window`-line stretch of `text` with the most query terms."""
+    lines = text.splitlines()
+    if len(lines) <= window:
+        return text
+    terms = set(tokenize(query))
+    hits = [sum(1 for term in tokenize(line) if term in terms) for line in lines]
+    best_start, best, current = 0, -1, sum(hits[:window])
+    for start in range(len(lines) - window + 1):
+        if start:
+            current += hits[start + window - 1] - hits[start - 1]
+        if current > best:
+            best_start, best = start, current
+    return "\n".join(lines[best_start:best_start + window])
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..context_packer import estimate_tokens
+from . import context_analysis_tool
+from .bounded_reader import FileBudget, read_bounded
+from .repo_search import SearchIndex, SearchIndexStore, best_snippet
+
+search_index_store = SearchIndexStore()
+
+# How many files are returned, and roughly how many tokens of snippets.
+SEARCH_TOP_K = int(os.environ.get("OCTO_GUIDE_SEARCH_TOP_K", 8))
+SEARCH_TOKEN_BUDGET = int(os.environ.get("OCTO_GUIDE_SEARCH_TOKEN_BUDGET", 2000))
+
+
+def _build_search_index(repo_url: str, commit: str) -> SearchIndex:
+    index = search_index_store.load(repo_url, commit)
+    if index is not None:
+        return index
+    pool = context_analysis_tool.mirror_pool
+    previous = search_index_store.latest(repo_url)
+    index, stats = SearchIndex.build(
+        commit,
+        pool.list_tree(repo_url, commit),
+        lambda blobs, reader: pool.read_objects(repo_url, blobs, reader),
+        previous,
+    )
+    logging.info(f"Indexed {repo_url} at {commit}: {stats}")
+    search_index_store.save(repo_url, index)
+    return index
+
+
+async def load_search_index(repo_url: str, commit: str) -> SearchIndex:
+    """Returns the search index of `repo_url` at `commit`, building it if needed."""
+    await context_analysis_tool.mirror_pool.update(repo_url, commit)
+    return await asyncio.to_thread(_build_search_index, repo_url, commit)
+
+
+def _read_snippets(repo_url: str, commit: str, ranked: list, query: str) -> list:
+    contents = context_analysis_tool.mirror_pool.read_files(
+        repo_url,
+        commit,
+        [path for path, _ in ranked],
+        lambda path, stream: read_bounded(stream, FileBudget(max_lines=2000, max_bytes=64 * 1024)),
+    )
+    results = []
+    for path, score in ranked:
+        content = contents.get(path)
+        snippet = "" if content is None or content.binary else best_snippet(content.text, query)
+        results.append({"path": path, "score": round(score, 3), "snippet": snippet})
+    return results
+
+
+async def search_repo(query: str, tool_context: ToolContext) -> dict:
+    """
+    Finds the files in the analyzed repositories that are most relevant to
+    `query` and returns the most relevant snippet of each.
+
+    Args:
+        query: A description of the feature or the code you are looking for.
+    """
+    repositories = tool_context.state.get("repositories") or {}
+    if not repositories:
+        return {"success": False, "error": "No repository has been analyzed yet."}
+
+    ranked = []
+    for repo_url, commit in repositories.items():
+        index = await load_search_index(repo_url, commit)
+        ranked.extend((score, repo_url, commit, path) for path, score in index.search(query, SEARCH_TOP_K))
+    ranked.sort(reverse=True)
+    ranked = ranked[:SEARCH_TOP_K]
+
+    snippets = {}
+    for repo_url, commit in repositories.items():
+        hits = [(path, score) for score, url, _, path in ranked if url == repo_url]
+        if hits:
+            for entry in await asyncio.to_thread(_read_snippets, repo_url, commit, hits, query):
+                snippets[repo_url, entry["path"]] = entry
+
+    # Snippets are kept in rank order while they fit in the token budget;
+    # lower ranked files past the budget are still listed, without a snippet.
+    results = []
+    budget = SEARCH_TOKEN_BUDGET
+    for _, repo_url, _, path in ranked:
+        entry = dict(snippets[repo_url, path], repository=repo_url)
+        cost = estimate_tokens(entry["snippet"])
+        if cost > budget:
+            entry["snippet"] = ""
+        else:
+            budget -= cost
+        results.append(entry)
+    return {"success": True, "results": results}
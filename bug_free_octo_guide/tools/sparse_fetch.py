@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+from typing import Any, BinaryIO, Callable, Dict, Iterable
+
+from .git_utils import run_git_async
+from .mirror_pool import read_all
+
+FILTER_UNSUPPORTED = "filtering not recognized by server"
+
+
+async def sparse_checkout(repo_url: str, dest: str, file_paths: Iterable[str]) -> str:
+    """
+    Checks out only `file_paths` of the latest commit of `repo_url` into
+    `dest`, using a blob-less partial clone so that no other file contents
+    are transferred.
+
+    Servers that don't support filters send the whole tree instead; in that
+    case the result is an ordinary shallow clone. Returns the mode that was
+    used, either "sparse" or "shallow".
+    """
+    result = await run_git_async(
+        ["clone", "--depth", "1", "--filter=blob:none", "--no-checkout", repo_url, dest]
+    )
+    if FILTER_UNSUPPORTED in result.stderr:
+        logging.info(f"{repo_url} does not support partial clone; checking out fully.")
+        await run_git_async(["checkout", "--quiet"], cwd=dest)
+        return "shallow"
+
+    await run_git_async(["sparse-checkout", "set", "--no-cone", *file_paths], cwd=dest)
+    await run_git_async(["checkout", "--quiet"], cwd=dest)
+    return "sparse"
+
+
+def read_checked_out_files(
+    dest: str,
+    file_paths: Iterable[str],
+    reader: Callable[[str, BinaryIO], Any] = read_all,
+) -> Dict[str, Any]:
+    """
+    Reads `file_paths` from a checkout with `reader`, mapping missing files
+    to None.
+    """
+    contents = {}
+    for file_path in file_paths:
+        full_path = os.path.join(dest, file_path)
+        if os.path.isfile(full_path):
+            with open(full_path, "rb") as f:
+                contents[file_path] = reader(file_path, f)
+        else:
+            contents[file_path] = None
+    return contents
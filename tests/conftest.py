@@ -0,0 +1,98 @@
+import os
+import re
+
+import pytest
+
+from tests.helpers import commit_files, git
+
+
+@pytest.fixture
+def rails_repo(tmp_path):
+    """A local git repository laid out like a small Rails application."""
+    repo = str(tmp_path / "rails_app")
+    os.makedirs(repo)
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "test@example.com")
+    git(repo, "config", "user.name", "Test")
+    commit_files(
+        repo,
+        {
+            "Gemfile": 'source "https://rubygems.org"\ngem "rails"\n',
+            "config/routes.rb": "Rails.application.routes.draw do\n  resources :users\nend\n",
+            "db/schema.rb": 'ActiveRecord::Schema.define do\n  create_table "users" do |t|\n    t.string "name"\n  end\nend\n',
+        },
+        message="initial",
+    )
+    return repo
+
+
+@pytest.fixture
+def analysis_cache(tmp_path, monkeypatch):
+    """Points repository analysis at a private cache and mirror pool."""
+    from bug_free_octo_guide.cache import DiskCache
+    from bug_free_octo_guide.tools import context_analysis_tool
+    from bug_free_octo_guide.tools.mirror_pool import MirrorPool
+
+    cache = DiskCache("analysis", root=str(tmp_path / "cache"))
+    monkeypatch.setattr(context_analysis_tool, "analysis_cache", cache)
+    monkeypatch.setattr(
+        context_analysis_tool,
+        "index_cache",
+        DiskCache("rails_index", root=str(tmp_path / "cache")),
+    )
+    monkeypatch.setattr(
+        context_analysis_tool, "mirror_pool", MirrorPool(str(tmp_path / "mirrors"))
+    )
+    return cache
+
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), "recordings")
+
+
+@pytest.fixture(autouse=True)
+def recorded_models(request, tmp_path, monkeypatch):
+    """
+    Routes every Gemini call through the recordings of the current test, as
+    selected by OCTO_GUIDE_LLM_MODE (default "replay": a request without a
+    recording fails instead of reaching the network, so no test needs an
+    API key). Use "record" or "auto" with a key to capture new recordings.
+    Recordings marked "source": "hand-written" were written without a
+    model: they pin the requests the agents make (prompts, tool
+    declarations, tool results) and script the replies, so recording them
+    again with a key replaces them with real ones.
+    The response cache is kept private to the test so recordings are
+    complete.
+    """
+    from bug_free_octo_guide.cache import DiskCache
+    from bug_free_octo_guide.models import cache
+    from bug_free_octo_guide.models.replay import Recorder, llm_mode
+    from google.adk.models import Gemini
+
+    monkeypatch.setattr(cache, "response_cache", DiskCache("llm", root=str(tmp_path / "cache")))
+    recorder = Recorder(
+        os.path.join(
+            RECORDINGS_DIR,
+            request.module.__name__.rsplit(".", 1)[-1],
+            re.sub(r"[^\w.-]", "_", request.node.name),
+        ),
+        llm_mode(default="replay"),
+    )
+    generate_live = Gemini.generate_content_async
+
+    def generate(self, llm_request, stream=False):
+        return recorder.generate(
+            self.model, llm_request, stream, lambda: generate_live(self, llm_request, stream)
+        )
+
+    monkeypatch.setattr(Gemini, "generate_content_async", generate)
+    return recorder
+
+
+@pytest.fixture(autouse=True)
+def prd_library(tmp_path, monkeypatch):
+    """Keeps the PRDs a test assembles in a library private to the test."""
+    from bug_free_octo_guide import prd_library as library_module
+
+    library = library_module.PrdLibrary(str(tmp_path / "prd_library.sqlite3"))
+    monkeypatch.setattr(library_module, "_library", library)
+    return library
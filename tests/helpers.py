@@ -0,0 +1,21 @@
+import os
+import subprocess
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit_files(repo, files, message="update"):
+    """Writes `files` (path -> content) into `repo` and commits them."""
+    for path, content in files.items():
+        full_path = os.path.join(repo, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(full_path, mode) as f:
+            f.write(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import time
+
+import pytest
+from bug_free_octo_guide import batch
+from bug_free_octo_guide.batch import BatchRunner, RateLimiter, read_requests
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.pipeline import PrdPipeline
+
+pytest_plugins = ("pytest_asyncio",)
+
+GOALS = {
+    "primary_objective": "Let users comment",
+    "success_metric": "Comments per post",
+    "non_goals": ["Threads"],
+}
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_analysis_and_resumes(rails_repo, analysis_cache, tmp_path, monkeypatch):
+    """Tests that requests share one analysis per repository and that a rerun skips finished ones."""
+    analyzed = []
+    analyze_repo_url = batch.analyze_repo_url
+
+    async def counting_analyze(repo_url):
+        analyzed.append(repo_url)
+        return await analyze_repo_url(repo_url)
+
+    monkeypatch.setattr(batch, "analyze_repo_url", counting_analyze)
+    repo_url = f"file://{rails_repo}"
+    input_path = tmp_path / "requests.jsonl"
+    input_path.write_text(
+        "\n".join(
+            json.dumps(request)
+            for request in [
+                {"id": "comments", "repo": repo_url, "description": "Comments", "goals": GOALS},
+                {"id": "likes", "repo": repo_url, "description": "Likes", "goals": GOALS},
+                {"description": "No goals"},
+            ]
+        )
+    )
+    output_path = str(tmp_path / "prds.jsonl")
+    llm = FakeLlm(latency=0.05, responses={"database schema": "create_table comments"})
+
+    summary = await BatchRunner(PrdPipeline(llm), concurrency=3).run(read_requests(input_path), output_path)
+    assert (summary["succeeded"], summary["failed"], summary["skipped"]) == (2, 1, 0)
+    assert analyzed == [repo_url]
+
+    with open(output_path) as f:
+        results = {result["id"]: result for result in map(json.loads, f)}
+    assert "create_table comments" in results["comments"]["prd"]
+    assert set(results["likes"]["timings"]["sections"]) == {
+        "solution", "api_changes", "db_schema", "implementation", "testing"
+    }
+    assert not results["line-3"]["success"]
+
+    # Only the failed request is tried again.
+    summary = await BatchRunner(PrdPipeline(llm)).run(read_requests(input_path), output_path)
+    assert (summary["succeeded"], summary["failed"], summary["skipped"]) == (0, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_out_acquisitions():
+    """Tests that the rate limiter spaces acquisitions out beyond its burst."""
+    limiter = RateLimiter(rate=20, burst=1)
+    started = time.perf_counter()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+    assert time.perf_counter() - started >= 4 / 20 * 0.9
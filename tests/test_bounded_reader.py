@@ -0,0 +1,50 @@
+import io
+
+from bug_free_octo_guide.tools.bounded_reader import FileBudget, read_bounded
+
+
+class CountingStream(io.BytesIO):
+    """A stream that records how many bytes were read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, n=-1):
+        data = super().read(n)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_read_bounded_stops_at_line_and_byte_budgets():
+    """
+    Tests that reading stops once either budget is used up, without
+    consuming the rest of a large file, and reports truncation.
+    """
+    stream = CountingStream(b"".join(b"line %d\n" % i for i in range(200000)))
+    result = read_bounded(stream, FileBudget(max_lines=3, max_bytes=1024))
+    assert result.text == "line 0\nline 1\nline 2\n"
+    assert result.truncated
+    assert stream.bytes_read < 16 * 1024
+
+    result = read_bounded(io.BytesIO(b"a" * 100), FileBudget(max_lines=3, max_bytes=10))
+    assert result.text == "a" * 10
+    assert result.truncated
+
+    result = read_bounded(io.BytesIO(b"one\ntwo\n"), FileBudget(max_lines=2, max_bytes=1024))
+    assert result.text == "one\ntwo\n"
+    assert not result.truncated
+
+
+def test_read_bounded_handles_binary_and_invalid_utf8():
+    """
+    Tests that binary files are flagged rather than decoded and that
+    invalid UTF-8 is replaced instead of raising.
+    """
+    result = read_bounded(io.BytesIO(b"\x89PNG\r\n\x1a\n\0\0\0"), FileBudget())
+    assert result.binary
+    assert result.text == ""
+
+    result = read_bounded(io.BytesIO(b"caf\xe9\n"), FileBudget())
+    assert result.text == "caf�\n"
+    assert not result.binary
@@ -0,0 +1,39 @@
+import os
+import time
+
+from bug_free_octo_guide.cache import DiskCache
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """
+    Tests that the cache stays under its size bound by evicting the entry
+    that was read least recently.
+    """
+    cache = DiskCache("test", max_bytes=200, root=str(tmp_path))
+    cache.put("a", "x" * 50)
+    cache.put("b", "y" * 50)
+    past = time.time() - 60
+    os.utime(os.path.join(cache.directory, "b.json"), (past, past))
+    assert cache.get("a") is not None
+
+    cache.put("c", "z" * 50)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 50
+    assert cache.get("c") == "z" * 50
+    stats = cache.stats()
+    assert stats["bytes_on_disk"] <= 200
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_disk_cache_expires_entries(tmp_path):
+    """
+    Tests that entries older than the TTL are treated as misses.
+    """
+    cache = DiskCache("test", ttl_seconds=0, root=str(tmp_path))
+    cache.put("a", {"value": 1})
+    time.sleep(0.01)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,191 @@
+import asyncio
+import subprocess
+import time
+
+import pytest
+from bug_free_octo_guide.tools.bounded_reader import FileBudget
+from bug_free_octo_guide.tools import context_analysis_tool
+from bug_free_octo_guide.tools.git_utils import run_git_async
+from tests.helpers import commit_files
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_analyze_repo_url_caches_by_head_commit(rails_repo, analysis_cache):
+    """
+    Tests that a repeat analysis is served from the cache and that moving
+    the default branch invalidates it.
+    """
+    repo_url = f"file://{rails_repo}"
+
+    first = await context_analysis_tool.analyze_repo_url(repo_url)
+    second = await context_analysis_tool.analyze_repo_url(repo_url)
+
+    assert first["success"]
+    assert "gem \"rails\"" in first["summaries"]["Gemfile"]
+    assert first["summaries"]["conventions.md"] == "File not found."
+    assert second == first
+    assert analysis_cache.stats()["hits"] == 1
+
+    commit_files(rails_repo, {"Gemfile": 'gem "pundit"\n'})
+    third = await context_analysis_tool.analyze_repo_url(repo_url)
+
+    assert third["commit"] != first["commit"]
+    assert "pundit" in third["summaries"]["Gemfile"]
+    assert analysis_cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_repo_url_reports_clone_failure(tmp_path, analysis_cache):
+    """
+    Tests that an unreachable repository produces an error result.
+    """
+    result = await context_analysis_tool.analyze_repo_url(f"file://{tmp_path}/missing")
+
+    assert not result["success"]
+    assert "Failed to clone repository" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_repo_url_sparse_mode(rails_repo, analysis_cache, monkeypatch):
+    """
+    Tests that the sparse fetch mode produces the same summaries as mirrors.
+    """
+    monkeypatch.setattr(context_analysis_tool, "FETCH_MODE", "sparse")
+
+    result = await context_analysis_tool.analyze_repo_url(f"file://{rails_repo}")
+
+    assert result["success"]
+    assert "resources :users" in result["summaries"]["config/routes.rb"]
+    assert result["summaries"]["conventions.md"] == "File not found."
+
+
+@pytest.mark.asyncio
+async def test_analyze_repo_url_applies_file_budgets(rails_repo, analysis_cache):
+    """
+    Tests that per-file budgets bound the summaries and that truncated files
+    are reported.
+    """
+    schema = "".join(f'  create_table "t{i}"\n' for i in range(10000))
+    commit_files(rails_repo, {"db/schema.rb": schema})
+    budgets = {
+        "db/schema.rb": FileBudget(max_lines=5, max_bytes=4096),
+        "Gemfile": FileBudget(max_lines=50, max_bytes=4096),
+    }
+
+    result = await context_analysis_tool.analyze_repo_url(
+        f"file://{rails_repo}", budgets
+    )
+
+    assert result["summaries"]["db/schema.rb"].count("\n") == 5
+    assert result["truncated"] == ["db/schema.rb"]
+    assert set(result["summaries"]) == {"db/schema.rb", "Gemfile"}
+
+
+async def fake_analyze_repo_url(repo_url):
+    await asyncio.sleep(0.3)
+    if repo_url.endswith("broken"):
+        return {"success": False, "error": "Failed to clone repository: gone"}
+    return {"success": True, "summaries": {}}
+
+
+@pytest.mark.asyncio
+async def test_analyze_repo_analyzes_all_repositories_concurrently(monkeypatch):
+    """
+    Tests that every repository in the prompt is analyzed, in parallel, and
+    that per-repository errors are reported together.
+    """
+    monkeypatch.setattr(context_analysis_tool, "analyze_repo_url", fake_analyze_repo_url)
+    prompt = (
+        "Touches https://github.com/acme/api.git, https://github.com/acme/web "
+        "and https://github.com/acme/broken. See also https://github.com/acme/api."
+    )
+
+    start = time.perf_counter()
+    result = await context_analysis_tool.analyze_repo(prompt)
+    elapsed = time.perf_counter() - start
+
+    assert list(result["repositories"]) == [
+        "https://github.com/acme/api",
+        "https://github.com/acme/web",
+        "https://github.com/acme/broken",
+    ]
+    assert not result["success"]
+    assert result["errors"] == {
+        "https://github.com/acme/broken": "Failed to clone repository: gone"
+    }
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_prewarm_and_concurrent_analyses_share_one_run(rails_repo, analysis_cache, monkeypatch):
+    """Tests that a prewarm and the analyses that follow it run only once."""
+    runs = []
+    analyze = context_analysis_tool._analyze_repo_url
+
+    async def counting_analyze(repo_url, budgets):
+        runs.append(repo_url)
+        return await analyze(repo_url, budgets)
+
+    monkeypatch.setattr(context_analysis_tool, "_analyze_repo_url", counting_analyze)
+    repo_url = f"file://{rails_repo}"
+
+    assert await context_analysis_tool.prewarm_repo(repo_url) == "started"
+    assert await context_analysis_tool.prewarm_repo(repo_url) == "running"
+    first, second = await asyncio.gather(
+        context_analysis_tool.analyze_repo_url(repo_url),
+        context_analysis_tool.analyze_repo_url(repo_url),
+    )
+    assert first["success"] and second == first
+    assert runs == [repo_url]
+    assert not context_analysis_tool._in_flight
+
+
+@pytest.mark.asyncio
+async def test_prewarm_skips_missing_repositories_and_is_capped(rails_repo, analysis_cache, monkeypatch):
+    """Tests that prewarms never clone a missing repository and run one at a time."""
+    monkeypatch.setattr(context_analysis_tool, "MAX_PREWARMS", 1)
+    missing = await context_analysis_tool.prewarm_repo(f"file://{rails_repo}-missing")
+    assert missing == "not_found"
+    assert not context_analysis_tool._in_flight
+
+    assert await context_analysis_tool.prewarm_repo(f"file://{rails_repo}") == "started"
+    assert await context_analysis_tool.prewarm_repo(f"file://{rails_repo}/.git") == "busy"
+    result = await context_analysis_tool.analyze_repo_url(f"file://{rails_repo}")
+    assert result["success"]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_last_waiter_kills_git(analysis_cache, monkeypatch):
+    """Tests that abandoning the only analysis of a repository stops its clone."""
+    marker = "37.5151"
+
+    async def resolve_head_commit(repo_url):
+        return None
+
+    async def update(repo_url, commit=None):
+        await run_git_async(["-c", f"alias.hang=!sleep {marker}", "hang"])
+
+    monkeypatch.setattr(context_analysis_tool, "resolve_head_commit", resolve_head_commit)
+    monkeypatch.setattr(context_analysis_tool.mirror_pool, "update", update)
+
+    def git_running():
+        return subprocess.run(["pgrep", "-f", f"sleep {marker}"], capture_output=True).returncode == 0
+
+    task = asyncio.create_task(context_analysis_tool.analyze_repo_url("https://github.com/acme/slow"))
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if git_running():
+            break
+    assert git_running()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    for _ in range(50):
+        if not git_running() and not context_analysis_tool._in_flight:
+            break
+        await asyncio.sleep(0.02)
+    assert not git_running()
+    assert not context_analysis_tool._in_flight
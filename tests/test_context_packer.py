@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from bug_free_octo_guide.context_packer import (
+    ContextItem,
+    estimate_tokens,
+    make_context_packer,
+    pack_context,
+)
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+
+def test_pack_context_dedupes_and_drops_lowest_priority_first():
+    """
+    Tests that repeated paragraphs are packed once, that material already in
+    the request is skipped, and that low priority items go first.
+    """
+    shared = "Users can comment on documents."
+    items = [
+        ContextItem("Summaries", "schema " * 400, priority=5),
+        ContextItem("Goals", f"{shared}\n\nSuccess: 10% more comments.", priority=0),
+        ContextItem("Solution", f"{shared}\n\nAdd a Comment model.", priority=1),
+        ContextItem("Testing", "Request specs for comments.", priority=6),
+    ]
+
+    packed = pack_context(items, budget=100, seen=["Add a Comment model."])
+
+    assert packed["text"].count(shared) == 1
+    assert "Add a Comment model" not in packed["text"]
+    assert packed["included"] == ["Goals", "Summaries"]
+    assert "[...]" in packed["text"]
+    assert packed["dropped"] == ["Testing"]
+    assert estimate_tokens(packed["text"]) <= 100
+
+
+def test_context_packer_adds_state_to_the_request():
+    """Tests that the callback packs goals and repository summaries."""
+    state = {
+        "goals": "## Goals\n- **Objective:** Comments",
+        "repository_summaries": {
+            "file:///repo": {"db/schema.rb": "create_table users", "Gemfile": "File not found."}
+        },
+        "db_schema": "Add a comments table.",
+    }
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Design the API.")])])
+
+    make_context_packer("api_changes", budget=200)(SimpleNamespace(state=state), request)
+
+    instruction = request.config.system_instruction
+    assert "Objective:** Comments" in instruction
+    assert "create_table users" in instruction
+    assert "Add a comments table." in instruction
+    assert "File not found." not in instruction
+    assert instruction.index("Comments") < instruction.index("create_table users")
@@ -0,0 +1,41 @@
+import asyncio
+import subprocess
+import time
+
+import pytest
+from bug_free_octo_guide.tools.git_utils import run_git_async
+
+pytest_plugins = ("pytest_asyncio",)
+
+HANG = ["-c", "alias.hang=!sleep 30", "hang"]
+
+
+@pytest.mark.asyncio
+async def test_run_git_async_times_out_and_kills_git():
+    """
+    Tests that a git command exceeding its timeout is killed.
+    """
+    start = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired):
+        await run_git_async(HANG, timeout=0.2)
+    assert time.perf_counter() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_run_git_async_does_not_block_the_loop_and_can_be_cancelled():
+    """
+    Tests that other tasks keep running while git runs and that cancelling
+    the caller stops the command.
+    """
+    task = asyncio.create_task(run_git_async(HANG))
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.02)
+        ticks += 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert ticks == 5
+
+    result = await run_git_async(["--version"])
+    assert result.stdout.startswith("git version")
@@ -0,0 +1,62 @@
+import pytest
+from bug_free_octo_guide.agents.db_schema_agent import DbSchemaAgent
+from bug_free_octo_guide.cache import DiskCache
+from bug_free_octo_guide.models import CachingLlm, FakeLlm, cache, with_response_cache
+from bug_free_octo_guide.models.cache import request_fingerprint
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def run(agent, prompt):
+    runner = InMemoryRunner(agent=agent, app_name="bug-free-octo-guide")
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="test_user"
+    )
+    response = ""
+    async for event in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            response = event.content.parts[0].text
+    return response
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_are_served_from_the_cache(tmp_path, monkeypatch):
+    """Tests that identical requests reach the model once, and others don't hit."""
+    monkeypatch.setattr(cache, "response_cache", DiskCache("llm", root=str(tmp_path)))
+    llm = FakeLlm()
+    agent = with_response_cache(DbSchemaAgent(llm=llm))
+    assert isinstance(agent.model, CachingLlm)
+
+    first = await run(agent, "Add comments to documents.")
+    assert await run(agent, "Add comments to documents.") == first
+    assert len(llm.requests) == 1
+    assert cache.response_cache.stats()["hits"] == 1
+
+    await run(agent, "Add likes to documents.")
+    assert len(llm.requests) == 2
+
+    monkeypatch.setattr(cache, "LLM_CACHE_OPT_OUT", {"db_schema_agent"})
+    assert isinstance(with_response_cache(DbSchemaAgent(llm=llm)).model, FakeLlm)
+
+
+def test_fingerprint_ignores_function_call_ids():
+    """Tests that requests differing only in function call ids share a fingerprint."""
+    def request(call_id):
+        return LlmRequest(
+            contents=[
+                types.Content(
+                    role="model",
+                    parts=[types.Part(function_call=types.FunctionCall(id=call_id, name="find_tables", args={"terms": ["user"]}))],
+                )
+            ]
+        )
+
+    assert request_fingerprint("m", request("adk-1")) == request_fingerprint("m", request("adk-2"))
+    assert request_fingerprint("m", request("adk-1")) != request_fingerprint("other", request("adk-1"))
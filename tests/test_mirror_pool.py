@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+from bug_free_octo_guide.tools.mirror_pool import MirrorPool
+from tests.helpers import commit_files, git
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_mirror_pool_fetches_incrementally_and_reads_blobs(rails_repo, tmp_path):
+    """
+    Tests that concurrent updates share one mirror, that new commits are
+    fetched into it, and that files are read without a checkout.
+    """
+    pool = MirrorPool(str(tmp_path / "mirrors"))
+    repo_url = f"file://{rails_repo}"
+
+    paths = set(await asyncio.gather(*(pool.update(repo_url) for _ in range(4))))
+    assert len(paths) == 1
+    assert [name for name in os.listdir(pool.root) if name.endswith(".git")] == [
+        os.path.basename(paths.pop())
+    ]
+
+    new_commit = commit_files(rails_repo, {"conventions.md": "# Conventions\n"})
+    await pool.update(repo_url, new_commit)
+    assert pool.resolve(repo_url) == new_commit
+
+    contents = pool.read_files(
+        repo_url, new_commit, ["conventions.md", "config", "missing.rb", "Gemfile"]
+    )
+    assert contents["conventions.md"] == b"# Conventions\n"
+    assert contents["config"] is None
+    assert contents["missing.rb"] is None
+    assert contents["Gemfile"].startswith(b"source")
+    assert git(pool.mirror_path(repo_url), "rev-parse", "--is-bare-repository") == "true"
+
+
+@pytest.mark.asyncio
+async def test_mirror_pool_update_never_runs_git_on_the_event_loop(rails_repo, tmp_path, monkeypatch):
+    """Tests that checking for a commit already in the mirror does not block the loop."""
+    from bug_free_octo_guide.tools import mirror_pool
+
+    pool = MirrorPool(str(tmp_path / "mirrors"))
+    repo_url = f"file://{rails_repo}"
+    await pool.update(repo_url)
+    commit = await asyncio.to_thread(pool.resolve, repo_url)
+
+    def blocking_git(*args, **kwargs):
+        raise AssertionError("run_git called from the event loop")
+
+    monkeypatch.setattr(mirror_pool, "run_git", blocking_git)
+    assert await pool.update(repo_url, commit) == pool.mirror_path(repo_url)
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+from bug_free_octo_guide.agents.db_schema_agent import DbSchemaAgent
+from bug_free_octo_guide.models import FakeLlm, LazyAgentTool, shared_model
+
+
+def test_importing_the_package_does_not_build_agents():
+    """Tests that importing the package builds no sub-agent or model client."""
+    probe = (
+        "import sys, bug_free_octo_guide.cache\n"
+        "assert 'bug_free_octo_guide.agent' not in sys.modules\n"
+        "assert bug_free_octo_guide.root_agent.name == 'bug_free_octo_guide'\n"
+    )
+    subprocess.run([sys.executable, "-c", probe], check=True)
+
+
+def test_sub_agents_are_built_once_on_first_use_with_the_shared_model():
+    """Tests that sub-agents are built once, on first use, on the shared model client."""
+    from bug_free_octo_guide.agent import root_agent
+
+    built = []
+
+    def factory():
+        built.append(True)
+        return DbSchemaAgent(llm=FakeLlm())
+
+    tool = LazyAgentTool("db_schema_agent", factory, skip_summarization=True)
+    assert not tool.built
+    assert tool._get_declaration().name == "db_schema_agent"
+    tool._get_declaration()
+    assert built == [True]
+    # AgentTool.__init__ ran with the built agent and the options.
+    assert tool.description == tool.agent.description
+    assert tool.skip_summarization and tool.include_plugins
+
+    assert shared_model() is shared_model()
+    sub_agents = [tool for tool in root_agent.tools if isinstance(tool, LazyAgentTool)]
+    assert len(sub_agents) == 5
+    # Every agent is routed to a tier, and every tier uses the shared client.
+    models = [root_agent.model] + [getattr(tool.agent.model, "inner", tool.agent.model) for tool in sub_agents]
+    assert all(llm.llm is shared_model() for routed in models for _, llm in routed.tiers)
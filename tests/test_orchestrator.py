@@ -1,33 +1,54 @@
 import asyncio
 import pytest
 from bug_free_octo_guide.agent import root_agent
+from bug_free_octo_guide.tools import context_analysis_tool
 from google.adk.runners import InMemoryRunner
 from google.genai import types
 
 pytest_plugins = ("pytest_asyncio",)
 
+REPO_URL = "https://github.com/google/adk-samples"
+
+
+async def fake_analyze_repo_url(repo_url):
+    return {"success": True, "commit": "0123abc", "summaries": {"README.md": "ADK sample agents."}}
+
 
 @pytest.mark.asyncio
-async def test_orchestrator_asks_for_structured_goals():
+async def test_orchestrator_asks_for_structured_goals(monkeypatch):
     """
-    Tests that the orchestrator asks for the structured information
-    needed to call the `define_goals` tool.
+    Tests that the orchestrator first analyzes the repository in the prompt,
+    then asks for the structured information needed to call the
+    `define_goals` tool.
     """
-    prompt = "I want to add a commenting feature to the RAG agent in the https://github.com/google/adk-samples repository."
+    monkeypatch.setattr(context_analysis_tool, "analyze_repo_url", fake_analyze_repo_url)
+    prompt = f"I want to add a commenting feature to the RAG agent in the {REPO_URL} repository."
 
     runner = InMemoryRunner(agent=root_agent, app_name="bug-free-octo-guide")
     session = await runner.session_service.create_session(
         app_name=runner.app_name, user_id="test_user"
     )
     content = types.Content(parts=[types.Part(text=prompt)])
+    calls, results = [], {}
     response = ""
     async for event in runner.run_async(
         user_id=session.user_id,
         session_id=session.id,
         new_message=content,
     ):
-        if event.content.parts and event.content.parts[0].text:
-            response = event.content.parts[0].text
+        for part in event.content.parts or []:
+            if part.function_call:
+                calls.append((part.function_call.name, part.function_call.args))
+            elif part.function_response:
+                results[part.function_response.name] = part.function_response.response
+            elif part.text:
+                response = part.text
+
+    # The repository is analyzed before anything else.
+    assert calls[0][0] == "analyze_repo"
+    assert REPO_URL in calls[0][1]["prompt"]
+    assert results["analyze_repo"]["success"]
+    assert list(results["analyze_repo"]["repositories"]) == [REPO_URL]
 
     # The orchestrator should now ask for the specific arguments
     # required by the `define_goals` tool.
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from bug_free_octo_guide import pipeline
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.pipeline import PrdPipeline, run_graph
+from google.adk.sessions.state import State
+
+pytest_plugins = ("pytest_asyncio",)
+
+LATENCY = 0.5
+
+
+@pytest.mark.asyncio
+async def test_run_graph_starts_nodes_once_their_dependencies_finish():
+    """Tests the scheduling order and that failures cancel running nodes."""
+    events = []
+
+    async def run_node(node, results):
+        events.append(("start", node, sorted(results)))
+        await asyncio.sleep(0.01 if node != "slow" else 1)
+        if node == "bad":
+            raise RuntimeError("boom")
+        return node.upper()
+
+    results = await run_graph({"b": ["a"], "c": ["a"], "d": ["b", "c"]}, run_node, {"a": "A"})
+    assert results == {"a": "A", "b": "B", "c": "C", "d": "D"}
+    assert events[-1] == ("start", "d", ["a", "b", "c"])
+
+    with pytest.raises(RuntimeError):
+        await run_graph({"bad": [], "slow": []}, run_node, {})
+    with pytest.raises(ValueError):
+        await run_graph({"x": ["y"], "y": ["x"]}, run_node, {})
+
+
+@pytest.mark.asyncio
+async def test_pipeline_takes_about_the_critical_path(monkeypatch):
+    """
+    Tests that with a fixed model latency the five section agents finish in
+    about two model calls (solution, then the rest in parallel), not five.
+    """
+    llm = FakeLlm(
+        latency=LATENCY,
+        responses={
+            "propose a technical solution": "Add a Comment model.",
+            "API changes": "POST /documents/:id/comments",
+            "database schema": "create_table comments",
+            "implementation details": "CommentsController",
+            "testing strategy": "Request specs for comments.",
+        },
+    )
+    monkeypatch.setattr(pipeline, "_pipeline", PrdPipeline(llm))
+    state = State({"goals": "## Goals\n- Comments on documents"}, {})
+
+    started = time.perf_counter()
+    result = await pipeline.draft_prd("Comments on documents", SimpleNamespace(state=state))
+    elapsed = time.perf_counter() - started
+
+    assert result["success"]
+    # Two calls on the critical path plus first-run overhead; one after
+    # another the five calls would take at least 5 * LATENCY.
+    assert elapsed < 4 * LATENCY
+    assert "create_table comments" in result["prd"]
+    assert state["testing"] == "Request specs for comments."
+    # Every later section was written with the solution in its context.
+    later = [r for r in llm.requests if "propose a technical solution" not in r.config.system_instruction]
+    assert len(later) == 4
+    assert all("Add a Comment model." in r.config.system_instruction for r in later)
+
+    assert not (await pipeline.draft_prd("x", SimpleNamespace(state=State({}, {}))))["success"]
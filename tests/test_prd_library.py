@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from bug_free_octo_guide import pipeline
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.pipeline import PrdPipeline
+from bug_free_octo_guide.prd_library import (
+    minhash,
+    search_prd_library,
+    seed_prd_from_library,
+    similarity,
+)
+from bug_free_octo_guide.tools.prd_assembler_tool import assemble_prd
+from google.adk.sessions.state import State
+
+pytest_plugins = ("pytest_asyncio",)
+
+REPO = "https://github.com/example/app.git"
+
+COMMENTS = {
+    "goals": "## Goals\n- **Objective:** Let users comment on documents and reply to each other.",
+    "solution": "Add a Comment model that belongs to a document and a user, with a nested "
+    "CommentsController and Turbo streams so new comments appear without a reload.",
+    "api_changes": "POST /documents/:id/comments creates a comment. DELETE /comments/:id removes it.",
+    "db_schema": "create_table comments with document_id, user_id, body and timestamps, indexed on document_id.",
+    "implementation": "Add the model, controller, views and a policy that lets authors delete their comments.",
+    "testing": "Model specs for validations and request specs for creating and deleting comments.",
+}
+BILLING = {
+    "goals": "## Goals\n- **Objective:** Charge teams monthly through Stripe subscriptions.",
+    "solution": "Create a Subscription model synced from Stripe webhooks and gate paid features on its status.",
+    "api_changes": "POST /billing/checkout starts a Stripe Checkout session. POST /webhooks/stripe receives events.",
+    "db_schema": "create_table subscriptions with team_id, stripe_customer_id, status and current_period_end.",
+    "implementation": "Add a webhook controller that verifies signatures and a job that reconciles nightly.",
+    "testing": "Stub Stripe in request specs and replay recorded webhook payloads.",
+}
+
+
+def test_minhash_estimates_jaccard_similarity():
+    """Tests that MinHash signatures estimate the Jaccard similarity of 3-gram sets."""
+    words = [f"word{i}" for i in range(200)]
+    text = " ".join(words)
+    edited = " ".join(words[:150] + [f"other{i}" for i in range(50)])
+    assert similarity(minhash(text), minhash(text)) == 1.0
+    # 148 of the 248 distinct 3-grams are shared: a Jaccard similarity of 0.6.
+    assert similarity(minhash(text), minhash(edited)) == pytest.approx(0.6, abs=0.15)
+    assert similarity(minhash(text), minhash("nothing in common here")) < 0.1
+    assert minhash("") == []
+
+
+def test_library_finds_near_duplicates_and_skips_repeats(prd_library):
+    """Tests that a near-duplicate PRD is found and that storing one twice keeps one copy."""
+    comments = prd_library.add(COMMENTS, "Comments on documents", {REPO: "abc123"})
+    billing = prd_library.add(BILLING, "Stripe billing", {"https://github.com/example/other.git": "def456"})
+    assert prd_library.add(COMMENTS, "Comments on documents", {REPO: "abc123"}) == comments
+
+    query = {
+        "feature": "Comments on documents",
+        "solution": COMMENTS["solution"].replace("Turbo streams", "Action Cable"),
+    }
+    matches = prd_library.search(query, repo_url=REPO)
+    assert [match["id"] for match in matches] == [comments]
+    assert matches[0]["score"] > 0.5
+    assert matches[0]["same_repository"]
+    assert matches[0]["repositories"] == {REPO: "abc123"}
+
+    assert prd_library.get(billing)["sections"] == BILLING
+    assert prd_library.get(999) is None
+    assert prd_library.search({"feature": "an unrelated search about kubernetes autoscaling"}) == []
+
+
+def test_closer_matches_outrank_weak_ones_from_the_same_repository(prd_library):
+    """Tests that the same repository only breaks ties instead of overriding the score."""
+    other_repo = "https://github.com/example/other.git"
+    weak = prd_library.add({**BILLING, "goals": COMMENTS["goals"]}, "Comments on documents", {REPO: "abc"})
+    close = prd_library.add(COMMENTS, "Comments on documents", {other_repo: "def"})
+
+    query = {"feature": "Comments on documents", "solution": COMMENTS["solution"]}
+    matches = prd_library.search(query, repo_url=REPO)
+    assert [match["id"] for match in matches] == [close, weak]
+    assert matches[0]["score"] > 0.9 and matches[1]["score"] < 0.6
+    assert matches[1]["same_repository"] and not matches[0]["same_repository"]
+
+
+def test_assembled_prds_are_indexed_by_feature(prd_library):
+    """Tests that the feature description given to assemble_prd is stored and searchable."""
+    state = State({"repositories": {REPO: "abc123"}}, {})
+    assemble_prd(**COMMENTS, tool_context=SimpleNamespace(state=state), feature_description="Document comments")
+    (match,) = prd_library.search({"feature": "Document comments"})
+    assert match["feature"] == "Document comments"
+
+
+@pytest.mark.asyncio
+async def test_assembling_from_the_event_loop_writes_on_a_worker_thread(prd_library, monkeypatch):
+    """Tests that the library write of assemble_prd does not run on the event loop."""
+    threads = []
+    add = prd_library.add
+    monkeypatch.setattr(prd_library, "add", lambda *args: threads.append(threading.get_ident()) or add(*args))
+
+    assemble_prd(**COMMENTS, tool_context=SimpleNamespace(state=State({}, {})), feature_description="Comments")
+    for _ in range(100):
+        if prd_library.search({"feature": "Comments"}):
+            break
+        await asyncio.sleep(0.01)
+    assert prd_library.search({"feature": "Comments"})
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_seeded_sections_are_revised_by_the_pipeline(prd_library, monkeypatch):
+    """
+    Tests that assembling a PRD stores it, that a later session finds and
+    seeds from it, and that the section agents are then asked to revise
+    their drafts rather than write new ones.
+    """
+    first = State({}, {})
+    first["repositories"] = {REPO: "abc123"}
+    assemble_prd(**COMMENTS, tool_context=SimpleNamespace(state=first))
+
+    state = State({"goals": COMMENTS["goals"], "repositories": {REPO: "def456"}}, {})
+    context = SimpleNamespace(state=state)
+    found = asyncio.run(search_prd_library("Let users comment on documents", context))
+    assert found["success"] and found["matches"][0]["same_repository"]
+
+    seeded = asyncio.run(seed_prd_from_library(found["matches"][0]["id"], context))
+    assert seeded["success"]
+    assert sorted(seeded["seeded_sections"]) == sorted(set(COMMENTS) - {"goals"})
+    assert state["solution"] == COMMENTS["solution"]
+    assert not asyncio.run(seed_prd_from_library(999, context))["success"]
+
+    llm = FakeLlm(responses={"": "Revised."})
+    monkeypatch.setattr(pipeline, "_pipeline", PrdPipeline(llm))
+    result = asyncio.run(pipeline.draft_prd("Let users comment on documents", context))
+    assert result["success"]
+    requests = [request.contents[-1].parts[0].text for request in llm.requests]
+    assert len(requests) == 5
+    assert all(pipeline.REVISION_REQUEST in request for request in requests)
+    # The new PRD was added to the library too.
+    (revised,) = prd_library.search({"solution": "Revised."})
+    # The feature description given to the search was kept for it.
+    assert revised["feature"] == "Let users comment on documents"
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from bug_free_octo_guide.tools.prd_assembler_tool import assemble_prd, render_prd, update_prd_section
+from bug_free_octo_guide.tools.prd_form_tools import define_goals
+from google.adk.sessions.state import State
+
+
+def test_sections_are_versioned_and_rendered_incrementally():
+    """Tests that section updates are versioned and that rendering can return only the changes."""
+    state = State({}, {})
+    tool_context = SimpleNamespace(state=state)
+    define_goals("Comments on documents", "10% more comments", ["Threads"], tool_context)
+    result = update_prd_section("solution", "Add a Comment model.", tool_context)
+    assert result["version"] == 1
+    first = render_prd(tool_context)
+    assert "Comments on documents" in first["prd"] and "Add a Comment model." in first["prd"]
+
+    revised = update_prd_section("solution", "Add a Comment model.\nAdd a Reaction model.", tool_context)
+    assert revised["version"] == 2
+    assert "+Add a Reaction model." in revised["diff"]
+    assert "Comments on documents" not in revised["diff"]
+    assert not update_prd_section("solution", "Add a Comment model.\nAdd a Reaction model.", tool_context)["changed"]
+
+    # Sections written straight to the state by a sub-agent are picked up.
+    state["testing"] = "Request specs."
+    changes = render_prd(tool_context, changed_since=first["version"])
+    assert set(changes["changed_sections"]) == {"solution", "testing"}
+    assert "prd" not in changes
+    assert state["prd"]["sections"]["testing"]["version"] == 1
+
+    assert not update_prd_section("summary", "x", tool_context)["success"]
+
+
+def test_assemble_prd_matches_the_rendered_state():
+    """Tests that assemble_prd stores the sections it renders in the session state."""
+    tool_context = SimpleNamespace(state=State({}, {}))
+    prd = assemble_prd("g", "s", "a", "d", "i", "t", tool_context)
+    assert prd.startswith("\n# Product Requirements Document\n\n## Goals\ng\n\n## Solution\ns\n")
+    assert prd == render_prd(tool_context)["prd"]
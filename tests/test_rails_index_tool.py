@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+from bug_free_octo_guide.tools import context_analysis_tool
+from bug_free_octo_guide.tools.rails_index_tool import find_routes, find_tables
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_find_tables_and_routes_query_the_analyzed_repository(
+    rails_repo, analysis_cache, monkeypatch
+):
+    """
+    Tests that the lookups answer from the index built during analysis and
+    rebuild it from the mirror once it has been evicted.
+    """
+    repo_url = f"file://{rails_repo}"
+    result = await context_analysis_tool.analyze_repo_url(repo_url)
+    assert result["indexed"] == {"tables": 1, "routes": 7}
+    tool_context = SimpleNamespace(state={"repositories": {repo_url: result["commit"]}})
+
+    tables = await find_tables(["user"], tool_context)
+    assert tables["tables"][repo_url] == {
+        "users": {"columns": {"name": "string"}, "indexes": [], "foreign_keys": []}
+    }
+
+    monkeypatch.setattr(context_analysis_tool.index_cache, "get", lambda key: None)
+    routes = await find_routes(["users"], tool_context)
+    assert {"verb": "GET", "path": "/users/:id", "action": "users#show"} in routes["routes"][repo_url]
+
+    assert not (await find_tables(["user"], SimpleNamespace(state={})))["success"]
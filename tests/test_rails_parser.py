@@ -0,0 +1,91 @@
+from bug_free_octo_guide.tools.rails_parser import (
+    RoutesParser,
+    SchemaParser,
+    query_routes,
+    query_tables,
+)
+
+SCHEMA = '''ActiveRecord::Schema[7.1].define(version: 2024_05_01_000000) do
+  create_table "comments", force: :cascade do |t|
+    t.text "body", null: false
+    t.references "user", null: false
+    t.timestamps
+    t.index ["user_id"], name: "index_comments_on_user_id"
+  end
+
+  create_table "users", force: :cascade do |t|
+    t.string "email", null: false
+  end
+
+  create_table "invoices", force: :cascade do |t|
+    t.integer "amount_cents"
+  end
+
+  add_index "users", ["email"], name: "index_users_on_email", unique: true
+  add_foreign_key "comments", "users"
+end
+'''
+
+ROUTES = '''Rails.application.routes.draw do
+  root "home#index"
+  resources :users, only: [:index, :show] do
+    resources :comments, only: %i[create destroy]
+    member do
+      post :deactivate # Soft delete.
+    end
+  end
+  resource :profile, only: :show
+  namespace :api do
+    namespace :v1 do
+      get "status", to: "health#show"
+    end
+  end
+end
+'''
+
+
+def _parse(parser, text):
+    for line in text.splitlines(keepends=True):
+        parser.feed(line)
+    return parser.result()
+
+
+def test_schema_parser_indexes_tables_columns_and_indexes():
+    """
+    Tests that tables, columns, indexes and foreign keys are extracted and
+    that queries return only the relevant tables.
+    """
+    index = _parse(SchemaParser(), SCHEMA)
+
+    comments = index["tables"]["comments"]
+    assert comments["columns"] == {
+        "body": "text",
+        "user_id": "bigint",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    }
+    assert comments["foreign_keys"] == ["users"]
+    assert index["tables"]["users"]["indexes"] == [
+        {"columns": ["email"], "name": "index_users_on_email", "unique": True}
+    ]
+    assert set(query_tables(index, ["Users"])) == {"users", "comments"}
+
+
+def test_routes_parser_expands_resources_and_nesting():
+    """
+    Tests that resources, nesting, member routes and namespaces are expanded
+    into verb/path/action entries.
+    """
+    routes = _parse(RoutesParser(), ROUTES)["routes"]
+
+    assert {"verb": "GET", "path": "/", "action": "home#index"} in routes
+    assert {"verb": "GET", "path": "/users/:id", "action": "users#show"} in routes
+    assert {"verb": "DELETE", "path": "/users/:user_id/comments/:id", "action": "comments#destroy"} in routes
+    assert {"verb": "POST", "path": "/users/:id/deactivate", "action": "users#deactivate"} in routes
+    assert {"verb": "GET", "path": "/profile", "action": "profiles#show"} in routes
+    assert {"verb": "GET", "path": "/api/v1/status", "action": "api/v1/health#show"} in routes
+    assert len(routes) == 8
+    assert [route["action"] for route in query_routes({"routes": routes}, ["comment"])] == [
+        "comments#create",
+        "comments#destroy",
+    ]
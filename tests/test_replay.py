@@ -0,0 +1,38 @@
+import pytest
+from bug_free_octo_guide.models import FakeLlm, Recorder, ReplayLlm, UnrecordedRequestError
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def request(text):
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def responses(llm, text):
+    return [r.content.parts[0].text async for r in llm.generate_content_async(request(text))]
+
+
+@pytest.mark.asyncio
+async def test_recordings_are_replayed_without_the_model(tmp_path):
+    """
+    Tests that a recorded request replays without calling the model and
+    that strict replay refuses anything unrecorded.
+    """
+    directory = str(tmp_path / "recordings")
+    live = FakeLlm()
+    recorded = await responses(ReplayLlm(live, Recorder(directory, "record")), "Add comments.")
+    assert recorded == ["Fake response to: Add comments."]
+
+    replaying = ReplayLlm(FakeLlm(), Recorder(directory, "replay"))
+    assert await responses(replaying, "Add comments.") == recorded
+    assert replaying.inner.requests == []
+
+    with pytest.raises(UnrecordedRequestError):
+        await responses(replaying, "Add likes.")
+
+    auto = ReplayLlm(live, Recorder(directory, "auto"))
+    await responses(auto, "Add likes.")
+    await responses(auto, "Add likes.")
+    assert len(live.requests) == 2
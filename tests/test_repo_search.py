@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+from bug_free_octo_guide.tools import context_analysis_tool, repo_search_tool
+from bug_free_octo_guide.tools.repo_search import SearchIndex, SearchIndexStore, tokenize
+from tests.helpers import commit_files
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_tokenize_splits_identifiers():
+    """
+    Tests that identifiers are indexed whole and by their parts.
+    """
+    assert tokenize("class UserComment < ApplicationRecord; has_many :likes") == [
+        "class", "usercomment", "user", "comment", "applicationrecord",
+        "application", "record", "has_many", "has", "many", "likes",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_repo_ranks_relevant_files_and_reindexes_incrementally(
+    rails_repo, analysis_cache, tmp_path, monkeypatch
+):
+    """
+    Tests that searches return the most relevant files with snippets, and
+    that a new commit only re-indexes the files that changed.
+    """
+    store = SearchIndexStore(str(tmp_path / "search"))
+    monkeypatch.setattr(repo_search_tool, "search_index_store", store)
+    commit_files(
+        rails_repo,
+        {
+            "app/models/comment.rb": "class Comment < ApplicationRecord\n  belongs_to :user\nend\n",
+            "app/models/invoice.rb": "class Invoice < ApplicationRecord\nend\n",
+            "README.md": "A sample application.\n",
+        },
+    )
+    repo_url = f"file://{rails_repo}"
+    analysis = await context_analysis_tool.analyze_repo_url(repo_url)
+    tool_context = SimpleNamespace(state={"repositories": {repo_url: analysis["commit"]}})
+
+    result = await repo_search_tool.search_repo("Let users comment on posts", tool_context)
+
+    assert result["success"]
+    top = result["results"][0]
+    assert top["path"] == "app/models/comment.rb"
+    assert "belongs_to :user" in top["snippet"]
+    assert "app/models/invoice.rb" not in [entry["path"] for entry in result["results"]]
+
+    new_commit = commit_files(rails_repo, {"app/models/like.rb": "class Like\nend\n"})
+    pool = context_analysis_tool.mirror_pool
+    await pool.update(repo_url, new_commit)
+    previous = store.latest(repo_url)
+    read = []
+
+    def read_blobs(blobs, reader):
+        read.extend(blobs)
+        return pool.read_objects(repo_url, blobs, reader)
+
+    index, stats = SearchIndex.build(
+        new_commit, pool.list_tree(repo_url, new_commit), read_blobs, previous
+    )
+
+    assert read == ["app/models/like.rb"]
+    assert stats["reused"] == len(previous.docs)
+    assert index.search("like")[0][0] == "app/models/like.rb"
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+from bug_free_octo_guide.models import CircuitOpenError, FakeLlm, ResilientLlm, RoutedLlm
+from bug_free_octo_guide.models import resilience
+from bug_free_octo_guide.models.resilience import CircuitBreaker, RetryBudget, RetryBudgets
+from bug_free_octo_guide.telemetry import metrics
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class ScriptedLlm(FakeLlm):
+    """Takes `delays[i]` seconds over call i, failing with `codes[i]` if set."""
+
+    delays: list = []
+    codes: list = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        call = len(self.requests)
+        self.requests.append(llm_request)
+        await asyncio.sleep(self.delays[call] if call < len(self.delays) else 0)
+        if call < len(self.codes) and self.codes[call]:
+            raise errors.APIError(self.codes[call], {"error": {"message": "scripted"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=f"reply {call}")]))
+
+
+def request():
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hello")])])
+
+
+async def answer(llm):
+    return [response.content.parts[0].text async for response in llm.generate_content_async(request())]
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "BACKOFF_BASE", 0.001)
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_and_others_raised():
+    """Tests that 5xx and 429 errors are retried and that a 400 is raised at once."""
+    backend = ScriptedLlm(codes=[503, 429])
+    llm = ResilientLlm(backend, budgets=RetryBudgets())
+    retries = metrics.value("octo_guide_model_retries_total", model="fake")
+    assert await answer(llm) == ["reply 2"]
+    assert metrics.value("octo_guide_model_retries_total", model="fake") == retries + 2
+
+    backend = ScriptedLlm(codes=[400])
+    with pytest.raises(errors.APIError):
+        await answer(ResilientLlm(backend, budgets=RetryBudgets()))
+    assert len(backend.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_are_limited_by_the_session_budget():
+    """Tests that a session cannot retry more than its budget allows."""
+    budget = RetryBudget(ratio=0.5, burst=2)
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+    backend = ScriptedLlm(codes=[503] * 10)
+    budgets = RetryBudgets()
+    token = resilience.current_session.set("session-1")
+    try:
+        # With the 0.2 the call itself earns, enough for one retry.
+        budgets.get("session-1").balance = 0.8
+        with pytest.raises(errors.APIError):
+            await answer(ResilientLlm(backend, retries=5, budgets=budgets))
+    finally:
+        resilience.current_session.reset(token)
+    # The first attempt plus the single retry the budget allowed.
+    assert len(backend.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_hedged_and_the_first_answer_wins():
+    """Tests that a call slower than the latency percentile is hedged and the faster answer used."""
+    backend = ScriptedLlm(delays=[2.0, 0.01])
+    llm = ResilientLlm(backend, hedge_min_delay=0, budgets=RetryBudgets())
+    for _ in range(resilience.MIN_LATENCY_SAMPLES):
+        llm.latencies.record(0.05)
+    assert llm.hedge_delay() == pytest.approx(0.05)
+
+    hedges = metrics.value("octo_guide_model_hedges_total", model="fake", winner="hedge")
+    started = time.perf_counter()
+    assert await answer(llm) == ["reply 1"]
+    assert time.perf_counter() - started < 1.0
+    assert metrics.value("octo_guide_model_hedges_total", model="fake", winner="hedge") == hedges + 1
+    assert len(backend.requests) == 2
+    # The hedge was sent a copy, not the request the first attempt holds.
+    assert backend.requests[0] is not backend.requests[1]
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures_and_recovers():
+    """Tests that the circuit opens after consecutive failures and closes after a good probe."""
+    backend = ScriptedLlm(codes=[503, 503])
+    llm = ResilientLlm(
+        backend, retries=0, breaker=CircuitBreaker("fake", failures=2, cooldown=0.1), budgets=RetryBudgets()
+    )
+    for _ in range(2):
+        with pytest.raises(errors.APIError):
+            await answer(llm)
+    with pytest.raises(CircuitOpenError):
+        await answer(llm)
+    assert len(backend.requests) == 2
+    assert metrics.value("octo_guide_model_circuit_open", model="fake") == 1
+
+    await asyncio.sleep(0.1)
+    assert await answer(llm) == ["reply 2"]
+    assert not llm.breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_router_skips_a_tier_whose_circuit_is_open():
+    """Tests that the router goes to the next tier when a tier's circuit is open."""
+    broken = ResilientLlm(ScriptedLlm(model="fast-model"), budgets=RetryBudgets())
+    broken.breaker.failures = 1
+    broken.breaker.failure()
+    llm = RoutedLlm("agent", [("fast", broken), ("strong", FakeLlm(model="strong-model"))])
+    assert await answer(llm) == ["Fake response to: hello"]
+    assert broken.llm.requests == []
+
+
+@pytest.mark.asyncio
+async def test_fake_model_injects_failures_and_tail_latency():
+    """Tests that the fake model fails a seeded fraction of calls with a 503."""
+    llm = FakeLlm(failure_rate=0.5, tail_rate=0.5, tail_latency=0.01, seed=7)
+    outcomes = []
+    for _ in range(20):
+        try:
+            await answer(llm)
+            outcomes.append("ok")
+        except errors.ServerError as e:
+            assert e.code == 503
+            outcomes.append("failed")
+    assert 0 < outcomes.count("failed") < 20
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+from bug_free_octo_guide.models import FakeLlm, registry, routed_model
+from bug_free_octo_guide.models.routing import agent_tier
+from bug_free_octo_guide.telemetry import metrics
+from google.adk.agents import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class SilentLlm(FakeLlm):
+    """Answers every request with an empty message."""
+
+    def respond(self, llm_request):
+        return types.Part(text="")
+
+
+@pytest.fixture
+def tiers(monkeypatch):
+    models = {"fast-model": SilentLlm(model="fast-model"), "strong-model": FakeLlm(model="strong-model")}
+    for name, llm in models.items():
+        monkeypatch.setitem(registry._models, name, llm)
+    monkeypatch.setenv("OCTO_GUIDE_MODEL_TIERS", "fast=fast-model,standard=strong-model,strong=strong-model")
+    return models
+
+
+async def ask(llm, agent_name, text):
+    agent = LlmAgent(name=agent_name, model=llm)
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="user")
+    replies = []
+    async for event in runner.run_async(
+        user_id="user",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            replies.append(event.content.parts[0].text)
+    return replies
+
+
+def test_agents_are_assigned_tiers_from_configuration(monkeypatch):
+    """Tests that agent tiers come from the defaults and OCTO_GUIDE_AGENT_TIERS."""
+    assert agent_tier("bug_free_octo_guide") == "fast"
+    assert agent_tier("db_schema_agent") == "standard"
+    monkeypatch.setenv("OCTO_GUIDE_AGENT_TIERS", "db_schema_agent=strong")
+    assert agent_tier("db_schema_agent") == "strong"
+    monkeypatch.setenv("OCTO_GUIDE_AGENT_TIERS", "db_schema_agent=huge")
+    with pytest.raises(ValueError):
+        agent_tier("db_schema_agent")
+
+
+@pytest.mark.asyncio
+async def test_invalid_cheap_responses_escalate_to_a_larger_tier(tiers):
+    """Tests that an empty response from the fast tier is retried on the next tier."""
+    llm = routed_model("ticketing_agent")
+    assert [tier for tier, _ in llm.tiers] == ["fast", "standard"]
+    escalations = metrics.value(
+        "octo_guide_model_escalations_total", agent="ticketing_agent", tier="fast", to_tier="standard"
+    )
+
+    assert await ask(llm, "ticketing_agent", "split this PRD") == ["Fake response to: split this PRD"]
+    assert len(tiers["fast-model"].requests) == 1
+    assert tiers["strong-model"].requests[0].model == "strong-model"
+    assert metrics.value(
+        "octo_guide_model_escalations_total", agent="ticketing_agent", tier="fast", to_tier="standard"
+    ) == escalations + 1
+
+
+@pytest.mark.asyncio
+async def test_valid_cheap_responses_are_not_escalated(tiers, monkeypatch):
+    """Tests that a valid response from the fast tier is used as is."""
+    monkeypatch.setitem(registry._models, "fast-model", FakeLlm(model="fast-model"))
+    routed = metrics.value("octo_guide_model_routed_total", agent="ticketing_agent", tier="fast")
+
+    assert await ask(routed_model("ticketing_agent"), "ticketing_agent", "hi") == ["Fake response to: hi"]
+    assert tiers["strong-model"].requests == []
+    assert metrics.value("octo_guide_model_routed_total", agent="ticketing_agent", tier="fast") == routed + 1
+
+
+class SlowStreamingLlm(FakeLlm):
+    """Streams one chunk, then takes a while to send the complete reply."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(llm_request)
+        if stream:
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Hel")]), partial=True)
+        await asyncio.sleep(0.5)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.reply(llm_request))]))
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_are_passed_on_while_the_reply_is_validated(tiers, monkeypatch):
+    """Tests that streaming through a tier that may escalate still sends chunks early."""
+    monkeypatch.setitem(registry._models, "fast-model", SlowStreamingLlm(model="fast-model"))
+    llm = routed_model("ticketing_agent")
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+
+    started = time.perf_counter()
+    responses, first_chunk = [], None
+    async for response in llm.generate_content_async(request, stream=True):
+        first_chunk = first_chunk or time.perf_counter() - started
+        responses.append(response)
+    assert first_chunk < 0.25
+    assert [r.partial for r in responses] == [True, None]
+    assert responses[-1].content.parts[0].text == "Fake response to: hi"
+    assert tiers["strong-model"].requests == []
+
+    # An invalid final reply is still escalated after its chunks were sent.
+    monkeypatch.setitem(registry._models, "fast-model", tiers["fast-model"])
+    responses = [r async for r in routed_model("ticketing_agent").generate_content_async(request, stream=True)]
+    assert responses[-1].content.parts[0].text == "Fake response to: hi"
+    assert not responses[-1].partial
+    assert len(tiers["strong-model"].requests) == 1
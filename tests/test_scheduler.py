@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from bug_free_octo_guide import server
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.scheduler import FairLimiter, Overloaded
+from bug_free_octo_guide.server import create_app
+from bug_free_octo_guide.sessions import SqliteSessionService
+from fastapi.testclient import TestClient
+from google.adk.agents import LlmAgent
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_round_robin_across_users():
+    """Tests that waiting users are served round-robin, not first come first served."""
+    limiter = FairLimiter("test", limit=1)
+    await limiter.acquire("a")
+    served = []
+
+    async def wait(user, name):
+        await limiter.acquire(user)
+        served.append(name)
+        await asyncio.sleep(0)
+        limiter.release()
+
+    waiters = [asyncio.create_task(wait(user, name)) for user, name in [("a", "a2"), ("a", "a3"), ("b", "b1")]]
+    await asyncio.sleep(0)
+    assert limiter.waiting == 3
+    limiter.release()
+    await asyncio.gather(*waiters)
+    assert served == ["a2", "b1", "a3"]
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_refuses_and_cancelled_waiters_leave_it():
+    """Tests that a full queue refuses new requests and that cancelled waiters leave it."""
+    limiter = FairLimiter("test", limit=1, max_queue=1)
+    await limiter.acquire("a")
+    waiter = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as refused:
+        await limiter.acquire("c")
+    assert refused.value.retry_after >= 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.waiting == 0
+    limiter.release()
+    async with limiter.slot("c"):
+        assert limiter.active == 1
+    assert limiter.active == 0
+
+
+def test_chat_answers_429_with_retry_after_when_overloaded(tmp_path, monkeypatch):
+    """Tests that /chat answers 429 with a Retry-After header when the turn queue is full."""
+    limiter = FairLimiter("turn", limit=1, max_queue=0)
+    monkeypatch.setattr(server, "turns", limiter)
+    client = TestClient(create_app(LlmAgent(name="echo", model=FakeLlm()), SqliteSessionService(str(tmp_path / "s.db"))))
+
+    asyncio.run(limiter.acquire("someone else"))
+    for path in ("/chat", "/chat/stream"):
+        response = client.post(path, json={"text": "hi"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    limiter.release()
+    assert client.post("/chat", json={"text": "hi"}).json()["response"] == "Fake response to: hi"
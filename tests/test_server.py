@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.scheduler import FairLimiter
+from bug_free_octo_guide.server import create_app
+from bug_free_octo_guide.sessions import SqliteSessionService
+from fastapi.testclient import TestClient
+from google.adk.agents import LlmAgent
+
+
+def parse_events(body):
+    events = []
+    for block in body.replace("\r\n", "\n").strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if ": " in line)
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_chat_stream_sends_tokens_before_the_complete_reply(tmp_path):
+    """Tests that /chat/stream sends token events before the complete message."""
+    agent = LlmAgent(name="echo", model=FakeLlm())
+    client = TestClient(create_app(agent, SqliteSessionService(str(tmp_path / "sessions.db"))))
+
+    with client.stream("POST", "/chat/stream", json={"text": "add comments"}) as response:
+        events = parse_events(response.read().decode())
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "session"
+    assert kinds[-1] == "done"
+    tokens = [data["text"] for kind, data in events if kind == "token"]
+    assert "".join(tokens).strip() == "Fake response to: add comments"
+    assert kinds.index("token") < kinds.index("message")
+    session_id = events[-1][1]["session_id"]
+    assert events[-1][1]["response"] == "Fake response to: add comments"
+
+    reply = client.post("/chat", json={"text": "and likes", "session_id": session_id}).json()
+    assert reply == {"response": "Fake response to: and likes", "session_id": session_id}
+
+    metrics = client.get("/metrics").text
+    assert 'octo_guide_model_calls_total{agent="echo"}' in metrics
+
+
+
+def test_chat_stream_reports_a_turn_refused_after_the_stream_started(tmp_path, monkeypatch):
+    """Tests that a turn refused once the stream has started ends with an overloaded event."""
+    from bug_free_octo_guide import server
+
+    limiter = FairLimiter("turn", limit=1, max_queue=0)
+    asyncio.run(limiter.acquire("someone else"))
+    # The queue fills up between the check and the turn.
+    monkeypatch.setattr(limiter, "check", lambda: None)
+    monkeypatch.setattr(server, "turns", limiter)
+    client = TestClient(create_app(LlmAgent(name="echo", model=FakeLlm()), SqliteSessionService(str(tmp_path / "s.db"))))
+
+    with client.stream("POST", "/chat/stream", json={"text": "hi"}) as response:
+        events = parse_events(response.read().decode())
+
+    assert [kind for kind, _ in events] == ["session", "overloaded"]
+    assert events[-1][1]["retry_after"] == limiter.retry_after()
+
+def test_prewarm_starts_analysis_of_github_repositories(tmp_path, monkeypatch):
+    """Tests that /prewarm starts analyzing GitHub repositories and rejects other input."""
+    from bug_free_octo_guide import server
+
+    started = []
+
+    async def prewarm_repo(url):
+        started.append(url)
+        return "started"
+
+    monkeypatch.setattr(server, "prewarm_repo", prewarm_repo)
+    client = TestClient(create_app(LlmAgent(name="echo", model=FakeLlm()), SqliteSessionService(str(tmp_path / "s.db"))))
+
+    response = client.post("/prewarm", json={"repo_url": "https://github.com/acme/app.git"})
+    assert response.status_code == 202
+    assert response.json() == {"repositories": {"https://github.com/acme/app": "started"}}
+    assert started == ["https://github.com/acme/app"]
+    assert client.post("/prewarm", json={"repo_url": "not a repo"}).status_code == 400
@@ -0,0 +1,106 @@
+import asyncio
+import sqlite3
+
+import pytest
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.sessions import SqliteSessionService
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def say(runner, session, text):
+    async for _ in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_a_restart(tmp_path):
+    """Tests that sessions and their events are read back by a new service instance."""
+    path = str(tmp_path / "sessions.db")
+    service = SqliteSessionService(path)
+    runner = Runner(app_name="app", agent=LlmAgent(name="echo", model=FakeLlm()), session_service=service)
+    session = await service.create_session(
+        app_name="app", user_id="u", state={"repositories": {"r": "c"}, "user:name": "Ada"}
+    )
+    await say(runner, session, "hello")
+
+    restored = await SqliteSessionService(path).get_session(app_name="app", user_id="u", session_id=session.id)
+    assert [event.author for event in restored.events] == ["user", "echo"]
+    assert restored.events[1].content.parts[0].text == "Fake response to: hello"
+    assert restored.state == {"repositories": {"r": "c"}, "user:name": "Ada"}
+
+    other = await service.create_session(app_name="app", user_id="u")
+    assert other.state == {"user:name": "Ada"}
+    recent = await service.get_session(
+        app_name="app", user_id="u", session_id=session.id, config=GetSessionConfig(num_recent_events=1)
+    )
+    assert [event.author for event in recent.events] == ["echo"]
+
+    await service.delete_session(app_name="app", user_id="u", session_id=session.id)
+    assert await service.get_session(app_name="app", user_id="u", session_id=session.id) is None
+
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_wait_for_a_writer(tmp_path):
+    """Tests that sessions can be read and listed while another connection holds the write lock."""
+    path = str(tmp_path / "sessions.db")
+    service = SqliteSessionService(path)
+    session = await service.create_session(app_name="app", user_id="u")
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        read = service.get_session(app_name="app", user_id="u", session_id=session.id)
+        assert (await asyncio.wait_for(read, 5)).id == session.id
+        listed = await asyncio.wait_for(service.list_sessions(app_name="app", user_id="u"), 5)
+        assert [s.id for s in listed.sessions] == [session.id]
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+@pytest.mark.asyncio
+async def test_old_turns_are_compacted_once_sections_are_in_state(tmp_path):
+    """
+    Tests that, once a PRD section is in the state, only the most recent
+    turn is kept verbatim and the earlier ones are sent as a summary.
+    """
+    service = SqliteSessionService(str(tmp_path / "sessions.db"), keep_recent_turns=1)
+    llm = FakeLlm()
+    agent = LlmAgent(name="writer", model=llm)
+    runner = Runner(app_name="app", agent=agent, session_service=service)
+    session = await service.create_session(app_name="app", user_id="u")
+
+    await say(runner, session, "first turn")
+    await say(runner, session, "second turn")
+    stored = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert len(stored.events) == 4
+
+    agent.output_key = "solution"
+    for text in ("third turn", "fourth turn", "fifth turn"):
+        await say(runner, session, text)
+
+    stored = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert len(stored.events) == 3
+    summary = stored.events[0].content.parts[0].text
+    assert "PRD sections already captured in the session: solution." in summary
+    assert "- user: first turn" in summary and "- user: fourth turn" in summary
+    assert [event.content.parts[0].text for event in stored.events[1:]] == [
+        "fifth turn",
+        "Fake response to: fifth turn",
+    ]
+    # The last turn was sent the summary, the turn before it, and itself.
+    last_request = llm.requests[-1]
+    assert [content.parts[0].text for content in last_request.contents[1:]] == [
+        "fourth turn",
+        "Fake response to: fourth turn",
+        "fifth turn",
+    ]
+    assert "- user: third turn" in last_request.contents[0].parts[0].text
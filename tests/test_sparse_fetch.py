@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from bug_free_octo_guide.tools.sparse_fetch import read_checked_out_files, sparse_checkout
+from tests.helpers import commit_files, git
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_sparse_checkout_only_materializes_requested_files(rails_repo, tmp_path):
+    """
+    Tests that a filter-capable server yields a sparse checkout that skips
+    unrelated files, and that other servers fall back to a shallow clone.
+    """
+    commit_files(rails_repo, {"vendor/assets/big.bin": os.urandom(64 * 1024)})
+    repo_url = f"file://{rails_repo}"
+    file_paths = ["Gemfile", "db/schema.rb", "conventions.md"]
+
+    shallow_dest = str(tmp_path / "shallow")
+    assert await sparse_checkout(repo_url, shallow_dest, file_paths) == "shallow"
+    assert os.path.exists(os.path.join(shallow_dest, "vendor/assets/big.bin"))
+
+    git(rails_repo, "config", "uploadpack.allowFilter", "true")
+    sparse_dest = str(tmp_path / "sparse")
+    assert await sparse_checkout(repo_url, sparse_dest, file_paths) == "sparse"
+    assert not os.path.exists(os.path.join(sparse_dest, "vendor"))
+    assert not os.path.exists(os.path.join(sparse_dest, "config/routes.rb"))
+
+    contents = read_checked_out_files(sparse_dest, file_paths)
+    assert contents["Gemfile"].startswith(b"source")
+    assert b"create_table" in contents["db/schema.rb"]
+    assert contents["conventions.md"] is None
@@ -0,0 +1,81 @@
+import pytest
+from bug_free_octo_guide.cache import DiskCache
+from bug_free_octo_guide.models import CachingLlm, FakeLlm
+from bug_free_octo_guide.telemetry import Metrics, TelemetryPlugin
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def lookup(term: str) -> dict:
+    """Looks up a term."""
+    if term == "missing":
+        return {"success": False, "error": "Not found."}
+    return {"success": True, "term": term}
+
+
+class LookupLlm(FakeLlm):
+    """Calls `lookup` once with the user's text, then answers."""
+
+    def respond(self, llm_request):
+        called = any(
+            part.function_response for content in llm_request.contents for part in content.parts or []
+        )
+        if called:
+            return types.Part(text="Done.")
+        text = llm_request.contents[-1].parts[0].text
+        return types.Part(function_call=types.FunctionCall(name="lookup", args={"term": text}))
+
+
+async def run(agent, registry, text):
+    runner = InMemoryRunner(agent=agent, app_name="test", plugins=[TelemetryPlugin(registry)])
+    session = await runner.session_service.create_session(app_name="test", user_id="user")
+    async for _ in runner.run_async(
+        user_id="user",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_plugin_records_agent_model_and_tool_metrics(tmp_path):
+    """Tests that the plugin records agent, model and tool counts, durations and tokens."""
+    registry = Metrics()
+    llm = CachingLlm(LookupLlm(), cache=DiskCache("responses", root=str(tmp_path)))
+    agent = LlmAgent(name="finder", model=llm, tools=[lookup])
+
+    await run(agent, registry, "comments")
+    assert registry.value("octo_guide_agent_runs_total", agent="finder") == 1
+    assert registry.value("octo_guide_model_calls_total", agent="finder") == 2
+    assert registry.value("octo_guide_model_cache_hits_total", agent="finder") == 0
+    assert registry.value("octo_guide_model_tokens_total", agent="finder", kind="prompt") > 0
+    assert registry.value("octo_guide_model_tokens_total", agent="finder", kind="completion") > 0
+    assert registry.value("octo_guide_tool_calls_total", tool="lookup") == 1
+    assert registry.histogram("octo_guide_tool_duration_seconds", tool="lookup")["count"] == 1
+
+    await run(agent, registry, "comments")
+    assert registry.value("octo_guide_model_cache_hits_total", agent="finder") == 2
+
+    await run(agent, registry, "missing")
+    assert registry.value("octo_guide_tool_errors_total", tool="lookup") == 1
+
+
+def test_render_uses_the_prometheus_text_format(tmp_path):
+    """Tests that metrics render in the Prometheus text exposition format."""
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.describe("octo_guide_tool_calls_total", "Tool calls, by tool.")
+    registry.inc("octo_guide_tool_calls_total", tool="lookup")
+    registry.observe("octo_guide_tool_duration_seconds", 0.5, tool='a "quoted" name')
+    cache = DiskCache("telemetry_test", root=str(tmp_path))
+    cache.get("absent")
+
+    lines = registry.render().splitlines()
+    assert "# HELP octo_guide_tool_calls_total Tool calls, by tool." in lines
+    assert 'octo_guide_tool_calls_total{tool="lookup"} 1' in lines
+    assert 'octo_guide_tool_duration_seconds_bucket{tool="a \\"quoted\\" name",le="0.1"} 0' in lines
+    assert 'octo_guide_tool_duration_seconds_bucket{tool="a \\"quoted\\" name",le="1"} 1' in lines
+    assert 'octo_guide_tool_duration_seconds_count{tool="a \\"quoted\\" name"} 1' in lines
+    assert 'octo_guide_disk_cache_misses_total{cache="telemetry_test"} 1' in lines
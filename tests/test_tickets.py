@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from bug_free_octo_guide.agents.ticketing_agent import TicketingAgent, load_ticket_prompt
+from bug_free_octo_guide.models import FakeLlm
+from bug_free_octo_guide.prd import render_document
+from bug_free_octo_guide.tickets import generate_tickets, merge_tickets, parse_tickets, split_prd
+
+pytest_plugins = ("pytest_asyncio",)
+
+LATENCY = 0.3
+
+PRD = render_document(
+    {
+        "goals": "## Goals\n- Comments on posts\n\n## Non-Goals\n- Threads",
+        "db_schema": "Add a comments table.",
+        "api_changes": "POST /posts/:id/comments",
+        "testing": "Request specs for comments.",
+    }
+)
+
+
+def ticket(title, dependencies="None", spec="Sections 1"):
+    return (
+        f"* **Ticket Title:** {title}\n"
+        "* **Description:** Does the work.\n"
+        "* **Acceptance Criteria (AC):**\n    * It works.\n"
+        f"* **Dependencies:** {dependencies}\n"
+        f"* **Relevant Tech Spec Sections:** {spec}\n"
+    )
+
+
+class SectionTicketsLlm(FakeLlm):
+    """Answers with tickets for whichever section it was asked about."""
+
+    def respond(self, llm_request):
+        from google.genai import types
+
+        request = llm_request.contents[-1].parts[0].text
+        if 'work in the "DB Schema" section' in request:
+            text = ticket("[Database] Create the comments table")
+        elif 'work in the "API Changes" section' in request:
+            text = "\n---\n".join(
+                [
+                    ticket("[Backend] Add the create comment endpoint", "[Database] Create comments table"),
+                    ticket("[Database] Create the comments table"),
+                ]
+            )
+        else:
+            text = ticket("[Testing] Request specs for comments", "[Backend] Add create comment endpoint")
+        return types.Part(text=text)
+
+
+def test_ticket_prompt_is_read_once():
+    """Tests that the ticket prompt file is read once and reused."""
+    load_ticket_prompt.cache_clear()
+    for _ in range(3):
+        prompt = TicketingAgent(FakeLlm(), "The PRD").load_prompt()
+    assert prompt.endswith("\n\nThe PRD")
+    assert load_ticket_prompt.cache_info().misses == 1
+
+
+def test_split_prd_keeps_goals_as_context():
+    """Tests that each PRD section is split out with the goals as context."""
+    context, sections = split_prd(PRD)
+    assert "Comments on posts" in context and "Threads" in context
+    assert [title for title, _ in sections] == ["API Changes", "DB Schema", "Testing"]
+
+
+def test_merge_dedupes_and_orders_by_dependency():
+    """Tests that merged tickets are deduplicated and ordered by their dependencies."""
+    testing = parse_tickets(ticket("[Testing] Specs", "[Backend] Endpoint, [Database] Table"), "Testing")
+    backend = parse_tickets(ticket("[Backend] Endpoint", "* [Database] Table"), "API Changes")
+    database = parse_tickets(ticket("[Database] Table") + "---\n" + ticket("[Migration] table"), "DB Schema")
+    assert testing[0].dependencies == ("[Backend] Endpoint", "[Database] Table")
+    assert "Dependencies" not in testing[0].body
+
+    merged = merge_tickets([testing, backend, database])
+    assert [t.title for t in merged] == ["[Database] Table", "[Backend] Endpoint", "[Testing] Specs"]
+
+
+@pytest.mark.asyncio
+async def test_generate_tickets_runs_sections_in_parallel():
+    """Tests that tickets for the PRD sections are generated in parallel."""
+    started = time.perf_counter()
+    result = await generate_tickets(PRD, SectionTicketsLlm(latency=LATENCY))
+    elapsed = time.perf_counter() - started
+
+    assert result["count"] == 3
+    tickets = result["tickets"].split("\n\n---\n\n")
+    assert "[Database] Create the comments table" in tickets[0]
+    assert "**Dependencies:** [Database] Create the comments table" in tickets[1]
+    assert "**Dependencies:** [Backend] Add the create comment endpoint" in tickets[2]
+    # One model call per section, all at once; one after another would take 3 * LATENCY.
+    assert elapsed < 2.5 * LATENCY
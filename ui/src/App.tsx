@@ -3,6 +3,42 @@ import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import './App.css';
 
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+// Reads a text/event-stream body, calling `onEvent` for each complete event.
+async function readServerSentEvents(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: string, data: any) => void,
+) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+    let boundary: number;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          data.push(line.slice(5).trimStart());
+        }
+      }
+      if (data.length) {
+        onEvent(event, JSON.parse(data.join('\n')));
+      }
+    }
+  }
+}
+
 function App() {
   const [featureDescription, setFeatureDescription] = useState('add a profile picture');
   const [githubRepo, setGithubRepo] = useState('timlawrenz/herLens');
@@ -13,6 +49,7 @@ function App() {
   const [prd, setPrd] = useState<string | null>(null);
   const chatBoxRef = useRef<HTMLDivElement>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [activity, setActivity] = useState<string | null>(null);
 
   useEffect(() => {
     if (chatBoxRef.current) {
@@ -20,6 +57,23 @@ function App() {
     }
   }, [messages]);
 
+  // Start analyzing the repository once the user has finished entering it
+  // (the field loses focus), so the orchestrator finds it ready. Partial
+  // names typed on the way are never sent. Best effort: failures are ignored.
+  const prewarmedRepo = useRef<string | null>(null);
+  const handleRepoBlur = () => {
+    const repo = githubRepo.trim();
+    if (!/^[\w.-]+\/[\w.-]+$/.test(repo) || prewarmedRepo.current === repo) {
+      return;
+    }
+    prewarmedRepo.current = repo;
+    fetch(`${API_URL}/prewarm`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ repo_url: `https://github.com/${repo}` }),
+    }).catch(() => {});
+  };
+
   const handleDownloadPrd = () => {
     if (prd) {
       const blob = new Blob([prd], { type: 'text/markdown' });
@@ -54,27 +108,65 @@ function App() {
       setInput('');
       setIsLoading(true);
 
+      const showBusy = (retryAfter: string) => {
+        setMessages(prev => [...prev, { text: `The server is busy. Please try again in ${retryAfter} seconds.`, author: 'bot' }]);
+      };
+
       try {
-        const response = await fetch(`${process.env.REACT_APP_API_URL || 'http://localhost:8000'}/chat`, {
+        const response = await fetch(`${API_URL}/chat/stream`, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
           },
           body: JSON.stringify({ text: messageToSend, session_id: sessionId }),
         });
 
-        if (response.ok) {
-          const data = await response.json();
-          setMessages(prev => [...prev, { text: data.response, author: 'bot' }]);
-          setSessionId(data.session_id);
-          // Check if the response contains ticket-like structures to identify PRD
-          if (data.response.includes('### Ticket')) {
-            // Assuming the PRD is the last bot message before the tickets
-            const lastBotMessage = newMessages.filter(m => m.author === 'bot').pop();
-            if(lastBotMessage) {
-              setPrd(lastBotMessage.text);
+        if (response.ok && response.body) {
+          // The reply is rendered as it streams in: tokens are appended to a
+          // bot message, which is replaced by the full text once complete.
+          let streaming = false;
+          const appendToReply = (text: string, replace: boolean) => {
+            const startsReply = !streaming;
+            streaming = true;
+            setMessages(prev => {
+              if (startsReply) {
+                return [...prev, { text, author: 'bot' }];
+              }
+              const last = prev[prev.length - 1];
+              return [...prev.slice(0, -1), { ...last, text: replace ? text : last.text + text }];
+            });
+          };
+
+          await readServerSentEvents(response.body, (event, data) => {
+            if (event === 'session') {
+              setSessionId(data.session_id);
+            } else if (event === 'token') {
+              appendToReply(data.text, false);
+            } else if (event === 'message') {
+              appendToReply(data.text, true);
+              streaming = false;
+            } else if (event === 'tool_call') {
+              setActivity(`Running ${data.name}...`);
+            } else if (event === 'tool_result') {
+              setActivity(null);
+            } else if (event === 'overloaded') {
+              showBusy(String(data.retry_after));
+            } else if (event === 'error') {
+              setMessages(prev => [...prev, { text: `Error: An internal error occurred.\n\n${data.message}`, author: 'bot' }]);
+            } else if (event === 'done') {
+              // Check if the response contains ticket-like structures to identify PRD
+              if (data.response.includes('### Ticket')) {
+                // Assuming the PRD is the last bot message before the tickets
+                const lastBotMessage = newMessages.filter(m => m.author === 'bot').pop();
+                if(lastBotMessage) {
+                  setPrd(lastBotMessage.text);
+                }
+              }
             }
-          }
+          });
+        } else if (response.status === 429) {
+          showBusy(response.headers.get('Retry-After') || 'a few');
         } else {
           console.error('Error sending message');
           const errorData = await response.json();
@@ -87,6 +179,7 @@ function App() {
         setMessages(prev => [...prev, { text: `Error: Could not connect to the server. ${errorMessage}`, author: 'bot' }]);
       } finally {
         setIsLoading(false);
+        setActivity(null);
       }
     }
   };
@@ -113,6 +206,7 @@ function App() {
               className="w-full p-2 mt-1 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-600"
               value={githubRepo}
               onChange={(e) => setGithubRepo(e.target.value)}
+              onBlur={handleRepoBlur}
               placeholder="e.g., timlawrenz/herLens"
             />
           </div>
@@ -149,7 +243,7 @@ function App() {
             value={input}
             onChange={(e) => setInput(e.target.value)}
             onKeyDown={(e) => e.key === 'Enter' && handleSend()}
-            placeholder={isLoading ? "Thinking..." : "Type 'approve' to generate tickets, or ask for changes."}
+            placeholder={isLoading ? (activity || "Thinking...") : "Type 'approve' to generate tickets, or ask for changes."}
             disabled={isLoading}
           />
           <button className="bg-blue-600 text-white px-4 rounded-r-lg hover:bg-blue-700" onClick={() => handleSend()} disabled={isLoading}>Send</button>